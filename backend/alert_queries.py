@@ -0,0 +1,116 @@
+"""
+SQL builders for paginated alert listings.
+
+Alerts are listed newest first by (timestamp, id) and paged with an opaque
+keyset cursor holding the last row's (timestamp, id) instead of OFFSET, so
+every page is a bounded range scan on one of the composite indexes created
+by db_setup.py:
+
+    idx_alerts_ts        (timestamp, id)
+    idx_alerts_class_ts  (object_class, timestamp, id)
+    idx_alerts_user_ts   (user_id, timestamp, id)
+
+Distance bands are applied as a filter on top of whichever index serves the
+ordering.
+"""
+
+import base64
+from datetime import datetime
+
+ALERT_COLUMNS = "id, timestamp, object_class, confidence, distance, image_path"
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 500
+
+ALERT_INDEXES = {
+    "idx_alerts_ts": "(timestamp, id)",
+    "idx_alerts_class_ts": "(object_class, timestamp, id)",
+    "idx_alerts_user_ts": "(user_id, timestamp, id)",
+}
+
+
+def _format_ts(ts):
+    return ts.isoformat(sep=" ") if isinstance(ts, datetime) else str(ts)
+
+
+def encode_cursor(timestamp, alert_id):
+    raw = f"{_format_ts(timestamp)}|{alert_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (timestamp string, id) from a cursor; raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, alert_id = raw.rsplit("|", 1)
+        datetime.fromisoformat(ts)
+        return ts, int(alert_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def build_alerts_query(limit=DEFAULT_LIMIT, cursor=None, start=None, end=None, object_class=None,
+                       min_distance=None, max_distance=None, user_id=None):
+    """
+    Build a keyset-paginated alert query
+
+    Args:
+        limit: Page size (clamped to MAX_LIMIT)
+        cursor: Cursor returned with the previous page
+        start, end: Time range, start inclusive / end exclusive
+        object_class: Only alerts for this class
+        min_distance, max_distance: Distance band in meters
+        user_id: Only alerts for this user
+
+    Returns:
+        (sql, params) using %s placeholders; one extra row is fetched so
+        paginate() can tell whether there is a next page
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    where, params = [], []
+
+    if user_id is not None:
+        where.append("user_id = %s")
+        params.append(user_id)
+    if object_class:
+        where.append("object_class = %s")
+        params.append(object_class)
+    if start is not None:
+        where.append("timestamp >= %s")
+        params.append(_format_ts(start))
+    if end is not None:
+        where.append("timestamp < %s")
+        params.append(_format_ts(end))
+    if min_distance is not None:
+        where.append("distance >= %s")
+        params.append(min_distance)
+    if max_distance is not None:
+        where.append("distance < %s")
+        params.append(max_distance)
+    if cursor:
+        ts, last_id = decode_cursor(cursor)
+        where.append("(timestamp < %s OR (timestamp = %s AND id < %s))")
+        params.extend([ts, ts, last_id])
+
+    sql = f"SELECT {ALERT_COLUMNS} FROM alerts"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT %s"
+    params.append(limit + 1)
+    return sql, params
+
+
+def paginate(rows, limit):
+    """
+    Trim the extra lookahead row
+
+    Returns:
+        (rows, next_cursor) where next_cursor is None on the last page
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, dict):
+        return rows, encode_cursor(last["timestamp"], last["id"])
+    return rows, encode_cursor(last[1], last[0])
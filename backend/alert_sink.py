@@ -0,0 +1,217 @@
+"""
+Asynchronous alert persistence.
+
+Detectors hand the alerts raised on a frame to an AlertSink and return
+immediately; a background thread encodes the frame to JPEG once however many
+tracks alerted on it, writes those bytes to the alert directory (one file per
+alert) and the content-addressed image store, and inserts the alert rows
+(image key and size, not the bytes) into MySQL in batches with executemany(),
+updating the dashboard rollups (backend/rollups.py) in the same transaction.
+If the writer falls behind, new alerts are dropped (and counted) instead of
+stalling detection.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from backend import metrics
+from backend.capture_index import get_capture_index
+from backend.encoder import JpegEncoder
+from backend.image_store import get_image_store
+from backend.rollups import record_alerts
+
+INSERT_ALERT = ("INSERT INTO alerts "
+                "(timestamp, object_class, confidence, distance, image_path, image_key, image_size) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)")
+
+_STOP = object()
+
+
+class AlertSink:
+    """
+    Background writer for proximity alerts
+
+    Args:
+        db_config: mysql.connector.connect() kwargs, or None to only save images
+        alert_dir: Directory alert JPEGs are written to
+        image_store: ImageStore the DB rows reference (defaults to get_image_store())
+        max_queue: Pending alert frames kept in memory before new ones are dropped
+        batch_size: Maximum alert frames per executemany() batch
+        reconnect_interval: Seconds to wait before retrying a failed DB connection
+        encoder: JpegEncoder for alert images (defaults to full resolution at quality 95)
+    """
+
+    def __init__(self, db_config=None, alert_dir="captured_alerts", image_store=None, max_queue=32,
+                 batch_size=16, reconnect_interval=10.0, encoder=None):
+        self.db_config = db_config
+        self.encoder = encoder or JpegEncoder(quality=95)
+        self.image_store = image_store or get_image_store()
+        self.alert_dir = Path(alert_dir)
+        self.alert_dir.mkdir(exist_ok=True)
+        self.capture_index = get_capture_index(self.alert_dir)
+        self.batch_size = batch_size
+        self.reconnect_interval = reconnect_interval
+        # Dashboard rollups are updated in the insert transaction (off if the tables are missing)
+        self.rollups = True
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        self.db_errors = 0
+
+        self.cnx = None
+        self._last_connect_attempt = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="alert-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        metrics.QUEUE_DEPTH.labels('alerts').set_function(self.queue.qsize)
+
+    def submit(self, frame, alerts, timestamp=None):
+        """
+        Queue the alerts raised on one frame for writing; never blocks
+
+        Args:
+            frame: Annotated frame, encoded once for all of its alerts
+            alerts: (object_class, confidence, distance, track_id) per alerting track
+
+        Returns:
+            Paths the images will be written to, one per alert, or None if the frame was dropped
+        """
+        if self._closed:
+            return None
+        timestamp = timestamp or time.time()
+        # The track id keeps two tracks alerting in the same second at the same distance apart
+        rows = [(object_class, float(confidence), float(distance),
+                 self.alert_dir / f"alert_{int(timestamp)}_{distance:.1f}m_{int(track_id)}.jpg")
+                for object_class, confidence, distance, track_id in alerts]
+        if not rows:
+            return []
+        try:
+            # Copy: the caller keeps drawing on its frame after we return
+            self.queue.put_nowait((frame.copy(), timestamp, rows))
+        except queue.Full:
+            self.dropped += len(rows)
+            metrics.ALERTS.labels('dropped').inc(len(rows))
+            print(f"⚠ Alert queue full, dropped {len(rows)} alert(s) ({self.dropped} dropped so far)")
+            return None
+        return [save_path for *_, save_path in rows]
+
+    def close(self, timeout=5.0):
+        """Flush pending alerts and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self.cnx is not None and self.cnx.is_connected():
+            self.cnx.close()
+
+    def stats(self):
+        return {
+            "pending": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "db_errors": self.db_errors,
+            "db_connected": self.cnx is not None and self.cnx.is_connected(),
+        }
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            stop = item is _STOP
+            batch = [] if stop else [item]
+            # Drain whatever else is waiting so it goes out in one transaction
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    continue
+                batch.append(item)
+            if batch:
+                self._write_batch(batch)
+            if stop and self.queue.empty():
+                return
+
+    def _write_batch(self, batch):
+        rows = []
+        for frame, timestamp, alerts in batch:
+            t0 = time.perf_counter()
+            img_bytes = self.encoder.encode(frame)
+            if img_bytes is None:
+                continue
+            try:
+                image_key = self.image_store.put(img_bytes)
+            except OSError as e:
+                print(f"⚠ Could not store alert image: {e}")
+                continue
+            for object_class, confidence, distance, save_path in alerts:
+                try:
+                    save_path.write_bytes(img_bytes)
+                    self.capture_index.add(save_path, len(img_bytes))
+                except OSError as e:
+                    print(f"⚠ Could not save alert image {save_path}: {e}")
+                    continue
+                rows.append((datetime.fromtimestamp(timestamp), object_class, confidence, distance,
+                             str(save_path), image_key, len(img_bytes)))
+            metrics.ALERT_WRITE.observe(time.perf_counter() - t0)
+        self.written += len(rows)
+        metrics.ALERTS.labels('written').inc(len(rows))
+
+        if rows and self._connect():
+            try:
+                with metrics.DB_INSERT.time():
+                    self._insert(rows)
+            except mysql.connector.Error as err:
+                self.db_errors += 1
+                metrics.ALERTS.labels('db_error').inc(len(rows))
+                print(f"⚠ Error logging {len(rows)} alert(s) to DB: {err}")
+
+    def _insert(self, rows):
+        cursor = self.cnx.cursor()
+        try:
+            cursor.executemany(INSERT_ALERT, rows)
+            if self.rollups:
+                record_alerts(cursor, [(row[0], row[3]) for row in rows])
+            self.cnx.commit()
+        except mysql.connector.Error as err:
+            self.cnx.rollback()
+            if not (self.rollups and err.errno == errorcode.ER_NO_SUCH_TABLE):
+                raise
+            # Database predates the rollup tables: keep logging alerts without them
+            print(f"⚠ Rollup tables missing ({err.msg}); run 'python db_setup.py --rollups'")
+            self.rollups = False
+            cursor.executemany(INSERT_ALERT, rows)
+            self.cnx.commit()
+        finally:
+            cursor.close()
+
+    def _connect(self):
+        if self.db_config is None:
+            return False
+        if self.cnx is not None and self.cnx.is_connected():
+            return True
+        if time.time() - self._last_connect_attempt < self.reconnect_interval:
+            return False
+        self._last_connect_attempt = time.time()
+        try:
+            self.cnx = mysql.connector.connect(**self.db_config)
+            print("✓ Alert writer connected to MySQL database")
+            return True
+        except mysql.connector.Error as err:
+            print(f"⚠ Warning: Could not connect to database: {err}")
+            self.cnx = None
+            return False
@@ -0,0 +1,103 @@
+"""
+Fan-out of encoded frames to many /video_feed clients.
+
+The pipeline publishes each JPEG once into a small ring buffer and every
+connected client reads from it at its own pace. A client that falls more
+than `max_lag` frames behind jumps straight to the newest frame, so a slow
+viewer skips frames instead of slowing down the producer or other viewers.
+"""
+
+import itertools
+import threading
+
+
+class FrameBroadcaster:
+    """Single-producer, multi-consumer ring buffer of encoded frames"""
+
+    def __init__(self, size=8, max_lag=2):
+        self.size = size
+        self.max_lag = min(max_lag, size - 1)
+        self.seq = 0  # sequence number of the newest published frame
+        self.closed = False
+        self._ring = [None] * size
+        self._cond = threading.Condition()
+        self._subscribers = {}
+        self._ids = itertools.count(1)
+
+    def publish(self, frame):
+        with self._cond:
+            self.seq += 1
+            self._ring[self.seq % self.size] = frame
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def subscribe(self):
+        with self._cond:
+            sub = Subscriber(self, next(self._ids), self.seq)
+            self._subscribers[sub.id] = sub
+            return sub
+
+    def latest(self):
+        with self._cond:
+            return self._ring[self.seq % self.size] if self.seq else None
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def _unsubscribe(self, sub):
+        with self._cond:
+            self._subscribers.pop(sub.id, None)
+
+    def stats(self):
+        with self._cond:
+            clients = [s.as_dict() for s in self._subscribers.values()]
+        return {
+            "published": self.seq,
+            "subscribers": len(clients),
+            "clients": clients,
+        }
+
+
+class Subscriber:
+    """One client's read position in a FrameBroadcaster"""
+
+    def __init__(self, broadcaster, sub_id, start_seq):
+        self.broadcaster = broadcaster
+        self.id = sub_id
+        self.last_seq = start_seq
+        self.sent = 0
+        self.skipped = 0
+
+    def next(self, timeout=2.0):
+        """Block until a newer frame is available; None on timeout or close"""
+        b = self.broadcaster
+        with b._cond:
+            b._cond.wait_for(lambda: b.seq > self.last_seq or b.closed, timeout)
+            if b.seq <= self.last_seq:
+                return None
+            lag = b.seq - self.last_seq
+            if lag > b.max_lag:
+                # Too far behind: drop the backlog and show the newest frame
+                self.skipped += lag - 1
+                self.last_seq = b.seq
+            else:
+                self.last_seq += 1
+            self.sent += 1
+            return b._ring[self.last_seq % b.size]
+
+    def close(self):
+        self.broadcaster._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def as_dict(self):
+        return {"id": self.id, "sent": self.sent, "skipped": self.skipped}
@@ -0,0 +1,111 @@
+"""
+Short-lived result cache for the dashboard endpoints.
+
+    @ttl_cache(5)
+    async def admin_stats():
+        return await db.fetch_one(ADMIN_STATS_QUERY)
+
+Works on sync and async functions. Results are cached per argument tuple for
+ttl seconds. When an async entry expires, concurrent callers share one
+recomputation instead of each querying the database. Exceptions are not
+cached.
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Dict of values that expire ttl seconds after they were set
+
+    Args:
+        ttl: Seconds a value stays valid
+        maxsize: Entries kept; expired entries, then the oldest, are evicted beyond it
+    """
+
+    def __init__(self, ttl, maxsize=128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}  # key -> (expires_at, value), in insertion order
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """(True, value) for a live entry, else (False, None)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > time.monotonic():
+                self.hits += 1
+                return True, item[1]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                self._data = {k: v for k, v in self._data.items() if v[0] > now}
+                while len(self._data) >= self.maxsize:
+                    del self._data[next(iter(self._data))]
+            self._data[key] = (now + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _make_key(args, kwargs):
+    return args + tuple(sorted(kwargs.items())) if kwargs else args
+
+
+def ttl_cache(ttl, maxsize=128):
+    """Decorator caching a function's results for ttl seconds (see module docstring)"""
+
+    def decorator(fn):
+        cache = TTLCache(ttl, maxsize)
+
+        if inspect.iscoroutinefunction(fn):
+            inflight = {}
+
+            def finish(key, task):
+                inflight.pop(key, None)
+                if not task.cancelled() and task.exception() is None:
+                    cache.set(key, task.result())
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                key = _make_key(args, kwargs)
+                hit, value = cache.get(key)
+                if hit:
+                    return value
+                task = inflight.get(key)
+                if task is None:
+                    task = asyncio.ensure_future(fn(*args, **kwargs))
+                    inflight[key] = task
+                    task.add_done_callback(functools.partial(finish, key))
+                # A cancelled caller must not cancel the computation the others wait on
+                return await asyncio.shield(task)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                key = _make_key(args, kwargs)
+                hit, value = cache.get(key)
+                if hit:
+                    return value
+                value = fn(*args, **kwargs)
+                cache.set(key, value)
+                return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
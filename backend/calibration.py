@@ -0,0 +1,141 @@
+"""
+Camera calibration profiles and per-class width priors for distance estimates.
+
+The detectors estimate distance with the pinhole model,
+distance = real width * focal length / box width. The focal length depends
+on the camera and the resolution it is run at, and the real width depends on
+the class. A bus is about 40% wider than a car. Treating every class as a
+1.8 m car makes buses and trucks look closer than they are, which raises
+false proximity alerts.
+
+A CameraProfile is a JSON file that stores:
+
+    {"name": "dashcam", "focal_length": 1012.4, "resolution": [1280, 720],
+     "method": "checkerboard", "class_widths": {"truck": 2.45}}
+
+focal_length is in pixels at the given resolution. When frames arrive at
+another width, it is scaled linearly. A profile without a resolution is used
+as-is. class_widths overrides entries of CLASS_WIDTHS. Profiles are written
+by scripts/calibrate_camera.py, live in calibration/, and are selected with
+CAMERA_PROFILE (a name in calibration/ or a path). scripts/validate_distance.py
+checks a profile against a labeled distance set.
+
+width_lookup() turns the priors into an array indexed by class id.
+FrameDetections then computes every distance in a frame with a single
+indexed divide.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from backend.postprocess import NO_DISTANCE
+
+PROFILE_DIR = Path(__file__).resolve().parent.parent / 'calibration'
+
+DEFAULT_FOCAL_LENGTH = 1000.0  # pixels; the uncalibrated value the detectors shipped with
+DEFAULT_WIDTH = 1.8            # meters, used for classes without a prior
+
+# Typical rear / frontal width in meters of the classes in dataset/data.yaml
+CLASS_WIDTHS = {
+    'person': 0.5,
+    'bike': 0.6,
+    'car': 1.8,
+    'motor': 0.8,
+    'bus': 2.55,
+    'train': 3.0,
+    'truck': 2.5,
+    'scooter': 0.7,
+    'other_vehicle': 2.0,
+    'vehicle': 1.8,
+}
+
+
+class CameraProfile:
+    """
+    Focal length and class widths for one camera
+
+    Args:
+        name: Profile name (the file stem in calibration/)
+        focal_length: Focal length in pixels at `resolution`
+        resolution: (width, height) the focal length was measured at, None to never rescale
+        class_widths: Per-class width overrides in meters, merged over CLASS_WIDTHS
+        method: How the focal length was obtained ('checkerboard', 'known_distance', ...)
+    """
+
+    def __init__(self, name='default', focal_length=DEFAULT_FOCAL_LENGTH, resolution=None, class_widths=None,
+                 method=None):
+        if focal_length <= 0:
+            raise ValueError(f"Focal length must be positive, got {focal_length}")
+        self.name = name
+        self.focal_length = float(focal_length)
+        self.resolution = tuple(int(v) for v in resolution) if resolution else None
+        self.class_widths = {**CLASS_WIDTHS, **(class_widths or {})}
+        self.method = method
+
+    def focal_for(self, frame_width):
+        """Focal length in pixels for frames frame_width pixels wide"""
+        if self.resolution is None or not frame_width:
+            return self.focal_length
+        return self.focal_length * frame_width / self.resolution[0]
+
+    def width_lookup(self, names):
+        """Float32 array indexed by class id: real width in meters of each class in names"""
+        items = names.items() if isinstance(names, dict) else enumerate(names)
+        ids = dict(items)
+        lut = np.full(max(ids) + 1 if ids else 0, DEFAULT_WIDTH, dtype=np.float32)
+        for i, name in ids.items():
+            lut[i] = self.class_widths.get(name, DEFAULT_WIDTH)
+        return lut
+
+    def distance(self, bbox_width_px, class_name='car', frame_width=None):
+        """Distance in meters for a single box (NO_DISTANCE for degenerate boxes)"""
+        if bbox_width_px <= 0:
+            return NO_DISTANCE
+        width = self.class_widths.get(class_name, DEFAULT_WIDTH)
+        return width * self.focal_for(frame_width) / bbox_width_px
+
+    def to_dict(self):
+        data = {"name": self.name, "focal_length": round(self.focal_length, 2),
+                "resolution": list(self.resolution) if self.resolution else None, "method": self.method}
+        overrides = {k: v for k, v in self.class_widths.items() if CLASS_WIDTHS.get(k) != v}
+        if overrides:
+            data["class_widths"] = overrides
+        return data
+
+    def save(self, path=None):
+        path = Path(path) if path else PROFILE_DIR / f"{self.name}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2) + '\n')
+        return path
+
+    @classmethod
+    def load(cls, path):
+        data = json.loads(Path(path).read_text())
+        return cls(name=data.get('name', Path(path).stem), focal_length=data['focal_length'],
+                   resolution=data.get('resolution'), class_widths=data.get('class_widths'),
+                   method=data.get('method'))
+
+    def stats(self):
+        return {"profile": self.name, "focal_length": round(self.focal_length, 1),
+                "resolution": self.resolution, "method": self.method}
+
+
+def load_profile(spec=None):
+    """
+    Profile named by spec or CAMERA_PROFILE: a path, or a name in calibration/
+
+    Without either, returns the uncalibrated default (1000 px, no rescaling). That
+    default still applies the per-class width priors.
+    """
+    spec = spec or os.getenv('CAMERA_PROFILE')
+    if not spec:
+        return CameraProfile()
+    path = Path(spec)
+    if not path.exists():
+        path = PROFILE_DIR / f"{spec}.json"
+    if not path.exists():
+        raise FileNotFoundError(f"Camera profile '{spec}' not found; run scripts/calibrate_camera.py first")
+    return CameraProfile.load(path)
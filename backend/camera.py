@@ -1,13 +1,9 @@
 
 
 
-import cv2
 import time
 import pathlib
 import torch
-import numpy as np
-import mysql.connector
-from datetime import datetime
 from pathlib import Path
 import sys
 import os
@@ -26,148 +22,269 @@ if not hasattr(__main__, 'WindowsPath'):
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../yolov5_official')))
 
-from models.common import DetectMultiBackend
 from utils.general import (check_img_size, non_max_suppression, scale_boxes)
-from utils.plots import Annotator, colors
 from utils.torch_utils import select_device
 
+from backend import metrics
+from backend.alert_sink import AlertSink
+from backend.calibration import load_profile
+from backend.db import db_config
+from backend.encoder import stream_encoder
+from backend.model import load_model
+from backend.motion import MotionGate
+from backend.pipeline import REPEAT, FramePipeline, open_capture
+from backend.postprocess import ALERT_DISTANCE, FrameDetections, annotate, class_lookup
+from backend.preprocess import Letterbox
+from backend.roi import RoiPlanner, offset_boxes
+from backend.scheduler import DEFAULT_SIZES, AdaptiveScheduler
+from backend.tracker import Tracker
+
 class VideoCamera:
-    def __init__(self, weights='yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt'):
-        self.weights = weights
+    def __init__(self, weights=None, headless=False, backend=None, threads=None, adaptive=None, source=None,
+                 roi=None, motion_gate=None, profile=None):
+        # MODEL_WEIGHTS can point at an exported artifact, e.g. the INT8 .onnx from scripts/quantize_model.py
+        self.weights = weights or os.getenv('MODEL_WEIGHTS', 'yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt')
+        # Inference backend ('pytorch', 'onnx', 'openvino'), see backend/model.py
+        self.backend = backend or os.getenv('MODEL_BACKEND', 'pytorch')
+        self.threads = threads or (int(os.getenv('MODEL_THREADS')) if os.getenv('MODEL_THREADS') else None)
+        # Headless: never draw on frames; otherwise draw only while a viewer is subscribed
+        self.headless = headless
         self.conf_thres = 0.25
         self.iou_thres = 0.45
         self.img_size = 640
         
         # Load model
-        self.device = select_device('')
-        self.model = DetectMultiBackend(self.weights, device=self.device, dnn=False, data=None, fp16=False)
+        self.device = select_device('') if self.backend == 'pytorch' else torch.device('cpu')
+        self.model = load_model(self.weights, self.device, backend=self.backend, threads=self.threads)
         self.stride, self.names, self.pt = self.model.stride, self.model.names, self.model.pt
-        self.imgsz = check_img_size(self.img_size, s=self.stride)
+        self.imgsz = getattr(self.model, 'input_size', None) or check_img_size(self.img_size, s=self.stride)
         self.model.warmup(imgsz=(1, 3, self.imgsz, self.imgsz))
+        self.letterbox = Letterbox(self.imgsz, device=self.device, fp16=self.model.fp16)
+
+        # Adaptive resolution / frame skipping, enabled with ADAPTIVE_INFERENCE=1 (see backend/scheduler.py)
+        if adaptive is None:
+            adaptive = os.getenv('ADAPTIVE_INFERENCE', '0') == '1'
+        self.scheduler = None
+        if adaptive:
+            sizes = {self.imgsz}
+            if self.pt:  # exported models have a fixed input shape
+                sizes |= {check_img_size(s, s=self.stride) for s in DEFAULT_SIZES if s < self.imgsz}
+            self.letterboxes = {s: Letterbox(s, device=self.device, fp16=self.model.fp16) for s in sizes}
+            self.letterboxes[self.imgsz] = self.letterbox
+            self.scheduler = AdaptiveScheduler(sizes, target_fps=float(os.getenv('TARGET_FPS', 30)))
+
+        # Lane ROI crops, e.g. ROI=band:0.35,0.9 with a full frame every ROI_FULL_EVERY frames (see backend/roi.py)
+        roi = roi if roi is not None else os.getenv('ROI')
+        self.roi_size = int(os.getenv('ROI_SIZE')) if os.getenv('ROI_SIZE') else None
+        self.roi = None
+        if roi:
+            self.roi = RoiPlanner(roi, full_every=int(os.getenv('ROI_FULL_EVERY', 10)), stride=int(self.stride),
+                                  fixed_input=None if self.pt else self.imgsz)
+
+        # Skip detection on static scenes, enabled with MOTION_GATE=1 (see backend/motion.py)
+        if motion_gate is None:
+            motion_gate = os.getenv('MOTION_GATE', '0') == '1'
+        self.motion_gate = MotionGate(max_stale=float(os.getenv('MOTION_MAX_STALE', 1.0))) if motion_gate else None
         
-        # Camera
-        print("Attempting to open camera...")
-        self.cap = cv2.VideoCapture(0)
-        
-        # CRITICAL: Validate camera opened successfully
-        if not self.cap.isOpened():
-            print("❌ Error: Could not open video device 0. Trying device 1...")
-            self.cap = cv2.VideoCapture(1)
-            if not self.cap.isOpened():
-                raise RuntimeError("Could not open any video camera. Please check permissions.")
-        
-        print(f"✓ Camera opened successfully: {self.cap.getBackendName()}")
+        # Camera: a device index, stream URL or video file (CAMERA_SOURCE), default device 0
+        self.cap = open_capture(source if source is not None else os.getenv('CAMERA_SOURCE', '0'))
         
         # Alert System
-        self.last_alert_time = 0
-        self.alert_cooldown = 3.0
+        self.alert_cooldown = 3.0  # per track
         self.alert_dir = Path("captured_alerts")
-        self.alert_dir.mkdir(exist_ok=True)
         
-        # Distance Constants
-        self.FOCAL_LENGTH = 1000 
-        self.KNOWN_WIDTH = 1.8
+        # Focal length and per-class widths from CAMERA_PROFILE (see backend/calibration.py)
+        self.calibration = load_profile(profile)
+        self.width_lut = self.calibration.width_lookup(self.names)
+        self.alert_distance = ALERT_DISTANCE
+        self.vehicle_lut = class_lookup(self.names)
+        self.last_result = None
+        self.tracker = Tracker(alert_distance=self.alert_distance, alert_cooldown=self.alert_cooldown)
         
         # Database
-        self.db_config = {
-            'user': os.getenv('DB_USER', 'root'),
-            'password': os.getenv('DB_PASSWORD', 'Anurag*29'),
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': int(os.getenv('DB_PORT', 3306)),
-            'database': os.getenv('DB_NAME', 'car'),
-            'connection_timeout': 5
-        }
-        self.cnx = None
-        self.cursor = None
-        self.connect_db()
-
-    def connect_db(self):
-        try:
-            self.cnx = mysql.connector.connect(**self.db_config)
-            self.cursor = self.cnx.cursor()
-            print("✓ Connected to MySQL database")
-        except mysql.connector.Error as err:
-            print(f"⚠ Warning: Could not connect to database: {err}")
-            self.cnx = None
+        self.db_config = db_config()
+        # Image encoding, file writes and DB inserts happen on the sink's own thread
+        self.alert_sink = AlertSink(self.db_config, self.alert_dir)
+        # Stream JPEGs: downscaled preview at STREAM_JPEG_QUALITY (alerts keep full resolution)
+        self.encoder = stream_encoder()
+
+        # Seconds spent in each stage for the most recent frame
+        self.last_timings = {}
+
+        # Capture / inference / encode run on their own threads (see start())
+        self.pipeline = None
+        self._subscriber = None
+        self._frames = metrics.FRAMES.labels('api')
+        self._register_gauges()
+
+    def _register_gauges(self):
+        """Queue depth, drops, clients and FPS, read from the live pipeline at scrape time"""
+        pipeline = lambda: self.pipeline
+        for name in ('raw_frames', 'processed_frames'):
+            metrics.QUEUE_DEPTH.labels(name).set_function(lambda n=name: len(getattr(pipeline(), n)))
+            metrics.DROPPED_FRAMES.labels(name).set_function(lambda n=name: getattr(pipeline(), n).dropped)
+        metrics.STREAM_CLIENTS.set_function(lambda: pipeline().broadcaster.subscriber_count)
+        metrics.OUTPUT_FPS.set_function(lambda: pipeline().output_rate.rate())
 
     def __del__(self):
-        if self.cap.isOpened():
+        if self.pipeline:
+            self.pipeline.stop()
+        if self.cap is not None and self.cap.isOpened():
             self.cap.release()
-        if self.cnx and self.cnx.is_connected():
-            self.cursor.close()
-            self.cnx.close()
+        self.alert_sink.close()
+
+    def estimate_distance(self, bbox_width_px, class_name='car', frame_width=None):
+        return self.calibration.distance(bbox_width_px, class_name, frame_width)
+
+    def start(self):
+        """Start the capture / inference / encode pipeline threads"""
+        if self.pipeline is None or not self.pipeline.running:
+            self.pipeline = FramePipeline(self.read, self.process_frame, self.encode)
+            self.pipeline.start()
+        return self.pipeline
+
+    def stop(self):
+        if self.pipeline:
+            self.pipeline.stop()
 
-    def estimate_distance(self, bbox_width_px):
-        if bbox_width_px <= 0: return 999.0
-        return (self.KNOWN_WIDTH * self.FOCAL_LENGTH) / bbox_width_px
+    def is_open(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def stats(self):
+        stats = self.pipeline.stats() if self.pipeline else {"running": False}
+        stats["alert_writer"] = self.alert_sink.stats()
+        stats["tracker"] = self.tracker.stats()
+        stats["encoder"] = self.encoder.stats()
+        stats["calibration"] = self.calibration.stats()
+        if self.scheduler:
+            stats["scheduler"] = self.scheduler.stats()
+        if self.roi:
+            stats["roi"] = self.roi.stats()
+        if self.motion_gate:
+            stats["motion_gate"] = self.motion_gate.stats()
+        return stats
+
+    def subscribe(self):
+        """Subscribe a stream client to the shared encoded-frame broadcast"""
+        return self.start().subscribe()
 
     def get_frame(self):
+        """Return the next encoded JPEG produced by the pipeline"""
+        if self._subscriber is None or self._subscriber.broadcaster is not self.start().broadcaster:
+            self._subscriber = self.subscribe()
+        return self._subscriber.next()
+
+    def read(self):
         success, frame = self.cap.read()
         if not success:
             return None
+        return frame
 
-        original_frame = frame.copy()
-        
-        # Preprocess
-        img = cv2.resize(frame, (self.imgsz, self.imgsz))
-        img = img.transpose((2, 0, 1))[::-1]
-        img = np.ascontiguousarray(img)
-        img = torch.from_numpy(img).to(self.device)
-        img = img.half() if self.model.fp16 else img.float()
-        img /= 255.0
-        if len(img.shape) == 3:
-            img = img[None]
+    def encode(self, frame):
+        t0 = time.perf_counter()
+        jpeg = self.encoder.encode(frame)
+        self.last_timings['encode'] = time.perf_counter() - t0
+        return jpeg
+
+    def latest_detections(self):
+        """Structured detections from the most recent processed frame"""
+        result = self.last_result
+        if result is None:
+            return []
+        return result.as_dicts(self.names, distances=True)
+
+    def has_viewers(self):
+        return self.pipeline is not None and self.pipeline.broadcaster.subscriber_count > 0
+
+    def detect(self, frame):
+        """
+        Detections for frame (n x 6, frame pixels), run or carried forward per the scheduler
+
+        Returns:
+            (det, detect_time) - detect_time is None when the boxes were carried forward
+        """
+        letterbox = self.letterbox
+        imgsz = self.imgsz
+        if self.scheduler:
+            imgsz = self.scheduler.next()
+            if imgsz is None:
+                self.last_timings.update(preprocess=0.0, inference=0.0, nms=0.0)
+                return self.tracker.coast(frame.shape), None
+            letterbox = self.letterboxes[imgsz]
+
+        t0 = time.perf_counter()
+        # Preprocess (only the ROI crop on most frames in ROI mode)
+        rect = self.roi.next(frame.shape) if self.roi else None
+        src = frame
+        if rect is not None:
+            src = frame[rect[1]:rect[3], rect[0]:rect[2]]
+            letterbox = self.roi.letterbox(src.shape, frame.shape, min(imgsz, self.roi_size or imgsz),
+                                           self.device, self.model.fp16)
+        img = letterbox(src)
+        if self.roi:
+            self.roi.record(img.shape[2:], imgsz)
+        t1 = time.perf_counter()
 
         # Inference
         pred = self.model(img, augment=False, visualize=False)
+        t2 = time.perf_counter()
         pred = non_max_suppression(pred, self.conf_thres, self.iou_thres, None, False, max_det=1000)
-        
-        # Process
+
         det = pred[0]
         if len(det):
-            det[:, :4] = scale_boxes(img.shape[2:], det[:, :4], original_frame.shape).round()
-            annotator = Annotator(original_frame, line_width=2, example=str(self.names))
-            
-            for *xyxy, conf, cls in reversed(det):
-                c = int(cls)
-                label = f'{self.names[c]} {conf:.2f}'
-                annotator.box_label(xyxy, label, color=colors(c, True))
-                
-                # Alert Logic
-                if self.names[c] in ['car', 'truck', 'bus', 'vehicle']:
-                    bbox_w = xyxy[2] - xyxy[0]
-                    dist = self.estimate_distance(float(bbox_w))
-                    
-                    dist_label = f"{dist:.1f}m"
-                    annotator.box_label([xyxy[0], xyxy[1]-20, xyxy[2], xyxy[1]], dist_label, color=(0, 255, 255))
-                    
-                    if dist < 50.0:
-                        cv2.putText(original_frame, "WARNING: PROXIMITY ALERT!", (50, 100), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 3)
-                        
-                        current_time = time.time()
-                        if current_time - self.last_alert_time > self.alert_cooldown:
-                            self.last_alert_time = current_time
-                            
-                            # Save and Log
-                            img_name = f"alert_{int(current_time)}_{dist:.1f}m.jpg"
-                            save_path = self.alert_dir / img_name
-                            cv2.imwrite(str(save_path), original_frame)
-                            
-                            if self.cnx and self.cnx.is_connected():
-                                try:
-                                    _, img_encoded = cv2.imencode('.jpg', original_frame)
-                                    img_bytes = img_encoded.tobytes()
-                                    add_alert = ("INSERT INTO alerts "
-                                                 "(timestamp, object_class, confidence, distance, image_path, image_data) "
-                                                 "VALUES (%s, %s, %s, %s, %s, %s)")
-                                    alert_data = (datetime.now(), self.names[c], float(conf), dist, str(save_path), img_bytes)
-                                    self.cursor.execute(add_alert, alert_data)
-                                    self.cnx.commit()
-                                except mysql.connector.Error as err:
-                                    print(f"DB Error: {err}")
-
-            original_frame = annotator.result()
-
-        ret, jpeg = cv2.imencode('.jpg', original_frame)
-        return jpeg.tobytes()
+            det[:, :4] = scale_boxes(img.shape[2:], det[:, :4], src.shape,
+                                     ratio_pad=letterbox.ratio_pad[0]).round()
+            offset_boxes(det, rect)
+        t3 = time.perf_counter()
+        self.last_timings.update(preprocess=t1 - t0, inference=t2 - t1, nms=t3 - t2)
+        metrics.PREPROCESS.observe(t1 - t0)
+        metrics.INFERENCE.observe(t2 - t1)
+        metrics.NMS.observe(t3 - t2)
+        return det, t3 - t0
+
+    def process_frame(self, frame, draw=None):
+        """
+        Run detection and alert logic on a frame, returning the (optionally annotated) frame
+
+        With the motion gate on, a static frame returns pipeline.REPEAT instead: the last
+        detections stand and the stream re-sends its last JPEG.
+        """
+        if draw is None:
+            draw = not self.headless and self.has_viewers()
+
+        if self.motion_gate is not None and self.last_result is not None and not self.motion_gate.check(frame):
+            self.last_timings = {'motion_gate': self.motion_gate.last_cost}
+            self._frames.inc()
+            return REPEAT
+
+        det, detect_time = self.detect(frame)
+        t0 = time.perf_counter()
+        result = FrameDetections(det, self.vehicle_lut, self.width_lut, self.calibration.focal_for(frame.shape[1]),
+                                 self.alert_distance)
+        current_time = time.time()
+        self.tracker.update(result, current_time, coasted=detect_time is None)
+        self.last_result = result
+        if self.scheduler and detect_time is not None:
+            self.scheduler.update(detect_time, result.nearest)
+
+        original_frame = frame
+        if draw and len(result):
+            with metrics.ANNOTATION.time():
+                original_frame = annotate(frame, result, self.names)
+
+        # Alert Logic: log each hazardous track, at most once per cooldown
+        due = self.tracker.due_alerts(result, current_time) if result.alert else ()
+        if len(due):
+            # Save and Log (off the inference thread); annotate lazily if nobody is watching
+            alert_frame = original_frame if draw else annotate(frame, result, self.names)
+            self.alert_sink.submit(alert_frame, [(self.names[int(result.cls[i])], result.conf[i],
+                                                  float(result.distance[i]), result.track_id[i]) for i in due],
+                                   current_time)
+
+        if draw and self.roi:
+            # After the alert images were queued (submit() copies the frame)
+            self.roi.draw(original_frame)
+
+        self.last_timings['postprocess'] = time.perf_counter() - t0
+        self._frames.inc()
+        return original_frame
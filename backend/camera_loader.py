@@ -0,0 +1,109 @@
+"""
+Background start-up of the camera and model for the API.
+
+Building a VideoCamera imports torch and the YOLOv5 code, loads and warms up
+the weights and opens the camera, which together take seconds. If the first
+/video_feed request did that itself, it would block. CameraLoader instead
+runs the camera factory on a daemon thread that is started with the app. The
+API answers at once, and /camera/status reports the state: 'idle',
+'loading', 'ready' or 'failed'.
+
+A failed start is retried with exponential back-off, from
+CAMERA_RETRY_INITIAL seconds doubling up to CAMERA_RETRY_MAX. Requests made
+in between get a 503 straight away instead of triggering another attempt
+each.
+"""
+
+import os
+import threading
+import time
+
+from backend import metrics
+
+STATES = ('idle', 'loading', 'ready', 'failed')
+
+
+class CameraLoader:
+    """
+    Build a camera once, off the request path
+
+    Args:
+        factory: Callable returning the camera (a VideoCamera); heavy imports belong inside it
+        initial_backoff: Seconds before the first retry after a failure
+        max_backoff: Upper bound for the doubling retry delay
+    """
+
+    def __init__(self, factory, initial_backoff=None, max_backoff=None):
+        self.factory = factory
+        self.initial_backoff = initial_backoff or float(os.getenv('CAMERA_RETRY_INITIAL', 5))
+        self.max_backoff = max_backoff or float(os.getenv('CAMERA_RETRY_MAX', 300))
+
+        self.camera = None
+        self.state = 'idle'
+        self.error = None
+        self.failures = 0  # consecutive failed attempts
+        self.load_seconds = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+        metrics.CAMERA_STATE.set_function(lambda: STATES.index(self.state))
+
+    def start(self):
+        """Start loading in the background, unless loaded, loading or still backing off"""
+        with self._lock:
+            if self.state in ('loading', 'ready'):
+                return
+            if self.state == 'failed' and time.monotonic() < self._retry_at:
+                return
+            self.state = 'loading'
+            self._thread = threading.Thread(target=self._load, name="camera-loader", daemon=True)
+            self._thread.start()
+
+    def _load(self):
+        print("🎥 Initializing camera system...")
+        t0 = time.monotonic()
+        try:
+            camera = self.factory()
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                backoff = min(self.initial_backoff * 2 ** (self.failures - 1), self.max_backoff)
+                self._retry_at = time.monotonic() + backoff
+                self.error = f"{type(e).__name__}: {e}"
+                self.state = 'failed'
+            print(f"❌ Camera initialization failed: {e} (next attempt in {backoff:.0f}s)")
+            return
+        with self._lock:
+            self.camera = camera
+            self.load_seconds = time.monotonic() - t0
+            self.failures = 0
+            self.error = None
+            self.state = 'ready'
+        print(f"✅ Camera system ready ({self.load_seconds:.1f}s)")
+
+    def get(self):
+        """The camera if it is ready, else None; starts a (re)load when one is due"""
+        if self.camera is None:
+            self.start()
+        return self.camera
+
+    def wait(self, timeout=None):
+        """Block until the current load attempt finishes; the camera or None"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.camera
+
+    def stop(self):
+        if self.camera is not None:
+            self.camera.stop()
+
+    def status(self):
+        retry_in = max(0.0, self._retry_at - time.monotonic()) if self.state == 'failed' else None
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "error": self.error,
+            "retry_in": round(retry_in, 1) if retry_in is not None else None,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+        }
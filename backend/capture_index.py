@@ -0,0 +1,227 @@
+"""
+In-memory index of captured alert images.
+
+The capture directory is scanned once; after that the index is kept current
+by the alert writer calling add() directly, by watchdog filesystem events
+when watchdog is installed, and otherwise by re-listing the directory when
+its mtime changes and stat()ing only the captures that are new since the last
+listing. Entries are kept sorted by (timestamp, filename)
+so listing the newest N, counting since a time and finding the latest are
+O(log N + N_returned) instead of a glob + stat of every file per request.
+"""
+
+import bisect
+import os
+import threading
+from pathlib import Path
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+
+def parse_capture_name(name):
+    """Parse 'alert_1763879533_13.1m_4.jpg' (track id optional) into (timestamp, distance); None if not a capture"""
+    if not (name.startswith("alert_") and name.endswith(".jpg")):
+        return None
+    parts = name[:-4].split("_")
+    if len(parts) < 3:
+        return None
+    try:
+        return int(parts[1]), parts[2]
+    except ValueError:
+        return None
+
+
+class _WatchHandler(FileSystemEventHandler):
+    def __init__(self, index):
+        self.index = index
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.index.add(event.src_path)
+
+    def on_modified(self, event):
+        # A capture seen on create may still be being written; refresh its size
+        if not event.is_directory:
+            self.index.add(event.src_path)
+
+    def on_moved(self, event):
+        self.index.remove(os.path.basename(event.src_path))
+        self.index.add(event.dest_path)
+
+    def on_deleted(self, event):
+        self.index.remove(os.path.basename(event.src_path))
+
+
+class CaptureIndex:
+    """
+    Sorted index of alert captures in one directory
+
+    Args:
+        directory: Directory the alert writer saves captures to
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._keys = []   # sorted (timestamp, filename)
+        self._files = {}  # filename -> capture dict
+        self._lock = threading.Lock()
+        self._seeded = False
+        self._dir_mtime = None
+        self._observer = None
+
+    def start(self):
+        """Seed the index and start watching the directory if watchdog is available"""
+        self.seed()
+        if Observer is not None and self._observer is None and self.directory.exists():
+            self._observer = Observer()
+            self._observer.schedule(_WatchHandler(self), str(self.directory), recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+            print(f"✓ Watching {self.directory} for new captures")
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    def seed(self):
+        """(Re)build the index with a single directory scan"""
+        files = {}
+        if self.directory.exists():
+            mtime = self.directory.stat().st_mtime_ns
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if parse_capture_name(entry.name) is None:
+                        continue
+                    try:
+                        files[entry.name] = self._entry(entry.name, entry.stat().st_size)
+                    except OSError:
+                        continue
+        else:
+            mtime = None
+        keys = sorted((c["timestamp"], name) for name, c in files.items())
+        with self._lock:
+            self._files, self._keys = files, keys
+            self._dir_mtime = mtime
+            self._seeded = True
+
+    def add(self, path, size=None):
+        """Record a new or rewritten capture file"""
+        if not self._seeded:
+            return  # picked up by seed()
+        name = os.path.basename(path)
+        if size is None:
+            try:
+                size = os.stat(os.path.join(self.directory, name)).st_size
+            except OSError:
+                return
+        entry = self._entry(name, size)
+        if entry is None:
+            return
+        with self._lock:
+            if name in self._files:
+                self._keys.remove((self._files[name]["timestamp"], name))
+            self._files[name] = entry
+            bisect.insort(self._keys, (entry["timestamp"], name))
+        # The cached directory mtime is left alone: another process may have written between this
+        # file and now, and the next _refresh() diff picks that up without re-stat()ing this one
+
+    def remove(self, name):
+        with self._lock:
+            entry = self._files.pop(name, None)
+            if entry:
+                i = bisect.bisect_left(self._keys, (entry["timestamp"], name))
+                if i < len(self._keys) and self._keys[i][1] == name:
+                    del self._keys[i]
+
+    def latest(self, limit=20):
+        """Newest captures first"""
+        self._refresh()
+        with self._lock:
+            return [self._files[name] for _, name in reversed(self._keys[-limit:])] if limit > 0 else []
+
+    def count(self):
+        self._refresh()
+        return len(self._keys)
+
+    def count_since(self, timestamp):
+        self._refresh()
+        with self._lock:
+            return len(self._keys) - bisect.bisect_left(self._keys, (timestamp,))
+
+    def latest_timestamp(self):
+        self._refresh()
+        with self._lock:
+            return self._keys[-1][0] if self._keys else 0
+
+    def _entry(self, name, size):
+        parsed = parse_capture_name(name)
+        if parsed is None:
+            return None
+        timestamp, distance = parsed
+        return {
+            "filename": name,
+            "timestamp": timestamp,
+            "distance": distance,
+            "filesize": size,
+            "url": f"/captures/image/{name}",
+        }
+
+    def _refresh(self):
+        """Without a watcher, rescan only when another process changed the directory"""
+        if not self._seeded:
+            self.seed()
+            return
+        if self._observer is not None:
+            return
+        try:
+            mtime = self.directory.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._dir_mtime:
+            self._sync(mtime)
+
+    def _sync(self, mtime):
+        """Apply another process's changes: stat only new captures, drop vanished ones"""
+        if mtime is None:
+            self.seed()
+            return
+        try:
+            with os.scandir(self.directory) as it:
+                names = {entry.name for entry in it if parse_capture_name(entry.name) is not None}
+        except OSError:
+            return
+        with self._lock:
+            known = set(self._files)
+        for name in known - names:
+            self.remove(name)
+        added = []
+        for name in names - known:
+            try:
+                added.append(self._entry(name, os.stat(os.path.join(self.directory, name)).st_size))
+            except OSError:
+                continue
+        with self._lock:
+            for entry in added:
+                if entry["filename"] not in self._files:
+                    self._files[entry["filename"]] = entry
+                    bisect.insort(self._keys, (entry["timestamp"], entry["filename"]))
+            self._dir_mtime = mtime
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_capture_index(directory="captured_alerts"):
+    """Shared CaptureIndex for a directory (one per process)"""
+    key = os.path.abspath(directory)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = CaptureIndex(directory)
+        return _indexes[key]
@@ -0,0 +1,190 @@
+"""
+Shared, non-blocking MySQL access for the API routers.
+
+mysql.connector is a blocking driver, so every query runs on a worker thread
+(anyio.to_thread) and the event loop stays free to serve /video_feed and
+other requests while MySQL works. All routers share one connection pool
+configured from the DB_* environment variables.
+
+Offloaded calls go through their own CapacityLimiter with one token per pool
+connection. Excess requests therefore wait in the event loop, not on a
+thread, and never get a "pool exhausted" error. They also never take tokens
+from Starlette's default thread limiter, which the sync endpoints and the
+MJPEG frame generator depend on.
+
+    from backend.db import get_database
+    rows = await get_database().fetch_all("SELECT ... WHERE id = %s", (alert_id,))
+"""
+
+import os
+import threading
+import time
+
+import anyio
+import mysql.connector
+from mysql.connector import pooling
+
+from backend import metrics
+
+
+class DatabaseUnavailable(Exception):
+    """MySQL could not be reached; the pool is retried after retry_interval"""
+
+
+def db_config():
+    """Connection settings from DB_HOST / DB_PORT / DB_USER / DB_PASSWORD / DB_NAME (no password if unset)"""
+    return {
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', 3306)),
+        'database': os.getenv('DB_NAME', 'car'),
+        'connection_timeout': 5,
+    }
+
+
+def _fetch_all(cnx, query, params):
+    cursor = cnx.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _fetch_one(cnx, query, params):
+    cursor = cnx.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def _execute(cnx, query, params):
+    cursor = cnx.cursor()
+    try:
+        cursor.execute(query, params)
+        cnx.commit()
+        return cursor.lastrowid
+    finally:
+        cursor.close()
+
+
+class Database:
+    """
+    Lazily created MySQL pool with async helpers
+
+    Args:
+        config: mysql.connector.connect() kwargs (defaults to db_config())
+        pool_size: Pooled connections, which is also the concurrent query limit
+            (defaults to DB_POOL_SIZE or 8)
+        pool_name: mysql.connector pool name
+        retry_interval: Seconds before retrying after the pool could not be created
+    """
+
+    def __init__(self, config=None, pool_size=None, pool_name='adas_pool', retry_interval=30.0):
+        self.config = config or db_config()
+        self.pool_size = pool_size or int(os.getenv('DB_POOL_SIZE', 8))
+        self.pool_name = pool_name
+        self.retry_interval = retry_interval
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._last_attempt = -float('inf')
+        self._limiter = None
+
+    @property
+    def limiter(self):
+        # Created on first use, inside the event loop
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.pool_size)
+        return self._limiter
+
+    @property
+    def available(self):
+        return self._pool is not None
+
+    def _get_pool(self):
+        if self._pool is not None:
+            return self._pool
+        with self._pool_lock:
+            if self._pool is None:
+                if time.monotonic() - self._last_attempt < self.retry_interval:
+                    raise DatabaseUnavailable("Database not available")
+                self._last_attempt = time.monotonic()
+                try:
+                    self._pool = pooling.MySQLConnectionPool(pool_name=self.pool_name, pool_size=self.pool_size,
+                                                             **self.config)
+                    print(f"✓ Database pool created ({self.pool_size} connections)")
+                except mysql.connector.Error as err:
+                    metrics.DB_ERRORS.labels('unavailable').inc()
+                    print(f"⚠ MySQL not available: {err}")
+                    raise DatabaseUnavailable(str(err)) from err
+        return self._pool
+
+    def connection(self):
+        """Blocking: a pooled connection (close() returns it). For threads outside the event loop."""
+        try:
+            return self._get_pool().get_connection()
+        except mysql.connector.Error as err:
+            metrics.DB_ERRORS.labels('connect').inc()
+            raise DatabaseUnavailable(str(err)) from err
+
+    def _call(self, fn, args, queued_at):
+        metrics.DB_WAIT.observe(time.perf_counter() - queued_at)
+        cnx = self.connection()
+        try:
+            with metrics.DB_QUERY.labels(fn.__name__.lstrip('_')).time():
+                return fn(cnx, *args)
+        except Exception:
+            metrics.DB_ERRORS.labels('query').inc()
+            try:
+                cnx.rollback()
+            except mysql.connector.Error:
+                pass
+            raise
+        finally:
+            cnx.close()
+
+    async def run(self, fn, *args):
+        """
+        Run fn(connection, *args) on a worker thread and return its result
+
+        The connection goes back to the pool afterwards and is rolled back if fn
+        raised. Raises DatabaseUnavailable when MySQL cannot be reached.
+        """
+        return await anyio.to_thread.run_sync(self._call, fn, args, time.perf_counter(), limiter=self.limiter)
+
+    async def fetch_all(self, query, params=()):
+        return await self.run(_fetch_all, query, params)
+
+    async def fetch_one(self, query, params=()):
+        return await self.run(_fetch_one, query, params)
+
+    async def execute(self, query, params=()):
+        """Execute and commit a statement; returns lastrowid"""
+        return await self.run(_execute, query, params)
+
+    def stats(self):
+        limiter = self._limiter
+        return {
+            "available": self.available,
+            "pool_size": self.pool_size,
+            "in_use": limiter.borrowed_tokens if limiter else 0,
+            "waiting": limiter.statistics().tasks_waiting if limiter else 0,
+        }
+
+
+_database = None
+
+
+def get_database():
+    """Process-wide Database shared by the routers"""
+    global _database
+    if _database is None:
+        _database = Database()
+        metrics.DB_POOL.labels('size').set_function(lambda: _database.pool_size)
+        metrics.DB_POOL.labels('in_use').set_function(lambda: _database.stats()["in_use"])
+        metrics.DB_POOL.labels('waiting').set_function(lambda: _database.stats()["waiting"])
+    return _database
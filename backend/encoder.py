@@ -0,0 +1,111 @@
+"""
+JPEG encoding for the MJPEG stream and alert images.
+
+A preview stream does not need camera resolution or OpenCV's default
+quality of 95. JpegEncoder downsizes frames wider than max_width into a
+buffer that is reused from frame to frame, then encodes at the configured
+quality. libjpeg-turbo (through PyTurboJPEG) is used when
+it is installed; otherwise cv2.imencode is used.
+
+The stream settings come from STREAM_JPEG_QUALITY, STREAM_MAX_WIDTH and
+JPEG_BACKEND (auto / turbojpeg / opencv). scripts/bench_encoder.py reports
+the encode time and bandwidth of each setting.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+try:
+    from turbojpeg import TJPF_BGR, TJSAMP_420, TurboJPEG
+except ImportError:  # optional, pip install PyTurboJPEG (needs libturbojpeg)
+    TurboJPEG = None
+
+BACKENDS = ('auto', 'turbojpeg', 'opencv')
+
+_turbo = None  # one TurboJPEG handle per process (loads the shared library once)
+
+
+def _get_turbo():
+    global _turbo
+    if _turbo is None:
+        if TurboJPEG is None:
+            raise ImportError("PyTurboJPEG is not installed")
+        _turbo = TurboJPEG()
+    return _turbo
+
+
+class JpegEncoder:
+    """
+    BGR frame -> JPEG bytes
+
+    Not thread-safe (the resize buffer is reused); use one encoder per thread.
+
+    Args:
+        quality: JPEG quality (1-100)
+        max_width: Frames wider than this are downscaled first (None keeps full resolution)
+        backend: 'turbojpeg', 'opencv', or 'auto' to prefer turbojpeg when available
+    """
+
+    def __init__(self, quality=80, max_width=None, backend='auto'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown JPEG backend '{backend}', expected one of {list(BACKENDS)}")
+        self.quality = int(quality)
+        self.max_width = max_width or None
+        self._turbo = None
+        if backend != 'opencv':
+            try:
+                self._turbo = _get_turbo()
+            except (ImportError, OSError):  # OSError: libturbojpeg itself is missing
+                if backend == 'turbojpeg':
+                    raise
+        self.backend = 'turbojpeg' if self._turbo is not None else 'opencv'
+        self._params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        self._resized = None
+        self.frames = 0
+        self.bytes = 0
+
+    def resize(self, frame):
+        """frame, or its downscaled copy in the reused buffer if wider than max_width"""
+        h, w = frame.shape[:2]
+        if self.max_width is None or w <= self.max_width:
+            return frame
+        shape = (max(1, round(h * self.max_width / w)), self.max_width) + frame.shape[2:]
+        if self._resized is None or self._resized.shape != shape or self._resized.dtype != frame.dtype:
+            self._resized = np.empty(shape, dtype=frame.dtype)
+        # INTER_AREA is only fast for integer factors; under 2x bilinear barely aliases and is ~5x cheaper
+        interpolation = cv2.INTER_AREA if w % self.max_width == 0 or w >= 2 * self.max_width else cv2.INTER_LINEAR
+        cv2.resize(frame, (shape[1], shape[0]), dst=self._resized, interpolation=interpolation)
+        return self._resized
+
+    def encode(self, frame):
+        """JPEG bytes for frame, or None if encoding failed"""
+        img = self.resize(frame)
+        if self._turbo is not None:
+            data = self._turbo.encode(np.ascontiguousarray(img), quality=self.quality, pixel_format=TJPF_BGR,
+                                      jpeg_subsample=TJSAMP_420)
+        else:
+            ok, buf = cv2.imencode('.jpg', img, self._params)
+            if not ok:
+                return None
+            data = buf.tobytes()
+        self.frames += 1
+        self.bytes += len(data)
+        return data
+
+    def stats(self):
+        return {
+            "backend": self.backend,
+            "quality": self.quality,
+            "max_width": self.max_width,
+            "frames": self.frames,
+            "avg_kb": round(self.bytes / self.frames / 1024, 1) if self.frames else 0.0,
+        }
+
+
+def stream_encoder():
+    """Encoder for /video_feed configured from STREAM_JPEG_QUALITY / STREAM_MAX_WIDTH / JPEG_BACKEND"""
+    return JpegEncoder(quality=int(os.getenv('STREAM_JPEG_QUALITY', 80)),
+                       max_width=int(os.getenv('STREAM_MAX_WIDTH', 960)),
+                       backend=os.getenv('JPEG_BACKEND', 'auto'))
@@ -0,0 +1,106 @@
+"""
+Content-addressed storage for alert images.
+
+Images are keyed by the SHA-256 of their bytes and the database only keeps
+the key and size. The local backend shards files by hash prefix
+(ab/cd/abcd...jpg) so no directory grows too large, and identical images are
+stored once. The backend is chosen with the IMAGE_STORE environment variable.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ImageStore:
+    """Interface for alert image storage backends"""
+
+    def put(self, data):
+        """Store bytes and return their key"""
+        raise NotImplementedError
+
+    def get(self, key):
+        """Return the stored bytes, or None if the key is unknown"""
+        raise NotImplementedError
+
+    def path(self, key):
+        """Local file path for a key (None if not stored on this filesystem)"""
+        return None
+
+    @staticmethod
+    def key_for(data):
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def is_valid_key(key):
+        return bool(key) and _KEY_RE.match(key) is not None
+
+
+class LocalImageStore(ImageStore):
+    """
+    Local filesystem store sharded by hash prefix
+
+    Args:
+        root: Base directory for stored images
+        depth: Number of two-character directory levels
+    """
+
+    def __init__(self, root="alert_images", depth=2):
+        self.root = Path(root)
+        self.depth = depth
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        parts = [key[2 * i:2 * i + 2] for i in range(self.depth)]
+        return self.root.joinpath(*parts, f"{key}.jpg")
+
+    def put(self, data):
+        key = self.key_for(data)
+        path = self._path(key)
+        if path.exists():
+            return key  # same content already stored
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial image
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return key
+
+    def get(self, key):
+        path = self.path(key)
+        return path.read_bytes() if path else None
+
+    def path(self, key):
+        if not self.is_valid_key(key):
+            return None
+        path = self._path(key)
+        return path if path.is_file() else None
+
+
+STORE_BACKENDS = {
+    "local": LocalImageStore,
+}
+
+_store = None
+
+
+def get_image_store():
+    """Process-wide image store configured from IMAGE_STORE / IMAGE_STORE_DIR"""
+    global _store
+    if _store is None:
+        backend = os.getenv("IMAGE_STORE", "local")
+        if backend not in STORE_BACKENDS:
+            raise ValueError(f"Unknown IMAGE_STORE '{backend}', expected one of {list(STORE_BACKENDS)}")
+        _store = STORE_BACKENDS[backend](os.getenv("IMAGE_STORE_DIR", "alert_images"))
+    return _store
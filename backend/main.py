@@ -1,7 +1,8 @@
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from backend.camera import VideoCamera
+from backend import metrics
+from backend.camera_loader import CameraLoader
 from backend.routers import alerts, chat, users, captures
 import uvicorn
 
@@ -14,6 +15,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -22,30 +24,46 @@ app.include_router(chat.router, prefix="/api", tags=["ai-chat"])
 app.include_router(users.router, prefix="/api", tags=["users"])
 app.include_router(captures.router, tags=["captures"])
 
-# Global Camera Instance
-camera = None
+def make_camera():
+    # torch / YOLOv5 are imported here, on the loader thread, so importing this module stays fast
+    from backend.camera import VideoCamera
+    return VideoCamera()
+
+# Global camera, built in the background (see backend/camera_loader.py)
+camera_loader = CameraLoader(make_camera)
+
+@app.on_event("startup")
+def start_background_services():
+    # One directory scan at startup; later captures are added incrementally
+    captures.capture_index.start()
+    # Model load / warmup / camera open run while the API already serves requests
+    camera_loader.start()
+
+@app.on_event("shutdown")
+def stop_background_services():
+    captures.capture_index.stop()
+    camera_loader.stop()
 
 def get_camera():
-    global camera
-    if camera is None:
-        try:
-            print("🎥 Initializing camera system...")
-            camera = VideoCamera()
-            print("✅ Camera system ready!")
-        except Exception as e:
-            print(f"❌ Camera initialization failed: {str(e)}")
-            # Do not crash the server, just return None so we can try again later
-            camera = None
-    return camera
+    """The camera once it is ready, else None (never blocks on model loading)"""
+    return camera_loader.get()
+
+def camera_unavailable():
+    status = camera_loader.status()
+    retry = status["retry_in"] if status["state"] == 'failed' else 5
+    return Response(content=f"Camera not available ({status['state']})", status_code=503,
+                    headers={"Retry-After": str(max(1, int(retry)))})
 
 def gen_frames(camera):
     if camera is None:
         print("Camera is None, cannot generate frames")
         return
     
+    # Every client reads the same encoded frames; detection runs once per frame
+    subscriber = camera.subscribe()
     try:
         while True:
-            frame = camera.get_frame()
+            frame = subscriber.next()
             if frame:
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
@@ -54,12 +72,14 @@ def gen_frames(camera):
                 break
     except Exception as e:
         print(f"Error in gen_frames: {e}")
+    finally:
+        subscriber.close()
 
 @app.get("/video_feed")
 def video_feed():
     cam = get_camera()
     if cam is None:
-        return Response(content="Camera not available", status_code=503)
+        return camera_unavailable()
     
     return StreamingResponse(gen_frames(cam),
                              media_type='multipart/x-mixed-replace; boundary=frame')
@@ -69,12 +89,29 @@ def camera_status():
     cam = get_camera()
     return {
         "camera_initialized": cam is not None,
-        "camera_open": cam.cap.isOpened() if cam else False
+        "camera_open": cam.is_open() if cam else False,
+        "startup": camera_loader.status(),
+        "pipeline": cam.stats() if cam else None
     }
 
+@app.get("/camera/detections")
+def camera_detections():
+    """Latest structured detections; works without any /video_feed viewer"""
+    cam = get_camera()
+    if cam is None:
+        return camera_unavailable()
+    cam.start()
+    return {"detections": cam.latest_detections()}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Stage latency histograms, queue / drop / client gauges (Prometheus text format)"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/")
 def read_root():
-    return {"status": "ADAS Backend Running", "endpoints": ["/video_feed", "/alerts", "/camera/status"]}
+    return {"status": "ADAS Backend Running",
+            "endpoints": ["/video_feed", "/alerts", "/camera/status", "/metrics"]}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -16,6 +16,9 @@ import time
 from collections import deque
 import base64
 
+from backend import metrics
+from backend.encoder import stream_encoder
+
 app = FastAPI(title="ADAS Backend - Production")
 
 # CORS
@@ -40,6 +43,7 @@ class SimpleCamera:
     def __init__(self):
         self.cap = None
         self.is_ready = False
+        self.encoder = stream_encoder()
         self.initialize()
     
     def initialize(self):
@@ -51,20 +55,21 @@ class SimpleCamera:
             print(f"⚠️ Camera error: {e}")
             self.is_ready = False
     
-    def get_frame(self):
+    def get_frame(self, encoder=None):
+        encoder = encoder or self.encoder
         if not self.is_ready or self.cap is None:
             # Return placeholder image
             placeholder = np.zeros((480, 640, 3), dtype=np.uint8)
             cv2.putText(placeholder, "Camera Offline", (150, 240),
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            _, jpeg = cv2.imencode('.jpg', placeholder)
-            return jpeg.tobytes()
+            return encoder.encode(placeholder)
         
         try:
-            success, frame = self.cap.read()
+            with metrics.CAPTURE.time():
+                success, frame = self.cap.read()
             if not success:
                 self.initialize()  # Try to reconnect
-                return self.get_frame()
+                return self.get_frame(encoder)
             
             # Add timestamp
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -75,11 +80,13 @@ class SimpleCamera:
             cv2.putText(frame, "ADAS ACTIVE", (10, 60),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
             
-            _, jpeg = cv2.imencode('.jpg', frame)
-            return jpeg.tobytes()
+            with metrics.ENCODE.time():
+                jpeg = encoder.encode(frame)
+            metrics.STREAM_BYTES.inc(len(jpeg))
+            return jpeg
         except Exception as e:
             print(f"Frame error: {e}")
-            return self.get_frame()  # Recursive retry
+            return self.get_frame(encoder)  # Recursive retry
     
     def __del__(self):
         if self.cap:
@@ -88,6 +95,12 @@ class SimpleCamera:
 # Global camera instance
 camera = None
 
+# Stream metrics: connected clients and delivered frame rate
+stream_clients = 0
+output_rate = metrics.RateMeter()
+metrics.STREAM_CLIENTS.set_function(lambda: stream_clients)
+metrics.OUTPUT_FPS.set_function(output_rate.rate)
+
 def get_camera():
     global camera
     if camera is None:
@@ -95,12 +108,20 @@ def get_camera():
     return camera
 
 def generate_frames():
+    global stream_clients
     cam = get_camera()
-    while True:
-        frame = cam.get_frame()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-        time.sleep(0.033)  # ~30 FPS
+    # Encoders reuse their resize buffer, so each client gets its own
+    encoder = stream_encoder()
+    stream_clients += 1
+    try:
+        while True:
+            frame = cam.get_frame(encoder)
+            output_rate.mark()
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+            time.sleep(0.033)  # ~30 FPS
+    finally:
+        stream_clients -= 1
 
 @app.get("/")
 def root():
@@ -112,6 +133,7 @@ def root():
             "video": "/video_feed",
             "alerts": "/alerts",
             "stats": "/stats",
+            "metrics": "/metrics",
             "health": "/health"
         }
     }
@@ -150,6 +172,11 @@ def get_stats():
         "session_start": system_stats["session_start"]
     }
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus text format metrics"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/health")
 def health_check():
     """Health check for deployment platforms"""
@@ -0,0 +1,148 @@
+"""
+Prometheus metrics for the detectors and the API, on prometheus_client.
+
+The hot path only calls Histogram.observe() or Counter.inc(). Gauges such as
+queue depth and connected clients are read from callbacks at scrape time, so
+they cost nothing between scrapes. A callback whose source has gone away (for
+example, the camera is not started) reports NaN instead of failing the
+scrape. render() produces the text exposition served on /metrics. The CLI
+detectors can expose it with serve().
+
+    from backend.metrics import STAGE_LATENCY
+    STAGE_LATENCY.labels('inference').observe(seconds)
+"""
+
+import time
+from collections import deque
+
+import prometheus_client
+from prometheus_client import CONTENT_TYPE_LATEST as CONTENT_TYPE
+from prometheus_client import REGISTRY, Counter, Histogram, generate_latest, start_http_server
+from prometheus_client.core import CounterMetricFamily
+
+# 0.5 ms .. 2.5 s: covers NMS (sub-ms) through a stalled DB insert
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.0075, 0.01, 0.015, 0.025, 0.035, 0.05, 0.075, 0.1,
+                   0.15, 0.25, 0.5, 1.0, 2.5)
+
+
+def _or_nan(function):
+    def read():
+        try:
+            value = function()
+        except Exception:
+            return float('nan')
+        return float('nan') if value is None else value
+    return read
+
+
+class Gauge(prometheus_client.Gauge):
+    """prometheus_client.Gauge whose set_function() tolerates a source that went away"""
+
+    def set_function(self, function):
+        super().set_function(_or_nan(function))
+
+
+class CallbackCounter:
+    """
+    Counter read from callbacks at scrape time, for totals another object already keeps
+
+    Args:
+        name: Metric name; exposed with a _total suffix
+        documentation: HELP text
+        labelnames: Label names; set a source per label combination with labels(...).set_function(fn)
+    """
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._functions = {}
+        registry.register(self)
+
+    def labels(self, *values):
+        return _CallbackChild(self._functions, tuple(str(v) for v in values))
+
+    def collect(self):
+        family = CounterMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for values, function in list(self._functions.items()):
+            try:
+                value = function()
+            except Exception:
+                continue  # the source went away; skip the sample
+            if value is not None:
+                family.add_metric(values, value)
+        yield family
+
+
+class _CallbackChild:
+    def __init__(self, functions, values):
+        self._functions = functions
+        self._values = values
+
+    def set_function(self, function):
+        self._functions[self._values] = function
+
+
+class RateMeter:
+    """Events per second over a sliding window (recovers immediately after a stall)"""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self._times = deque()
+
+    def mark(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self._times.append(now)
+        while self._times and now - self._times[0] > self.window:
+            self._times.popleft()
+
+    def rate(self, now=None):
+        now = time.perf_counter() if now is None else now
+        while self._times and now - self._times[0] > self.window:
+            self._times.popleft()
+        if len(self._times) < 2:
+            return 0.0
+        return (len(self._times) - 1) / max(now - self._times[0], 1e-9)
+
+
+def render():
+    """All registered metrics in Prometheus text format"""
+    return generate_latest(REGISTRY)
+
+
+STAGE_LATENCY = Histogram(
+    'adas_stage_latency_seconds', 'Per-frame latency of each detection / streaming stage', ('stage',),
+    buckets=LATENCY_BUCKETS)
+FRAMES = Counter('adas_frames_total', 'Frames processed by the detector', ('source',))
+DROPPED_FRAMES = CallbackCounter('adas_dropped_frames_total', 'Frames dropped by a pipeline queue', ('queue',))
+QUEUE_DEPTH = Gauge('adas_queue_depth', 'Items waiting in a pipeline or writer queue', ('queue',))
+STREAM_CLIENTS = Gauge('adas_stream_clients', 'Connected /video_feed clients')
+OUTPUT_FPS = Gauge('adas_output_fps', 'Frames per second delivered over the last seconds')
+ALERTS = Counter('adas_alerts_total', 'Proximity alerts by outcome', ('outcome',))
+STREAM_BYTES = Counter('adas_stream_encoded_bytes_total', 'JPEG bytes published to /video_feed clients')
+ENCODE_SKIPPED = Counter('adas_encode_skipped_total', 'Frames not encoded because no client was subscribed')
+GATED_FRAMES = Counter('adas_motion_gated_frames_total', 'Frames whose detection was skipped by the motion gate')
+DB_POOL = Gauge('adas_db_pool_connections', 'API database pool size, connections in use and queued requests',
+                ('state',))
+DB_WAIT = Histogram('adas_db_wait_seconds', 'Time an API query waited for a pooled connection',
+                    buckets=LATENCY_BUCKETS)
+DB_QUERY = Histogram('adas_db_query_seconds', 'Time an API query held its connection', ('query',),
+                     buckets=LATENCY_BUCKETS)
+DB_ERRORS = Counter('adas_db_errors_total', 'API database failures', ('kind',))
+CAMERA_STATE = Gauge('adas_camera_state', 'API camera start-up: 0 idle, 1 loading, 2 ready, 3 failed (backing off)')
+
+# Pre-resolved children for the hot paths
+CAPTURE = STAGE_LATENCY.labels('capture')
+PREPROCESS = STAGE_LATENCY.labels('preprocess')
+INFERENCE = STAGE_LATENCY.labels('inference')
+NMS = STAGE_LATENCY.labels('nms')
+ANNOTATION = STAGE_LATENCY.labels('annotation')
+ENCODE = STAGE_LATENCY.labels('encode')
+ALERT_WRITE = STAGE_LATENCY.labels('alert_write')
+DB_INSERT = STAGE_LATENCY.labels('db_insert')
+MOTION_GATE = STAGE_LATENCY.labels('motion_gate')
+
+
+def serve(port, host='0.0.0.0'):
+    """Serve /metrics from a daemon thread (for the CLI detectors)"""
+    return start_http_server(port, addr=host)
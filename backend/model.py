@@ -0,0 +1,155 @@
+"""
+Model loading with a selectable inference backend.
+
+    pytorch   - the trained .pt through YOLOv5's DetectMultiBackend
+    onnx      - an exported .onnx through ONNX Runtime's CPU provider
+    openvino  - an exported *_openvino_model/ directory through OpenVINO
+
+ONNX Runtime and OpenVINO are loaded with an explicit intra-op thread count.
+Exported models have a fixed input shape, exposed as `model.input_size`, so
+callers letterbox to the size the model was exported with. Every backend
+returns raw predictions as a torch tensor, so non_max_suppression and
+scale_boxes work unchanged.
+
+Export models with scripts/export_model.py; quantize the ONNX export to INT8
+with scripts/quantize_model.py.
+"""
+
+import ast
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import torch
+
+YOLOV5_DIR = Path(__file__).resolve().parent.parent / 'yolov5_official'
+if str(YOLOV5_DIR) not in sys.path:
+    sys.path.insert(0, str(YOLOV5_DIR))
+
+BACKENDS = ('pytorch', 'onnx', 'openvino')
+
+
+def resolve_weights(weights, backend):
+    """Map the .pt path to the artifact scripts/export_model.py writes for `backend`"""
+    weights = Path(weights)
+    if backend == 'onnx' and weights.suffix == '.pt':
+        return weights.with_suffix('.onnx')
+    if backend == 'openvino' and weights.suffix == '.pt':
+        return weights.with_name(f"{weights.stem}_openvino_model")
+    return weights
+
+
+def _parse_names(names):
+    if isinstance(names, str):
+        names = ast.literal_eval(names)
+    if isinstance(names, (list, tuple)):
+        names = dict(enumerate(names))
+    return {int(k): v for k, v in names.items()}
+
+
+class ExportedModel:
+    """Common interface of the exported-model backends (mirrors DetectMultiBackend)"""
+
+    pt = False
+    fp16 = False
+
+    def __init__(self, stride, names, input_shape):
+        self.stride = int(stride)
+        self.names = _parse_names(names)
+        self.input_shape = tuple(input_shape)  # (batch, 3, h, w)
+        self.input_size = self.input_shape[2]
+        self.batch_size = self.input_shape[0]
+
+    def run(self, im):
+        raise NotImplementedError
+
+    def __call__(self, im, augment=False, visualize=False):
+        if tuple(im.shape) != self.input_shape:
+            raise ValueError(f"Exported model expects input {self.input_shape}, got {tuple(im.shape)}; "
+                             f"re-export with matching --img-size / --batch-size")
+        return torch.from_numpy(self.run(im.cpu().numpy()))
+
+    def warmup(self, imgsz=None):
+        self.run(np.zeros(self.input_shape, dtype=np.float32))
+
+
+class OnnxRuntimeModel(ExportedModel):
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(path), sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        meta = self.session.get_modelmeta().custom_metadata_map
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.output_names = [o.name for o in self.session.get_outputs()]
+        super().__init__(meta.get('stride', 32), meta.get('names', {}), inp.shape)
+
+    def run(self, im):
+        return self.session.run(self.output_names[:1], {self.input_name: im})[0]
+
+
+class OpenVINOModel(ExportedModel):
+    def __init__(self, path, threads=None):
+        import yaml
+        from openvino.runtime import Core
+
+        path = Path(path)
+        xml = path if path.suffix == '.xml' else next(path.glob('*.xml'))
+        core = Core()
+        model = core.read_model(model=str(xml), weights=str(xml.with_suffix('.bin')))
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if threads:
+            config["INFERENCE_NUM_THREADS"] = threads
+        self.compiled = core.compile_model(model, device_name="CPU", config=config)
+        self.request = self.compiled.create_infer_request()
+
+        meta = {}
+        meta_file = xml.parent / 'metadata.yaml'
+        if meta_file.exists():
+            meta = yaml.safe_load(meta_file.read_text())
+        shape = [d.get_length() for d in self.compiled.inputs[0].get_partial_shape()]
+        super().__init__(meta.get('stride', 32), meta.get('names', {}), shape)
+
+    def run(self, im):
+        self.request.infer({0: im})
+        return self.request.get_output_tensor(0).data.copy()
+
+
+def load_model(weights, device, backend='pytorch', threads=None):
+    """
+    Load YOLO weights with the requested backend
+
+    Args:
+        weights: Path to the .pt weights (exported artifacts are found next to it), or
+            an exported artifact itself, e.g. the INT8 .onnx from scripts/quantize_model.py
+        device: torch device, from select_device()
+        backend: One of BACKENDS
+        threads: Intra-op CPU threads (None = runtime default)
+
+    Returns:
+        Model with stride, names, pt, fp16, warmup() and __call__(im)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+    if backend == 'pytorch':
+        from models.common import DetectMultiBackend
+
+        if threads:
+            torch.set_num_threads(threads)
+        return DetectMultiBackend(weights, device=device, dnn=False, data=None, fp16=False)
+
+    path = resolve_weights(weights, backend)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; run scripts/export_model.py --include {backend} first")
+    if backend == 'onnx':
+        return OnnxRuntimeModel(path, threads)
+    return OpenVINOModel(path, threads)
@@ -0,0 +1,100 @@
+"""
+Motion gate in front of the detectors.
+
+When the car is stopped at a light or parked, consecutive frames are nearly
+identical and a forward pass only repeats the previous result. MotionGate
+shrinks each frame to a small greyscale thumbnail. It first resizes
+bilinearly to 4x the target, then area-averages down, which filters sensor
+noise. The thumbnail is compared with the thumbnail of the last frame that
+was let through. If too few pixels changed, the frame is gated. The
+detector then reuses its last detections, and the stream re-publishes its
+last JPEG.
+
+A static scene is still re-detected at least every max_stale seconds. Slow
+drift also opens the gate, because frames are compared with the last
+detected frame and not with their predecessor. The check costs well under
+a millisecond at 1080p.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from backend import metrics
+
+
+class MotionGate:
+    """
+    Decide whether a frame differs enough from the last detected one to run detection
+
+    Args:
+        width: Thumbnail width frames are compared at
+        pixel_threshold: Grey-level change (0-255) for a thumbnail pixel to count as changed
+        min_changed: Fraction of changed pixels above which the scene is moving
+        max_stale: Seconds after which detection runs even if nothing moved
+    """
+
+    def __init__(self, width=64, pixel_threshold=12, min_changed=0.01, max_stale=1.0):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.max_stale = max_stale
+
+        self._reference = None
+        self._reference_time = 0.0
+        self.score = 1.0  # changed fraction of the last checked frame
+        self.passed = 0
+        self.gated = 0
+        self.last_cost = 0.0
+        self._total_cost = 0.0
+
+    def thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, round(h * self.width / w)))
+        small = cv2.resize(frame, (size[0] * 4, size[1] * 4), interpolation=cv2.INTER_LINEAR)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(small, size, interpolation=cv2.INTER_AREA)
+
+    def check(self, frame, now=None):
+        """
+        True if detection should run on frame, False to reuse the last result
+
+        Frames that pass become the new reference.
+        """
+        t0 = time.perf_counter()
+        now = time.monotonic() if now is None else now
+        thumb = self.thumbnail(frame)
+        ref = self._reference
+        if ref is None or ref.shape != thumb.shape or now - self._reference_time >= self.max_stale:
+            self.score = 1.0
+        else:
+            self.score = float(np.count_nonzero(cv2.absdiff(thumb, ref) > self.pixel_threshold)) / thumb.size
+        moving = self.score > self.min_changed
+        if moving:
+            self._reference = thumb
+            self._reference_time = now
+            self.passed += 1
+        else:
+            self.gated += 1
+            metrics.GATED_FRAMES.inc()
+
+        self.last_cost = time.perf_counter() - t0
+        self._total_cost += self.last_cost
+        metrics.MOTION_GATE.observe(self.last_cost)
+        return moving
+
+    def reset(self):
+        """Force the next frame through (e.g. after the detector's state changed)"""
+        self._reference = None
+
+    def stats(self):
+        checked = self.passed + self.gated
+        return {
+            "checked": checked,
+            "gated": self.gated,
+            "gated_ratio": round(self.gated / checked, 3) if checked else 0.0,
+            "avg_cost_ms": round(self._total_cost / checked * 1000, 3) if checked else 0.0,
+            "last_score": round(self.score, 4),
+        }
@@ -0,0 +1,244 @@
+"""
+Staged capture -> inference -> encode pipeline for the live camera.
+
+Each stage runs on its own thread and hands its output to the next stage
+through a bounded "latest frame wins" queue. When a downstream stage is busy
+the oldest queued frame is dropped instead of piling up, so the stream rate
+is limited by the slowest stage rather than by the sum of all of them.
+Encoded frames are published once to a FrameBroadcaster shared by every
+stream client, so inference cost does not grow with the number of viewers.
+While nobody is subscribed the encode stage drops frames unencoded. The
+process function may return REPEAT (static scene, see backend/motion.py) to
+re-publish the last JPEG without encoding.
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from backend import metrics
+from backend.broadcast import FrameBroadcaster
+
+# Returned by process_fn to re-send the previous encoded frame
+REPEAT = object()
+
+
+def open_capture(source):
+    """
+    Open a device index, stream URL or video file; device 0 falls back to device 1
+
+    Raises:
+        RuntimeError: If the source cannot be opened
+    """
+    source = int(source) if str(source).isdigit() else source
+    print("Attempting to open camera...")
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        if source != 0:
+            raise RuntimeError(f"Could not open video source {source}")
+        print("❌ Error: Could not open video device 0. Trying device 1...")
+        cap = cv2.VideoCapture(1)
+        if not cap.isOpened():
+            raise RuntimeError("Could not open any video camera. Please check permissions.")
+    print(f"✓ Camera opened successfully: {cap.getBackendName()}")
+    return cap
+
+
+class LatestQueue:
+    """Bounded queue that drops the oldest item when full"""
+
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest queued item, or None on timeout / close"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class StageStats:
+    """Latency and throughput counters for one pipeline stage"""
+
+    def __init__(self, name, smoothing=0.1, histogram=None):
+        self.name = name
+        self.smoothing = smoothing
+        self.histogram = histogram  # metrics.STAGE_LATENCY child, if this stage is exported
+        self.count = 0
+        self.last_latency = 0.0
+        self.avg_latency = 0.0
+        self.max_latency = 0.0
+        self.queue = None  # output queue, used for drop counts / depth
+
+    def record(self, seconds):
+        if self.histogram is not None:
+            self.histogram.observe(seconds)
+        self.count += 1
+        self.last_latency = seconds
+        self.max_latency = max(self.max_latency, seconds)
+        if self.count == 1:
+            self.avg_latency = seconds
+        else:
+            self.avg_latency += self.smoothing * (seconds - self.avg_latency)
+
+    def as_dict(self):
+        return {
+            "frames": self.count,
+            "dropped": self.queue.dropped if self.queue else 0,
+            "queue_depth": len(self.queue) if self.queue else 0,
+            "last_ms": round(self.last_latency * 1000, 2),
+            "avg_ms": round(self.avg_latency * 1000, 2),
+            "max_ms": round(self.max_latency * 1000, 2),
+        }
+
+
+class FramePipeline:
+    """
+    Runs capture, inference and encoding on separate threads
+
+    Args:
+        read_fn: Returns the next BGR frame, or None when the source is exhausted
+        process_fn: Takes a frame and returns the annotated frame, or REPEAT
+        encode_fn: Takes an annotated frame and returns JPEG bytes
+        queue_size: Capacity of each inter-stage queue
+        ring_size: Number of encoded frames kept for stream clients
+        skip_idle: Skip encoding while no stream client is subscribed
+    """
+
+    def __init__(self, read_fn, process_fn, encode_fn, queue_size=1, ring_size=8, skip_idle=True):
+        self.read_fn = read_fn
+        self.process_fn = process_fn
+        self.encode_fn = encode_fn
+        self.skip_idle = skip_idle
+        self.encode_skipped = 0
+
+        self.raw_frames = LatestQueue(queue_size)
+        self.processed_frames = LatestQueue(queue_size)
+        self.broadcaster = FrameBroadcaster(size=ring_size)
+
+        # Inference is exported per sub-stage by the process function itself
+        self.capture_stats = StageStats("capture", histogram=metrics.CAPTURE)
+        self.inference_stats = StageStats("inference")
+        self.encode_stats = StageStats("encode", histogram=metrics.ENCODE)
+        self.output_rate = metrics.RateMeter()
+        self.capture_stats.queue = self.raw_frames
+        self.inference_stats.queue = self.processed_frames
+
+        self.running = False
+        self.error = None
+        self.start_time = None
+        self._threads = []
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.start_time = time.time()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="pipeline-inference", daemon=True),
+            threading.Thread(target=self._encode_loop, name="pipeline-encode", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout=2.0):
+        self.running = False
+        for q in (self.raw_frames, self.processed_frames):
+            q.close()
+        self.broadcaster.close()
+        for t in self._threads:
+            if t is not threading.current_thread() and t.ident is not None:
+                t.join(timeout)
+        self._threads = []
+
+    def subscribe(self):
+        """Register a stream client; see FrameBroadcaster.subscribe"""
+        return self.broadcaster.subscribe()
+
+    def _capture_loop(self):
+        while self.running:
+            t0 = time.perf_counter()
+            frame = self.read_fn()
+            if frame is None:
+                print("Pipeline: no frame received from camera, stopping")
+                self.stop()
+                return
+            self.capture_stats.record(time.perf_counter() - t0)
+            self.raw_frames.put(frame)
+
+    def _inference_loop(self):
+        while self.running:
+            frame = self.raw_frames.get(timeout=0.5)
+            if frame is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                frame = self.process_fn(frame)
+            except Exception as e:
+                print(f"Pipeline inference error: {e}")
+                self.error = str(e)
+                continue
+            self.inference_stats.record(time.perf_counter() - t0)
+            self.processed_frames.put(frame)
+
+    def _encode_loop(self):
+        while self.running:
+            frame = self.processed_frames.get(timeout=0.5)
+            if frame is None:
+                continue
+            if self.skip_idle and not self.broadcaster.subscriber_count:
+                self.encode_skipped += 1
+                metrics.ENCODE_SKIPPED.inc()
+                continue
+            if frame is REPEAT:
+                # Keeps clients' frame cadence (they time out without frames) at no encode cost
+                jpeg = self.broadcaster.latest()
+                if jpeg:
+                    self.broadcaster.publish(jpeg)
+                    self.output_rate.mark()
+                continue
+            t0 = time.perf_counter()
+            jpeg = self.encode_fn(frame)
+            self.encode_stats.record(time.perf_counter() - t0)
+            if jpeg:
+                self.broadcaster.publish(jpeg)
+                self.output_rate.mark()
+                metrics.STREAM_BYTES.inc(len(jpeg))
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "output_fps": round(self.output_rate.rate(), 2),
+            "stages": {
+                s.name: s.as_dict()
+                for s in (self.capture_stats, self.inference_stats, self.encode_stats)
+            },
+            "stream": self.broadcaster.stats(),
+            "encode_skipped": self.encode_skipped,
+            "error": self.error,
+        }
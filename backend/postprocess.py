@@ -0,0 +1,146 @@
+"""
+Vectorized post-NMS processing shared by the detectors.
+
+The class filter, pinhole distance estimate (with per-class widths), proximity threshold and the
+"closest hazard" reduction run as NumPy operations over the whole detection
+matrix. The only per-box Python loop left is drawing, which is optional.
+"""
+
+import cv2
+import numpy as np
+
+VEHICLE_CLASSES = ('car', 'truck', 'bus', 'vehicle')
+ALERT_DISTANCE = 50.0  # meters
+NO_DISTANCE = 999.0    # reported for non-vehicles and degenerate boxes
+
+
+def class_lookup(names, classes=VEHICLE_CLASSES):
+    """Boolean array indexed by class id, True for classes in `classes`"""
+    items = names.items() if isinstance(names, dict) else enumerate(names)
+    ids = dict(items)
+    lut = np.zeros(max(ids) + 1 if ids else 0, dtype=bool)
+    for i, name in ids.items():
+        lut[i] = name in classes
+    return lut
+
+
+def pinhole_distance(widths, known_width, focal_length):
+    """Distance = (Known_Width * Focal_Length) / Pixel_Width, element-wise"""
+    widths = np.asarray(widths, dtype=np.float32)
+    known_width = np.broadcast_to(np.asarray(known_width, dtype=np.float32), widths.shape)
+    out = np.full(widths.shape, NO_DISTANCE, dtype=np.float32)
+    np.divide(known_width * focal_length, widths, out=out, where=widths > 0)
+    return out
+
+
+class FrameDetections:
+    """
+    Detections for one frame as parallel NumPy arrays
+
+    known_width is either one width in meters for every class or an array indexed by
+    class id (CameraProfile.width_lookup()).
+
+    Attributes:
+        boxes: (n, 4) xyxy in frame pixels
+        conf: (n,) confidences
+        cls: (n,) integer class ids
+        is_vehicle: (n,) True for classes the proximity alert applies to
+        distance: (n,) estimated distance in meters (NO_DISTANCE for non-vehicles)
+        in_range: (n,) vehicles closer than the alert distance
+        closest: Index of the nearest vehicle, or -1
+        track_id: (n,) track ids, -1 until set_tracks() is called
+        closing_speed: (n,) m/s the distance shrinks at (0 untracked)
+        ttc: (n,) time to collision in seconds (inf untracked or not approaching)
+    """
+
+    def __init__(self, det, vehicle_lut, known_width, focal_length, alert_distance=ALERT_DISTANCE):
+        d = det.detach().cpu().numpy() if hasattr(det, 'detach') else np.asarray(det)
+        d = d.reshape(-1, 6)
+        self.boxes = d[:, :4]
+        self.conf = d[:, 4]
+        self.cls = d[:, 5].astype(np.int64)
+
+        self.is_vehicle = vehicle_lut[self.cls] if len(self.cls) else np.zeros(0, dtype=bool)
+        widths = np.where(self.is_vehicle, self.boxes[:, 2] - self.boxes[:, 0], 0)
+        if np.ndim(known_width):  # per-class widths, see backend/calibration.py
+            known_width = known_width[self.cls] if len(self.cls) else np.zeros(0, dtype=np.float32)
+        self.distance = pinhole_distance(widths, known_width, focal_length)
+        self.in_range = self.is_vehicle & (self.distance < alert_distance)
+        self.closest = int(np.argmin(self.distance)) if self.is_vehicle.any() else -1
+
+        n = len(self.cls)
+        self.track_id = np.full(n, -1, dtype=np.int64)
+        self.closing_speed = np.zeros(n, dtype=np.float32)
+        self.ttc = np.full(n, np.inf, dtype=np.float32)
+
+    def set_tracks(self, track_id, distance, closing_speed, ttc, hazard):
+        """Replace the single-frame estimates with per-track ones (see backend/tracker.py)"""
+        self.track_id = np.asarray(track_id, dtype=np.int64)
+        self.distance = np.where(self.is_vehicle, distance, NO_DISTANCE).astype(np.float32)
+        self.closing_speed = np.asarray(closing_speed, dtype=np.float32)
+        self.ttc = np.asarray(ttc, dtype=np.float32)
+        self.in_range = self.is_vehicle & hazard
+        self.closest = int(np.argmin(self.distance)) if self.is_vehicle.any() else -1
+
+    def __len__(self):
+        return len(self.cls)
+
+    @property
+    def alert(self):
+        """True if any vehicle is inside the alert distance"""
+        return bool(self.in_range.any())
+
+    @property
+    def nearest(self):
+        """Distance to the closest vehicle in meters, NO_DISTANCE if there is none"""
+        return float(self.distance[self.closest]) if self.closest >= 0 else NO_DISTANCE
+
+    def as_dicts(self, names, distances=False):
+        """
+        List of {'class', 'confidence', 'bbox'} dicts, highest confidence last (NMS order reversed)
+
+        With distances=True, vehicles also get 'distance' and, when approaching, 'ttc'.
+        """
+        boxes = self.boxes.astype(int).tolist()
+        dicts = [
+            {'class': names[c], 'confidence': conf, 'bbox': box}
+            for c, conf, box in zip(self.cls[::-1].tolist(), self.conf[::-1].tolist(), boxes[::-1])
+        ]
+        for d, track_id in zip(dicts, self.track_id[::-1].tolist()):
+            if track_id >= 0:
+                d['track_id'] = track_id
+        if distances:
+            for d, dist, ttc, vehicle in zip(dicts, self.distance[::-1].tolist(), self.ttc[::-1].tolist(),
+                                             self.is_vehicle[::-1].tolist()):
+                if vehicle:
+                    d['distance'] = round(dist, 1)
+                    if ttc != float('inf'):
+                        d['ttc'] = round(ttc, 1)
+        return dicts
+
+
+def draw_detections(frame, result, names, line_width=2):
+    """Draw boxes, labels and distance tags onto frame in place"""
+    from utils.plots import Annotator, colors
+
+    annotator = Annotator(frame, line_width=line_width, example=str(names))
+    for i in reversed(range(len(result))):
+        c = int(result.cls[i])
+        xyxy = result.boxes[i]
+        track = f' #{result.track_id[i]}' if result.track_id[i] >= 0 else ''
+        annotator.box_label(xyxy, f'{names[c]}{track} {result.conf[i]:.2f}', color=colors(c, True))
+        if result.is_vehicle[i]:
+            tag = f"{result.distance[i]:.1f}m"
+            if np.isfinite(result.ttc[i]):
+                tag += f" TTC {result.ttc[i]:.1f}s"
+            annotator.box_label([xyxy[0], xyxy[1] - 20, xyxy[2], xyxy[1]], tag,
+                                color=(0, 255, 255))  # Yellow for distance
+    return annotator.result()
+
+
+def annotate(frame, result, names, warning_text="WARNING: PROXIMITY ALERT!"):
+    """Return an annotated copy of frame: boxes, distances and the proximity warning"""
+    out = draw_detections(frame.copy(), result, names) if len(result) else frame.copy()
+    if result.alert and warning_text:
+        cv2.putText(out, warning_text, (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 3)
+    return out
@@ -0,0 +1,93 @@
+"""
+Shared letterbox preprocessing for the YOLO detectors.
+
+Frames are resized with their aspect ratio preserved and padded to the model
+input, square or (h, w) for crops (the same geometry `scale_boxes` assumes), then written into a
+preallocated input tensor. BGR->RGB, HWC->CHW, uint8->float and the /255
+normalization happen in a single pass, so no frame-sized arrays or tensors
+are allocated per frame.
+"""
+
+import cv2
+import numpy as np
+import torch
+
+
+class Letterbox:
+    """
+    Letterbox frames into a reusable model input tensor
+
+    Args:
+        imgsz: Square model input size, or (h, w) for a rectangular input (multiples of the stride)
+        device: Torch device the model runs on
+        fp16: Produce a half precision tensor
+        batch_size: Number of frames the input tensor holds
+        pad_value: Border colour, YOLOv5 uses 114
+    """
+
+    def __init__(self, imgsz, device='cpu', fp16=False, batch_size=1, pad_value=114):
+        self.imgsz = imgsz
+        self.shape = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+        self.batch_size = batch_size
+        self.pad_value = pad_value
+        self.device = torch.device(device)
+
+        dtype = torch.float16 if fp16 else torch.float32
+        pin = self.device.type == 'cuda'
+
+        # uint8 letterboxed canvas for each batch slot
+        self.canvas = np.full((batch_size, *self.shape, 3), pad_value, dtype=np.uint8)
+        # Host input tensor (pinned when copying to a GPU) and a numpy view onto it
+        self.host = torch.empty((batch_size, 3, *self.shape), dtype=dtype, pin_memory=pin)
+        self._host_np = self.host.numpy()
+        if self.device.type == 'cpu':
+            self.tensor = self.host
+        else:
+            self.tensor = torch.empty_like(self.host, device=self.device)
+
+        self._src_shape = [None] * batch_size
+        self._region = [None] * batch_size
+        # Per slot ((gain, gain), (pad_w, pad_h)), suitable for scale_boxes(ratio_pad=...)
+        self.ratio_pad = [None] * batch_size
+
+    def _set_geometry(self, index, h, w):
+        """Compute resize size and padding for a frame shape, refill the border"""
+        H, W = self.shape
+        r = min(H / h, W / w)
+        new_w, new_h = int(round(w * r)), int(round(h * r))
+        dw, dh = (W - new_w) / 2, (H - new_h) / 2
+        top, left = int(round(dh - 0.1)), int(round(dw - 0.1))
+
+        self.canvas[index].fill(self.pad_value)
+        self._region[index] = self.canvas[index, top:top + new_h, left:left + new_w]
+        self._src_shape[index] = (h, w)
+        self.ratio_pad[index] = ((r, r), (dw, dh))
+
+    def __call__(self, frame, index=0):
+        """
+        Letterbox a BGR frame into batch slot `index`
+
+        Returns:
+            The shared (batch, 3, h, w) input tensor on the model device
+        """
+        h, w = frame.shape[:2]
+        if self._src_shape[index] != (h, w):
+            self._set_geometry(index, h, w)
+
+        region = self._region[index]
+        if region.shape[:2] == (h, w):
+            region[...] = frame
+        else:
+            out = cv2.resize(frame, (region.shape[1], region.shape[0]), dst=region,
+                             interpolation=cv2.INTER_LINEAR)
+            if out.ctypes.data != region.ctypes.data:
+                region[...] = out
+
+        # Fused BGR->RGB, HWC->CHW, uint8->float and normalization
+        out = self._host_np[index]
+        np.multiply(self.canvas[index, :, :, ::-1].transpose(2, 0, 1), 1 / 255.0,
+                    out=out, dtype=out.dtype, casting='unsafe')
+
+        if self.tensor is not self.host:
+            self.tensor[index].copy_(self.host[index], non_blocking=True)
+        return self.tensor
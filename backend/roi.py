@@ -0,0 +1,151 @@
+"""
+Region-of-interest inference for the proximity alert.
+
+The alert is only about vehicles in or near our lane, but the model runs
+over sky, bonnet and roadside as well. An RoiPlanner restricts detection to
+one of two regions:
+
+    band:TOP,BOTTOM           horizontal band between two fractions of the frame
+                              height, e.g. band:0.35,0.9 (full width, so box
+                              widths and distances are never truncated)
+    poly:X,Y;X,Y;...          lane polygon in fractions of the frame size; the
+                              model runs on the full-width band spanning it
+
+The crop is letterboxed into a rectangular input at the same scale as a
+full-frame pass, rounded up to the stride, so a band covering half the
+frame costs about half the pixels and distant vehicles stay as large. Boxes are mapped back with
+scale_boxes against the crop and then shifted by the crop origin.
+
+Crops always span the full frame width. Distance comes from box width, and a
+vehicle cut off at a side edge of the crop would get a narrower box and so
+look farther away than it is. A close vehicle cutting in could then miss the
+alert until the next full-frame pass. Clipping at the top or bottom only
+changes the box height.
+
+Every full_every frames the model sees the whole frame instead, to pick up
+vehicles cutting in from the side. Exported models (ONNX / OpenVINO) have a
+fixed square input. For them the crop only improves resolution on the lane
+and saves no pixels.
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+from backend.preprocess import Letterbox
+
+
+def parse_roi(spec):
+    """(mode, points) from a 'band:top,bottom' or 'poly:x,y;x,y;...' spec"""
+    mode, _, values = spec.partition(':')
+    try:
+        if mode == 'band':
+            top, bottom = (float(v) for v in values.split(','))
+            if not 0 <= top < bottom <= 1:
+                raise ValueError
+            return mode, np.array([[0, top], [1, top], [1, bottom], [0, bottom]])
+        if mode == 'poly':
+            points = np.array([[float(v) for v in p.split(',')] for p in values.split(';')])
+            if points.shape[0] < 3 or points.shape[1] != 2 or points.min() < 0 or points.max() > 1:
+                raise ValueError
+            return mode, points
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid ROI '{spec}', expected 'band:TOP,BOTTOM' or 'poly:X,Y;X,Y;...' "
+                     "with fractions of the frame size")
+
+
+class RoiPlanner:
+    """
+    Decide per frame whether to detect on the ROI crop or the full frame
+
+    Args:
+        spec: 'band:top,bottom' or 'poly:x,y;x,y;...' (see parse_roi)
+        full_every: Run a full-frame pass every this many frames (0 = never)
+        margin: Fraction of the frame height added above and below a polygon
+        fixed_input: Square model input size for exported models, None when any stride multiple works
+        stride: Model stride the crop input is rounded up to
+    """
+
+    def __init__(self, spec, full_every=10, margin=0.03, fixed_input=None, stride=32):
+        self.spec = spec
+        self.mode, self.points = parse_roi(spec)
+        self.full_every = full_every
+        self.margin = margin if self.mode == 'poly' else 0.0
+        self.fixed_input = fixed_input
+        self.stride = stride
+
+        self._regions = {}     # frame (h, w) -> crop rectangle
+        self._letterboxes = {}  # (crop h, crop w, frame h, frame w, width) -> Letterbox
+        self._count = 0
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.input_pixels = 0
+        self.full_pixels = 0
+
+    def region(self, shape):
+        """(0, y0, w, y1) crop rectangle in pixels for frames of shape (h, w, ...), always full width"""
+        h, w = shape[:2]
+        rect = self._regions.get((h, w))
+        if rect is None:
+            top = max(self.points[:, 1].min() - self.margin, 0.0)
+            bottom = min(self.points[:, 1].max() + self.margin, 1.0)
+            rect = (0, int(top * h), w, int(math.ceil(bottom * h)))
+            self._regions[(h, w)] = rect
+        return rect
+
+    def next(self, shape):
+        """Crop rectangle for this frame, or None for a full-frame pass"""
+        self._count += 1
+        if self.full_every and (self._count - 1) % self.full_every == 0:
+            self.full_frames += 1
+            return None
+        self.roi_frames += 1
+        return self.region(shape)
+
+    def input_shape(self, crop_shape, frame_shape, width):
+        """(h, w) model input for a crop at the scale a width x width full-frame pass would use"""
+        if self.fixed_input:
+            return self.fixed_input, self.fixed_input
+        h, w = crop_shape[:2]
+        scale = width / max(frame_shape[:2])
+        return (int(math.ceil(h * scale / self.stride)) * self.stride,
+                int(math.ceil(w * scale / self.stride)) * self.stride)
+
+    def letterbox(self, crop_shape, frame_shape, width, device='cpu', fp16=False):
+        """Cached Letterbox for crops of crop_shape from frames of frame_shape, detected at width"""
+        key = (crop_shape[0], crop_shape[1], frame_shape[0], frame_shape[1], width)
+        letterbox = self._letterboxes.get(key)
+        if letterbox is None:
+            letterbox = Letterbox(self.input_shape(crop_shape, frame_shape, width), device=device, fp16=fp16)
+            self._letterboxes[key] = letterbox
+        return letterbox
+
+    def record(self, input_shape, full_size):
+        """Account one detection pass of input_shape against a full_size square pass"""
+        self.input_pixels += input_shape[0] * input_shape[1]
+        self.full_pixels += full_size * full_size
+
+    def draw(self, frame, color=(255, 200, 0)):
+        """Outline the ROI on frame"""
+        h, w = frame.shape[:2]
+        pts = (self.points * [w, h]).astype(np.int32)
+        cv2.polylines(frame, [pts], True, color, 1, cv2.LINE_AA)
+        return frame
+
+    def stats(self):
+        return {
+            "roi": self.spec,
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "pixel_ratio": round(self.input_pixels / self.full_pixels, 3) if self.full_pixels else 1.0,
+        }
+
+
+def offset_boxes(det, rect):
+    """Shift crop-pixel xyxy boxes (in place) to frame pixels"""
+    if rect is not None and len(det):
+        det[:, [0, 2]] += rect[0]
+        det[:, [1, 3]] += rect[1]
+    return det
@@ -0,0 +1,118 @@
+"""
+Incrementally maintained counters for the admin dashboard.
+
+Writers do not leave /api/admin/stats to COUNT(*) users and alerts on every
+refresh. Instead they bump rollup rows in the same transaction as the rows
+they insert:
+
+    stat_counters        name   -> value                running totals ('users', 'alerts')
+    alert_rollup_hourly  bucket -> alerts, close_calls  one row per hour with alerts
+    alert_rollup_daily   day    -> alerts, close_calls  one row per day with alerts
+
+"Alerts in the last 24 hours" adds up at most 25 hourly rows, so it is
+counted at hour granularity. The oldest bucket can include up to an hour
+before the window. Active users come from a range scan on
+idx_users_last_login, which is proportional to the number of active users,
+not to the size of the table.
+
+db_setup.py creates the tables. `python db_setup.py --rollups` adds them to
+an existing database and backfills them from its rows. It also resyncs the
+counters after rows were deleted outside the API.
+"""
+
+from datetime import datetime
+
+# Alerts closer than this (metres) count as close calls
+CLOSE_CALL_DISTANCE = 30.0
+
+ROLLUP_TABLES = {
+    "stat_counters": """
+        CREATE TABLE IF NOT EXISTS stat_counters (
+            name VARCHAR(32) PRIMARY KEY,
+            value BIGINT NOT NULL DEFAULT 0
+        )""",
+    "alert_rollup_hourly": """
+        CREATE TABLE IF NOT EXISTS alert_rollup_hourly (
+            bucket DATETIME PRIMARY KEY,
+            alerts INT NOT NULL DEFAULT 0,
+            close_calls INT NOT NULL DEFAULT 0
+        )""",
+    "alert_rollup_daily": """
+        CREATE TABLE IF NOT EXISTS alert_rollup_daily (
+            day DATE PRIMARY KEY,
+            alerts INT NOT NULL DEFAULT 0,
+            close_calls INT NOT NULL DEFAULT 0
+        )""",
+}
+
+USER_INDEXES = {
+    "idx_users_last_login": "(last_login)",
+}
+
+INCREMENT_COUNTER = ("INSERT INTO stat_counters (name, value) VALUES (%s, %s) "
+                     "ON DUPLICATE KEY UPDATE value = value + VALUES(value)")
+UPSERT_HOURLY = ("INSERT INTO alert_rollup_hourly (bucket, alerts, close_calls) VALUES (%s, %s, %s) "
+                 "ON DUPLICATE KEY UPDATE alerts = alerts + VALUES(alerts), "
+                 "close_calls = close_calls + VALUES(close_calls)")
+UPSERT_DAILY = ("INSERT INTO alert_rollup_daily (day, alerts, close_calls) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE alerts = alerts + VALUES(alerts), "
+                "close_calls = close_calls + VALUES(close_calls)")
+
+# Every column is a primary-key lookup or a bounded range scan
+ADMIN_STATS_QUERY = """
+    SELECT
+        (SELECT COALESCE(MAX(value), 0) FROM stat_counters WHERE name = 'users') AS total_users,
+        (SELECT COUNT(*) FROM users
+         WHERE last_login >= DATE_SUB(NOW(), INTERVAL 24 HOUR)) AS active_users,
+        (SELECT COALESCE(MAX(value), 0) FROM stat_counters WHERE name = 'alerts') AS total_alerts,
+        (SELECT COALESCE(SUM(alerts), 0) FROM alert_rollup_hourly
+         WHERE bucket > DATE_SUB(NOW(), INTERVAL 25 HOUR)) AS recent_alerts
+"""
+
+# Full rebuild from the base tables (db_setup.py --rollups)
+_HOUR = "TIMESTAMP(DATE(timestamp), MAKETIME(HOUR(timestamp), 0, 0))"
+BACKFILL = [
+    "REPLACE INTO stat_counters (name, value) SELECT 'users', COUNT(*) FROM users",
+    "REPLACE INTO stat_counters (name, value) SELECT 'alerts', COUNT(*) FROM alerts",
+    "DELETE FROM alert_rollup_hourly",
+    f"INSERT INTO alert_rollup_hourly (bucket, alerts, close_calls) "
+    f"SELECT {_HOUR}, COUNT(*), SUM(distance < {CLOSE_CALL_DISTANCE}) FROM alerts "
+    f"WHERE timestamp IS NOT NULL GROUP BY {_HOUR}",
+    "DELETE FROM alert_rollup_daily",
+    f"INSERT INTO alert_rollup_daily (day, alerts, close_calls) "
+    f"SELECT DATE(timestamp), COUNT(*), SUM(distance < {CLOSE_CALL_DISTANCE}) FROM alerts "
+    f"WHERE timestamp IS NOT NULL GROUP BY DATE(timestamp)",
+]
+
+
+def increment_counter(cursor, name, amount=1):
+    cursor.execute(INCREMENT_COUNTER, (name, amount))
+
+
+def alert_rollups(alerts):
+    """
+    Aggregate (timestamp, distance) pairs into rollup deltas
+
+    Returns:
+        (hourly, daily) lists of (bucket, alerts, close_calls) rows for the upserts
+    """
+    hourly, daily = {}, {}
+    for timestamp, distance in alerts:
+        hour = timestamp.replace(minute=0, second=0, microsecond=0)
+        close = int(distance < CLOSE_CALL_DISTANCE)
+        for buckets, key in ((hourly, hour), (daily, hour.date())):
+            count, close_calls = buckets.get(key, (0, 0))
+            buckets[key] = (count + 1, close_calls + close)
+    return ([(k, n, c) for k, (n, c) in hourly.items()],
+            [(k, n, c) for k, (n, c) in daily.items()])
+
+
+def record_alerts(cursor, alerts):
+    """Add a batch of inserted alerts to the rollups (caller commits)"""
+    alerts = [(t if isinstance(t, datetime) else datetime.fromtimestamp(t), d) for t, d in alerts]
+    if not alerts:
+        return
+    hourly, daily = alert_rollups(alerts)
+    cursor.executemany(UPSERT_HOURLY, hourly)
+    cursor.executemany(UPSERT_DAILY, daily)
+    increment_counter(cursor, 'alerts', len(alerts))
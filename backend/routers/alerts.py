@@ -1,27 +1,17 @@
-from fastapi import APIRouter, HTTPException, Response
-import mysql.connector
-from mysql.connector import pooling
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-router = APIRouter(prefix="/alerts", tags=["alerts"])
+from backend.alert_queries import DEFAULT_LIMIT, build_alerts_query, paginate
+from backend.db import DatabaseUnavailable, get_database
+from backend.image_store import get_image_store
 
-db_config = {
-    'user': 'root',
-    'password': 'Anurag*29',
-    'host': 'localhost',
-    'database': 'car',
-    'pool_name': 'alert_pool',
-    'pool_size': 5
-}
+router = APIRouter(prefix="/alerts", tags=["alerts"])
 
-# Create connection pool
-try:
-    connection_pool = pooling.MySQLConnectionPool(**db_config)
-except mysql.connector.Error as err:
-    print(f"Error creating connection pool: {err}")
-    connection_pool = None
+# Shared pool configured from DB_* environment variables (see backend/db.py)
+db = get_database()
 
 class Alert(BaseModel):
     id: int
@@ -32,59 +22,53 @@ class Alert(BaseModel):
     image_path: str
 
 @router.get("/", response_model=List[Alert])
-def get_alerts(limit: int = 10):
-    """Get recent alerts from database"""
-    cnx = None
-    cursor = None
+async def get_alerts(response: Response, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+                     start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     object_class: Optional[str] = None, min_distance: Optional[float] = None,
+                     max_distance: Optional[float] = None, user_id: Optional[int] = None):
+    """
+    Get recent alerts from database, newest first
+    
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
+    try:
+        query, params = build_alerts_query(limit, cursor, start, end, object_class,
+                                           min_distance, max_distance, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        if connection_pool:
-            cnx = connection_pool.get_connection()
-        else:
-            cnx = mysql.connector.connect(**{k: v for k, v in db_config.items() if k not in ['pool_name', 'pool_size']})
-        
-        cursor = cnx.cursor(dictionary=True)
-        query = "SELECT id, timestamp, object_class, confidence, distance, image_path FROM alerts ORDER BY id DESC LIMIT %s"
-        cursor.execute(query, (limit,))
-        alerts = cursor.fetchall()
-        return alerts
-    except mysql.connector.Error as err:
+        rows = await db.fetch_all(query, params)
+    except DatabaseUnavailable as err:
         print(f"Database not available for alerts: {err}")
         return []  # Return empty list when database is offline
     except Exception as e:
         print(f"Error fetching alerts: {e}")
         return []  # Return empty list on error
-    finally:
-        if cursor:
-            cursor.close()
-        if cnx:
-            cnx.close()
+    
+    alerts, next_cursor = paginate(rows, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return alerts
 
 @router.get("/{alert_id}/image")
-def get_alert_image(alert_id: int):
-    cnx = None
-    cursor = None
+async def get_alert_image(alert_id: int, request: Request):
+    """Serve an alert image from the image store (ETag = content hash)"""
     try:
-        if connection_pool:
-            cnx = connection_pool.get_connection()
-        else:
-            cnx = mysql.connector.connect(**{k: v for k, v in db_config.items() if k not in ['pool_name', 'pool_size']})
-        
-        cursor = cnx.cursor()
-        query = "SELECT image_data FROM alerts WHERE id = %s"
-        cursor.execute(query, (alert_id,))
-        result = cursor.fetchone()
-        
-        if result and result[0]:
-            return Response(content=result[0], media_type="image/jpeg")
-        else:
-            raise HTTPException(status_code=404, detail="Image not found")
-            
-    except mysql.connector.Error as err:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(err)}")
+        result = await db.fetch_one("SELECT image_key FROM alerts WHERE id = %s", (alert_id,))
+    except DatabaseUnavailable:
+        raise HTTPException(status_code=503, detail="Database not available")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
-    finally:
-        if cursor:
-            cursor.close()
-        if cnx:
-            cnx.close()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    
+    image_key = result['image_key'] if result else None
+    image_path = get_image_store().path(image_key) if image_key else None
+    if image_path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    # Keys are content hashes, so the image behind a key never changes
+    headers = {"ETag": f'"{image_key}"', "Cache-Control": "public, max-age=31536000, immutable"}
+    if_none_match = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+    if headers["ETag"] in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(image_path, media_type="image/jpeg", headers=headers)
@@ -4,12 +4,17 @@ from pathlib import Path
 from typing import List
 from pydantic import BaseModel
 from datetime import datetime
-import os
+
+from backend.cache import ttl_cache
+from backend.capture_index import get_capture_index
 
 router = APIRouter(prefix="/captures", tags=["captures"])
 
 CAPTURE_DIR = Path("captured_alerts")
 
+# Seeded once (see backend.main startup), then kept current incrementally
+capture_index = get_capture_index(CAPTURE_DIR)
+
 class CaptureFile(BaseModel):
     filename: str
     timestamp: int
@@ -21,29 +26,8 @@ class CaptureFile(BaseModel):
 def get_recent_captures(limit: int = 20):
     """Get list of recent captured alert images"""
     try:
-        if not CAPTURE_DIR.exists():
-            return []
-        
-        files= []
-        for file in CAPTURE_DIR.glob("alert_*.jpg"):
-            # Parse filename: alert_1763879533_13.1m.jpg
-            parts = file.stem.split('_')
-            if len(parts) >= 3:
-                timestamp = int(parts[1])
-                distance = parts[2]
-                
-                files.append({
-                    "filename": file.name,
-                    "timestamp": timestamp,
-                    "distance": distance,
-                    "filesize": file.stat().st_size,
-                    "url": f"/captures/image/{file.name}"
-                })
-        
-        # Sort by timestamp (newest first)
-        files.sort(key=lambda x: x['timestamp'], reverse=True)
-        return files[:limit]
-        
+        # Newest first, straight from the sorted index
+        return capture_index.latest(limit)
     except Exception as e:
         print(f"Error listing captures: {e}")
         return []
@@ -58,24 +42,21 @@ def get_capture_image(filename: str):
     
     return FileResponse(file_path, media_type="image/jpeg")
 
+@ttl_cache(2)
+def _capture_stats():
+    # Count today's captures
+    today_start = datetime.now().replace(hour=0, minute=0, second=0).timestamp()
+    
+    return {
+        "total": capture_index.count(),
+        "today": capture_index.count_since(today_start),
+        "latest": capture_index.latest_timestamp()
+    }
+
 @router.get("/stats")
 def get_capture_stats():
-    """Get statistics about captures"""
+    """Get statistics about captures (cached for a couple of seconds)"""
     try:
-        if not CAPTURE_DIR.exists():
-            return {"total": 0, "today": 0}
-        
-        files = list(CAPTURE_DIR.glob("alert_*.jpg"))
-        total = len(files)
-        
-        # Count today's captures
-        today_start = datetime.now().replace(hour=0, minute=0, second=0).timestamp()
-        today_count = sum(1 for f in files if f.stat().st_mtime > today_start)
-        
-        return {
-            "total": total,
-            "today": today_count,
-            "latest": max((f.stat().st_mtime for f in files), default=0) if files else 0
-        }
+        return _capture_stats()
     except Exception as e:
         return {"total": 0, "today": 0, "error": str(e)}
@@ -3,10 +3,15 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
+from backend.rollups import CLOSE_CALL_DISTANCE
+
 router = APIRouter()
 
 # In-memory storage for when database is offline
+MAX_MOCK_ALERTS = 50
 mock_alerts = []
+# Close calls among mock_alerts, kept in step with inserts and evictions
+close_calls = 0
 
 class ChatMessage(BaseModel):
     message: str
@@ -97,8 +102,6 @@ async def get_suggestions():
             "Stay alert and check your blind spots"
         ]}
     
-    close_calls = sum(1 for a in mock_alerts if a['distance'] < 30)
-    
     if close_calls > 3:
         return {"suggestions": [
             f"You had {close_calls} close calls - increase following distance",
@@ -115,7 +118,9 @@ async def get_suggestions():
 @router.post("/alerts/add")
 async def add_alert(alert: Alert):
     """Add alert to memory (for testing without database)"""
+    global close_calls
     mock_alerts.insert(0, alert.dict())
-    if len(mock_alerts) > 50:
-        mock_alerts.pop()
+    close_calls += alert.distance < CLOSE_CALL_DISTANCE
+    if len(mock_alerts) > MAX_MOCK_ALERTS:
+        close_calls -= mock_alerts.pop()['distance'] < CLOSE_CALL_DISTANCE
     return {"message": "Alert added", "total": len(mock_alerts)}
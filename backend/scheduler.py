@@ -0,0 +1,141 @@
+"""
+Adaptive inference scheduling for the live detectors.
+
+The scheduler decides, per captured frame, whether to run a full detection
+and at which input resolution. Two signals drive it:
+
+    distance  - the nearest vehicle (from the pinhole estimate). With nothing
+                nearby it drops to the smallest input and detects only every
+                Nth frame. As a vehicle closes in it moves up to the full
+                resolution and detects every frame.
+    latency   - a smoothed detection time per input size. If detecting at the
+                chosen rate would exceed the frame budget (1 / target fps),
+                the scheduler steps the resolution down. If even the smallest
+                input is too slow, it lengthens the detection interval.
+
+Between full detections the tracker (backend/tracker.py) coasts its tracks
+forward with their Kalman prediction. This costs microseconds, so the output
+rate can stay at the camera rate.
+"""
+
+import math
+
+import numpy as np
+
+from backend.postprocess import NO_DISTANCE
+
+DEFAULT_SIZES = (320, 416, 640)
+
+
+class AdaptiveScheduler:
+    """
+    Pick the input size and detection interval for the next frame
+
+    Args:
+        sizes: Candidate square input sizes (multiples of the model stride)
+        target_fps: Frame rate the output should keep up with (the camera rate)
+        max_interval: Longest detection interval, used when nothing is near
+        near_distance: At or below this distance (m), detect every frame at full size
+        far_distance: At or beyond this distance (m), run at the smallest size and max_interval
+        smoothing: EMA factor for latency and for releasing the nearest distance
+        release_after: Consecutive detections without a vehicle before the nearest distance relaxes
+    """
+
+    def __init__(self, sizes=DEFAULT_SIZES, target_fps=30.0, max_interval=4, near_distance=15.0,
+                 far_distance=60.0, smoothing=0.2, release_after=3):
+        self.sizes = tuple(sorted(set(sizes)))
+        self.budget = 1.0 / target_fps
+        self.max_interval = max(1, int(max_interval))
+        self.near_distance = near_distance
+        self.far_distance = far_distance
+        self.smoothing = smoothing
+        self.release_after = max(1, int(release_after))
+
+        # Start conservatively: full size, every frame, until there is data
+        self.size = self.sizes[-1]
+        self.interval = 1
+        self.nearest = 0.0
+        self._latency = {}
+        self._since = self.interval  # first frame is always detected
+        self._empty = 0  # consecutive detections without a vehicle
+        self.detected = 0
+        self.carried = 0
+
+    def next(self):
+        """Input size for this frame, or None to carry the previous boxes forward"""
+        self._since += 1
+        if self._since < self.interval:
+            self.carried += 1
+            return None
+        self._since = 0
+        self.detected += 1
+        return self.size
+
+    def update(self, latency, nearest=NO_DISTANCE):
+        """
+        Feed back one full detection
+
+        Args:
+            latency: Detection time in seconds (preprocess + inference + NMS) at self.size
+            nearest: Distance to the nearest vehicle in meters (NO_DISTANCE if none)
+        """
+        prev = self._latency.get(self.size)
+        self._latency[self.size] = latency if prev is None else prev + self.smoothing * (latency - prev)
+        self._update_nearest(nearest)
+        self._plan()
+
+    def _update_nearest(self, nearest):
+        # A close vehicle that drops out of one detection (NMS, occlusion) is not gone. Hold the
+        # distance until release_after empty detections in a row, then relax toward far_distance.
+        if nearest >= NO_DISTANCE:
+            self._empty += 1
+            if self._empty < self.release_after:
+                return
+        else:
+            self._empty = 0
+        # React to an approaching vehicle at once, relax slowly once it has gone
+        target = min(nearest, self.far_distance)
+        if target <= self.nearest:
+            self.nearest = target
+        else:
+            self.nearest += self.smoothing * (target - self.nearest)
+
+    def urgency(self):
+        """0 with nothing within far_distance, 1 at or inside near_distance"""
+        span = self.far_distance - self.near_distance
+        return float(np.clip((self.far_distance - self.nearest) / span, 0.0, 1.0)) if span > 0 else 1.0
+
+    def estimate_latency(self, size):
+        """Smoothed latency at size, scaled by pixel count from the nearest measured size"""
+        if size in self._latency:
+            return self._latency[size]
+        if not self._latency:
+            return 0.0
+        ref = min(self._latency, key=lambda s: abs(s - size))
+        return self._latency[ref] * (size / ref) ** 2
+
+    def _needed_interval(self, size):
+        return max(1, math.ceil(self.estimate_latency(size) / self.budget))
+
+    def _plan(self):
+        urgency = self.urgency()
+        # Staleness we accept: every frame when close, up to max_interval when clear
+        allowed = round(self.max_interval - urgency * (self.max_interval - 1))
+        idx = round(urgency * (len(self.sizes) - 1))
+        while idx > 0 and self._needed_interval(self.sizes[idx]) > allowed:
+            idx -= 1
+        self.size = self.sizes[idx]
+        self.interval = max(allowed, self._needed_interval(self.size))
+
+    def stats(self):
+        total = self.detected + self.carried
+        return {
+            "input_size": self.size,
+            "interval": self.interval,
+            "nearest_m": round(self.nearest, 1),
+            "detected_frames": self.detected,
+            "carried_frames": self.carried,
+            "detect_ratio": round(self.detected / total, 3) if total else 0.0,
+            "latency_ms": {s: round(t * 1000, 2) for s, t in sorted(self._latency.items())},
+        }
+
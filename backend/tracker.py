@@ -0,0 +1,255 @@
+"""
+SORT-style multi-object tracker for the proximity alert.
+
+Every track keeps a constant-velocity Kalman filter over (cx, cy, area,
+aspect). All tracks are held in stacked arrays, so predict and update are
+batched matrix operations rather than a Python loop over tracks. Detections
+are associated with the predicted boxes by same-class IoU using the Hungarian
+algorithm. There is no appearance model.
+
+Each track also carries:
+
+    distance       - EMA of the pinhole distance of its boxes
+    closing_speed  - EMA of the rate the distance shrinks at (m/s, > 0 approaching)
+    ttc            - time to collision, distance / closing_speed
+    last_alert     - so that alerts are rate-limited per track, not globally
+
+A track is hazardous once it has been seen min_hits times and is either
+inside the alert distance or on course to collide within ttc_threshold.
+A single noisy box therefore cannot raise an alert on its own.
+"""
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from backend.postprocess import ALERT_DISTANCE, NO_DISTANCE
+
+# Constant-velocity model over [cx, cy, s, r, vcx, vcy, vs] (as in SORT)
+_F = np.eye(7, dtype=np.float64)
+_F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 1e-4])
+_R = np.diag([1.0, 1.0, 10.0, 10.0])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+
+
+def _xyxy_to_z(boxes):
+    w = boxes[:, 2] - boxes[:, 0]
+    h = boxes[:, 3] - boxes[:, 1]
+    return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w * h, w / np.maximum(h, 1e-6)], axis=1)
+
+
+def _x_to_xyxy(x):
+    w = np.sqrt(np.clip(x[:, 2] * x[:, 3], 0, None))
+    h = x[:, 2] / np.maximum(w, 1e-6)
+    return np.stack([x[:, 0] - w / 2, x[:, 1] - h / 2, x[:, 0] + w / 2, x[:, 1] + h / 2], axis=1)
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of (n, 4) and (m, 4) xyxy boxes"""
+    w = np.minimum(a[:, 2, None], b[:, 2]) - np.maximum(a[:, 0, None], b[:, 0])
+    h = np.minimum(a[:, 3, None], b[:, 3]) - np.maximum(a[:, 1, None], b[:, 1])
+    inter = np.maximum(w, 0) * np.maximum(h, 0)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b - inter + 1e-9)
+
+
+class Tracker:
+    """
+    Track detections across frames and decide which tracks should alert
+
+    Args:
+        iou_thres: Minimum IoU between a prediction and a detection to associate them
+        max_age: Frames a track survives without a matching detection
+        min_hits: Detections before a track may raise an alert
+        alert_distance: Smoothed distance (m) under which a confirmed vehicle is a hazard
+        ttc_threshold: Time to collision (s) under which a confirmed vehicle is a hazard
+        alert_cooldown: Seconds between alerts for the same track
+        distance_smoothing: EMA factor for per-track distance
+        speed_smoothing: EMA factor for per-track closing speed
+    """
+
+    def __init__(self, iou_thres=0.3, max_age=10, min_hits=2, alert_distance=ALERT_DISTANCE,
+                 ttc_threshold=2.0, alert_cooldown=3.0, distance_smoothing=0.3, speed_smoothing=0.2):
+        self.iou_thres = iou_thres
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.alert_distance = alert_distance
+        self.ttc_threshold = ttc_threshold
+        self.alert_cooldown = alert_cooldown
+        self.distance_smoothing = distance_smoothing
+        self.speed_smoothing = speed_smoothing
+
+        self._next_id = 1
+        self.x = np.zeros((0, 7))
+        self.P = np.zeros((0, 7, 7))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.cls = np.zeros(0, dtype=np.int64)
+        self.conf = np.zeros(0, dtype=np.float32)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int64)
+        self.distance = np.zeros(0)
+        self.speed = np.zeros(0)
+        self.stamp = np.zeros(0)
+        self.last_alert = np.zeros(0)
+        # Track row for each detection of the last frame passed to update()
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._coasted = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _predict(self):
+        # Keep the area from going negative
+        self.x[(self.x[:, 2] + self.x[:, 6]) <= 0, 6] = 0
+        self.x = self.x @ _F.T
+        self.P = _F @ self.P @ _F.T + _Q
+        self.misses += 1
+
+    def _correct(self, rows, z):
+        P = self.P[rows]
+        S = P[:, :4, :4] + _R
+        K = P[:, :, :4] @ np.linalg.inv(S)
+        self.x[rows] += (K @ (z - self.x[rows, :4])[:, :, None])[:, :, 0]
+        self.P[rows] = P - K @ P[:, :4, :]
+        self.hits[rows] += 1
+        self.misses[rows] = 0
+
+    def _associate(self, boxes, cls):
+        """(det_idx, track_row) pairs by same-class IoU"""
+        if not len(boxes) or not len(self.ids):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        iou = iou_matrix(boxes, _x_to_xyxy(self.x))
+        iou[cls[:, None] != self.cls[None, :]] = 0
+        det_idx, rows = linear_sum_assignment(-iou)
+        keep = iou[det_idx, rows] >= self.iou_thres
+        return det_idx[keep], rows[keep]
+
+    def _spawn(self, boxes, cls, conf, distance, timestamp):
+        n = len(boxes)
+        if not n:
+            return
+        x = np.zeros((n, 7))
+        x[:, :4] = _xyxy_to_z(boxes)
+        self.x = np.concatenate([self.x, x])
+        self.P = np.concatenate([self.P, np.broadcast_to(_P0, (n, 7, 7))])
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + n)])
+        self._next_id += n
+        self.cls = np.concatenate([self.cls, cls])
+        self.conf = np.concatenate([self.conf, conf])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(n, dtype=np.int64)])
+        self.distance = np.concatenate([self.distance, distance])
+        self.speed = np.concatenate([self.speed, np.zeros(n)])
+        self.stamp = np.concatenate([self.stamp, np.full(n, timestamp)])
+        self.last_alert = np.concatenate([self.last_alert, np.full(n, -np.inf)])
+
+    def _prune(self):
+        alive = self.misses <= self.max_age
+        if alive.all():
+            return
+        for name in ('x', 'P', 'ids', 'cls', 'conf', 'hits', 'misses', 'distance', 'speed', 'stamp',
+                     'last_alert'):
+            setattr(self, name, getattr(self, name)[alive])
+
+    def coast(self, shape=None):
+        """
+        Advance every track one frame without a detection (skipped frames)
+
+        Returns:
+            (n, 6) xyxy/conf/cls predicted boxes, clipped to shape (h, w) if given. Pass
+            the FrameDetections built from them to update(..., coasted=True).
+        """
+        self._predict()
+        self._prune()
+        self._coasted = np.flatnonzero(self.hits >= self.min_hits)
+        det = np.zeros((len(self._coasted), 6), dtype=np.float32)
+        det[:, :4] = _x_to_xyxy(self.x[self._coasted])
+        det[:, 4] = self.conf[self._coasted]
+        det[:, 5] = self.cls[self._coasted]
+        if shape is not None:
+            det[:, [0, 2]] = det[:, [0, 2]].clip(0, shape[1])
+            det[:, [1, 3]] = det[:, [1, 3]].clip(0, shape[0])
+        return det
+
+    def update(self, result, timestamp, coasted=False):
+        """
+        Associate a frame's detections with tracks and attach per-track estimates
+
+        Args:
+            result: FrameDetections for the frame; gets track_id, smoothed distance,
+                closing_speed, ttc and the hazard mask via set_tracks()
+            timestamp: Frame time in seconds
+            coasted: result was built from coast() instead of a detection pass
+        """
+        if coasted:
+            rows = self._coasted
+            # Distances are extrapolated, not measured, on coasted frames
+            distance = self.distance[rows] - self.speed[rows] * (timestamp - self.stamp[rows])
+        else:
+            self._predict()
+            boxes = result.boxes.astype(np.float64)
+            det_idx, rows_m = self._associate(boxes, result.cls)
+
+            if len(det_idx):
+                self._correct(rows_m, _xyxy_to_z(boxes[det_idx]))
+                self.conf[rows_m] = result.conf[det_idx]
+                self._smooth_distance(rows_m, result.distance[det_idx], timestamp)
+
+            unmatched = np.ones(len(result), dtype=bool)
+            unmatched[det_idx] = False
+            new = np.flatnonzero(unmatched)
+            first_new = len(self.ids)
+            self._spawn(boxes[new], result.cls[new], result.conf[new], result.distance[new], timestamp)
+
+            rows = np.empty(len(result), dtype=np.int64)
+            rows[det_idx] = rows_m
+            rows[new] = np.arange(first_new, first_new + len(new))
+            # Pruning only drops unmatched tracks, so map detections through their ids
+            det_ids = self.ids[rows]
+            self._prune()
+            rows = np.searchsorted(self.ids, det_ids)
+            distance = self.distance[rows]
+
+        speed = self.speed[rows]
+        ttc = np.full(len(rows), np.inf)
+        approaching = speed > 0
+        ttc[approaching] = distance[approaching] / speed[approaching]
+        confirmed = self.hits[rows] >= self.min_hits
+        hazard = confirmed & result.is_vehicle & ((distance < self.alert_distance) | (ttc < self.ttc_threshold))
+
+        self._rows = rows
+        result.set_tracks(self.ids[rows], distance, speed, ttc, hazard)
+        return result
+
+    def _smooth_distance(self, rows, measured, timestamp):
+        vehicle = measured < NO_DISTANCE
+        rows, measured = rows[vehicle], measured[vehicle]
+        prev = self.distance[rows]
+        dt = timestamp - self.stamp[rows]
+        smoothed = np.where(prev < NO_DISTANCE, prev + self.distance_smoothing * (measured - prev), measured)
+        valid = (dt > 0) & (prev < NO_DISTANCE)
+        rate = np.zeros(len(rows))
+        rate[valid] = (prev[valid] - smoothed[valid]) / dt[valid]
+        self.speed[rows] = np.where(valid, self.speed[rows] + self.speed_smoothing * (rate - self.speed[rows]),
+                                    self.speed[rows])
+        self.distance[rows] = smoothed
+        self.stamp[rows] = timestamp
+
+    def due_alerts(self, result, timestamp):
+        """
+        Indices into result of hazards whose track is out of its alert cooldown
+
+        The returned tracks are marked as alerted at timestamp.
+        """
+        rows = self._rows
+        due = np.flatnonzero(result.in_range & (timestamp - self.last_alert[rows] > self.alert_cooldown))
+        self.last_alert[rows[due]] = timestamp
+        return due
+
+    def stats(self):
+        return {
+            "tracks": len(self.ids),
+            "confirmed": int((self.hits >= self.min_hits).sum()),
+            "next_id": self._next_id,
+        }
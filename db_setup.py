@@ -1,17 +1,26 @@
 """
 Enhanced Database Setup with User Management
 Creates tables for: users, alerts, user_sessions
+
+Run with --indexes to add the alert listing indexes to an existing
+database without recreating any tables, or with --rollups to add and
+backfill the dashboard rollup tables (backend/rollups.py).
 """
 
+import os
+import sys
 import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
 
+from backend.alert_queries import ALERT_INDEXES
+from backend.rollups import BACKFILL, ROLLUP_TABLES, USER_INDEXES
+
 # Database configuration
-DB_HOST = 'localhost'
-DB_USER = 'root'
-DB_PASSWORD = 'Anurag*29'
-DB_NAME = 'car'
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', '')
+DB_NAME = os.getenv('DB_NAME', 'car')
 
 def create_database_and_tables():
     """Create database and all required tables"""
@@ -35,13 +44,16 @@ def create_database_and_tables():
             cursor.execute(f"USE {DB_NAME}")
             
             # Drop existing tables to recreate with new schema
+            for table in ROLLUP_TABLES:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
             cursor.execute("DROP TABLE IF EXISTS user_sessions")
             cursor.execute("DROP TABLE IF EXISTS user_alerts")
             cursor.execute("DROP TABLE IF EXISTS alerts")
             cursor.execute("DROP TABLE IF EXISTS users")
             
-            # Create users table
-            create_users_table = """
+            # Create users table (last_login is indexed for the active-users count)
+            user_indexes = "".join(f",\n                INDEX {name} {cols}" for name, cols in USER_INDEXES.items())
+            create_users_table = f"""
             CREATE TABLE users (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 uid VARCHAR(255) UNIQUE NOT NULL,
@@ -51,14 +63,16 @@ def create_database_and_tables():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 last_login TIMESTAMP NULL,
                 role ENUM('user', 'admin') DEFAULT 'user',
-                is_active BOOLEAN DEFAULT TRUE
+                is_active BOOLEAN DEFAULT TRUE{user_indexes}
             )
             """
             cursor.execute(create_users_table)
             print("✓ Table 'users' created")
             
             # Create alerts table (enhanced with user reference)
-            create_alerts_table = """
+            # Composite indexes back the keyset-paginated listings in backend/alert_queries.py
+            alert_indexes = "".join(f",\n                INDEX {name} {cols}" for name, cols in ALERT_INDEXES.items())
+            create_alerts_table = f"""
             CREATE TABLE alerts (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 user_id INT,
@@ -67,8 +81,9 @@ def create_database_and_tables():
                 confidence FLOAT,
                 distance FLOAT,
                 image_path VARCHAR(255),
-                image_data LONGBLOB,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                image_key CHAR(64),
+                image_size INT,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE{alert_indexes}
             )
             """
             cursor.execute(create_alerts_table)
@@ -89,6 +104,11 @@ def create_database_and_tables():
             cursor.execute(create_sessions_table)
             print("✓ Table 'user_sessions' created")
             
+            # Dashboard counters, maintained by the writers from here on
+            for table, ddl in ROLLUP_TABLES.items():
+                cursor.execute(ddl)
+                print(f"✓ Table '{table}' created")
+            
             # Create admin user
             admin_email = "admin@adas.com"
             admin_uid = "admin-" + datetime.now().strftime("%Y%m%d%H%M%S")
@@ -98,13 +118,14 @@ def create_database_and_tables():
             VALUES (%s, %s, %s, %s, %s)
             """
             cursor.execute(insert_admin, (admin_uid, admin_email, "Admin", True, "admin"))
+            cursor.execute("INSERT INTO stat_counters (name, value) VALUES ('users', 1), ('alerts', 0)")
             print(f"✓ Admin user created: {admin_email}")
             print(f"  Note: Create Firebase account with this email to access admin panel")
             
             connection.commit()
             print("\n✅ Database setup complete!")
             print(f"📊 Database: {DB_NAME}")
-            print(f"📋 Tables created: users, alerts, user_sessions")
+            print(f"📋 Tables created: users, alerts, user_sessions, {', '.join(ROLLUP_TABLES)}")
             print(f"\n🔐 Admin Account:")
             print(f"   Email: {admin_email}")
             print(f"   Password: Set this in Firebase Authentication")
@@ -118,6 +139,77 @@ def create_database_and_tables():
             connection.close()
             print("\n✓ Database connection closed")
 
+def add_alert_indexes():
+    """Create any missing alert indexes on an existing database"""
+    connection = mysql.connector.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME
+    )
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'alerts'
+        """, (DB_NAME,))
+        existing = {row[0] for row in cursor.fetchall()}
+        
+        for name, cols in ALERT_INDEXES.items():
+            if name in existing:
+                print(f"✓ Index '{name}' already exists")
+                continue
+            cursor.execute(f"CREATE INDEX {name} ON alerts {cols}")
+            print(f"✓ Index '{name}' created")
+    except Error as e:
+        print(f"❌ Error: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+
+def add_rollups():
+    """Create the rollup tables and last_login index if missing, then rebuild the counters"""
+    connection = mysql.connector.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME
+    )
+    cursor = connection.cursor()
+    try:
+        for table, ddl in ROLLUP_TABLES.items():
+            cursor.execute(ddl)
+            print(f"✓ Table '{table}' created/verified")
+        
+        cursor.execute("""
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'users'
+        """, (DB_NAME,))
+        existing = {row[0] for row in cursor.fetchall()}
+        for name, cols in USER_INDEXES.items():
+            if name not in existing:
+                cursor.execute(f"CREATE INDEX {name} ON users {cols}")
+                print(f"✓ Index '{name}' created")
+        
+        # One full scan here so the dashboard never needs one
+        for statement in BACKFILL:
+            cursor.execute(statement)
+        connection.commit()
+        print("✓ Rollups backfilled from users and alerts")
+    except Error as e:
+        connection.rollback()
+        print(f"❌ Error: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+
 if __name__ == "__main__":
-    print("🚀 Setting up ADAS Database...\n")
-    create_database_and_tables()
+    if "--rollups" in sys.argv:
+        print("🚀 Adding dashboard rollups...\n")
+        add_rollups()
+    elif "--indexes" in sys.argv:
+        print("🚀 Adding alert indexes...\n")
+        add_alert_indexes()
+    else:
+        print("🚀 Setting up ADAS Database...\n")
+        create_database_and_tables()
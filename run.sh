@@ -11,13 +11,18 @@ case "$1" in
         ;;
     "inference"|"images")
         echo "📸 Running inference on validation images..."
-        $PYTHON run_complete_inference.py
+        $PYTHON run_batch_inference.py dataset/images/val --save-images output_images_test_set
         ;;
     "camera"|"live")
         echo "📹 Starting live camera detection..."
         echo "Press 'q' in the camera window to quit"
         $PYTHON run_live_camera.py
         ;;
+    "multi")
+        echo "📹 Starting batched multi-camera detection..."
+        shift
+        $PYTHON run_multi_camera.py --sources "${@:-0}"
+        ;;
     "record")
         echo "🎬 Starting camera with recording..."
         $PYTHON run_live_camera.py --save-video
@@ -38,6 +43,7 @@ Options:
   menu         Start interactive menu
   inference    Run inference on validation images
   camera       Start live camera detection
+  multi [src]  Batched detection over several cameras/streams/files
   record       Start camera with video recording
   verify       Verify setup and dependencies
   help         Show this help message
@@ -45,6 +51,7 @@ Options:
 Examples:
   ./run.sh              # Interactive menu
   ./run.sh camera       # Live camera
+  ./run.sh multi 0 1    # Front and rear cameras in one batch
   ./run.sh inference    # Process images
   ./run.sh verify       # Check setup
 
@@ -0,0 +1,366 @@
+"""
+Offline batch YOLO inference over image directories, globs and video files
+Runs the same load_model / Letterbox / NMS / scale_boxes path as LiveYOLODetector
+in a process pool (one model per worker), streams per-frame results to
+JSONL or Parquet and writes a runtime report with throughput, latency
+percentiles and per-stage timing
+
+Usage:
+    python run_batch_inference.py dataset/images/val --output outputs/val_results.jsonl
+    python run_batch_inference.py "recordings/*.mp4" --workers 4 --threads 8 --output outputs/drive.parquet
+    python run_batch_inference.py dataset/images/val --save-images output_images_test_set
+"""
+import sys
+import os
+import time
+import glob
+import json
+import queue
+import pathlib
+import platform
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Monkey-patch pathlib BEFORE any imports that might use it (also runs in every spawned worker)
+class WindowsPath(pathlib.PurePosixPath):
+    pass
+pathlib.WindowsPath = WindowsPath
+
+import cv2
+import numpy as np
+import torch
+
+from backend.calibration import load_profile
+from backend.model import BACKENDS, YOLOV5_DIR, load_model
+from backend.postprocess import FrameDetections, annotate, class_lookup
+from backend.preprocess import Letterbox
+
+if str(YOLOV5_DIR) not in sys.path:
+    sys.path.insert(0, str(YOLOV5_DIR))
+
+from utils.general import check_img_size, non_max_suppression, scale_boxes
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+VIDEO_SUFFIXES = ('.mp4', '.avi', '.mov', '.mkv', '.m4v')
+STAGES = ('decode', 'preprocess', 'inference', 'nms', 'postprocess')
+
+
+def expand_sources(sources, chunk_size=64, video_chunk=300):
+    """
+    Turn directories, globs, image and video paths into work items
+
+    Images are grouped into ('images', [paths]) chunks; videos are split into
+    ('video', path, start_frame, end_frame) ranges so long files spread over workers.
+    """
+    images, tasks = [], []
+    for source in sources:
+        if any(c in source for c in '*?['):
+            paths = sorted(Path(p) for p in glob.glob(source, recursive=True))
+        elif Path(source).is_dir():
+            paths = sorted(p for p in Path(source).rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES + VIDEO_SUFFIXES)
+        else:
+            paths = [Path(source)]
+
+        for path in paths:
+            suffix = path.suffix.lower()
+            if suffix in IMAGE_SUFFIXES:
+                images.append(str(path))
+            elif suffix in VIDEO_SUFFIXES:
+                cap = cv2.VideoCapture(str(path))
+                total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                cap.release()
+                if total <= 0:
+                    print(f"⚠ Skipping {path}: could not read frame count")
+                    continue
+                tasks += [('video', str(path), start, min(start + video_chunk, total))
+                          for start in range(0, total, video_chunk)]
+            else:
+                print(f"⚠ Skipping {path}: unsupported file type")
+
+    tasks += [('images', images[i:i + chunk_size]) for i in range(0, len(images), chunk_size)]
+    return tasks
+
+
+def decode(task):
+    """Yield (source, frame_index, frame, decode_seconds) for one work item"""
+    if task[0] == 'images':
+        for path in task[1]:
+            t0 = time.perf_counter()
+            frame = cv2.imread(path)
+            if frame is None:
+                print(f"⚠ Could not read {path}")
+                continue
+            yield path, 0, frame, time.perf_counter() - t0
+        return
+
+    _, path, start, end = task
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    try:
+        for index in range(start, end):
+            t0 = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield path, index, frame, time.perf_counter() - t0
+    finally:
+        cap.release()
+
+
+def prefetch(iterable, size):
+    """Run a generator on a background thread, keeping up to `size` items decoded ahead"""
+    q = queue.Queue(maxsize=size)
+    done = object()
+
+    def fill():
+        try:
+            for item in iterable:
+                q.put(item)
+        finally:
+            q.put(done)
+
+    threading.Thread(target=fill, daemon=True).start()
+    while True:
+        item = q.get()
+        if item is done:
+            return
+        yield item
+
+
+class BatchWorker:
+    """Model, letterbox buffer and NMS settings for one pool process"""
+
+    def __init__(self, weights, backend, threads, img_size, conf_thres, iou_thres, prefetch, save_dir, profile=None):
+        cv2.setNumThreads(1)  # decode/resize threads would compete with the model's intra-op budget
+        self.device = torch.device('cpu')
+        self.model = load_model(weights, self.device, backend=backend, threads=threads)
+        self.names = self.model.names
+        self.imgsz = getattr(self.model, 'input_size', None) or check_img_size(img_size, s=self.model.stride)
+        self.model.warmup(imgsz=(1, 3, self.imgsz, self.imgsz))
+        self.letterbox = Letterbox(self.imgsz, device=self.device, fp16=self.model.fp16)
+        self.vehicle_lut = class_lookup(self.names)
+        # Distance calibration, as in the live detectors (see backend/calibration.py)
+        self.calibration = load_profile(profile)
+        self.width_lut = self.calibration.width_lookup(self.names)
+        self.conf_thres = conf_thres
+        self.iou_thres = iou_thres
+        self.prefetch = prefetch
+        self.save_dir = Path(save_dir) if save_dir else None
+
+    def run(self, task):
+        records = []
+        for source, index, frame, decode_time in prefetch(decode(task), self.prefetch):
+            timings = {'decode': decode_time}
+
+            t0 = time.perf_counter()
+            img = self.letterbox(frame)
+            t1 = time.perf_counter()
+            pred = self.model(img, augment=False, visualize=False)
+            t2 = time.perf_counter()
+            det = non_max_suppression(pred, self.conf_thres, self.iou_thres, None, False, max_det=1000)[0]
+            t3 = time.perf_counter()
+            if len(det):
+                det[:, :4] = scale_boxes(img.shape[2:], det[:, :4], frame.shape,
+                                         ratio_pad=self.letterbox.ratio_pad[0]).round()
+            result = FrameDetections(det, self.vehicle_lut, self.width_lut, self.calibration.focal_for(frame.shape[1]))
+            detections = result.as_dicts(self.names, distances=True)
+            if self.save_dir:
+                name = Path(source).name if task[0] == 'images' else f"{Path(source).stem}_{index:06d}.jpg"
+                cv2.imwrite(str(self.save_dir / name), annotate(frame, result, self.names))
+            t4 = time.perf_counter()
+
+            timings.update(preprocess=t1 - t0, inference=t2 - t1, nms=t3 - t2, postprocess=t4 - t3)
+            records.append({
+                'source': source,
+                'frame': index,
+                'width': frame.shape[1],
+                'height': frame.shape[0],
+                'alert': result.alert,
+                'detections': detections,
+                'timings_ms': {k: round(v * 1000, 3) for k, v in timings.items()},
+            })
+        return records
+
+
+_worker = None
+
+
+def _init_worker(config):
+    global _worker
+    _worker = BatchWorker(**config)
+
+
+def _run_task(task):
+    return _worker.names, _worker.run(task)
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w')
+
+    def write(self, records):
+        for r in records:
+            self.file.write(json.dumps(r) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """One row per frame; detections are a list<struct> column"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow), or use a .jsonl output")
+        self.pa = pa
+        detection = pa.struct([('class', pa.string()), ('confidence', pa.float32()),
+                               ('bbox', pa.list_(pa.int32())), ('distance', pa.float32())])
+        self.schema = pa.schema([
+            ('source', pa.string()), ('frame', pa.int64()), ('width', pa.int32()), ('height', pa.int32()),
+            ('alert', pa.bool_()), ('detections', pa.list_(detection)),
+            ('timings_ms', pa.struct([(s, pa.float64()) for s in STAGES])),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, records):
+        if records:
+            self.writer.write_table(self.pa.Table.from_pylist(records, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def write_report(path, args, records_meta, wall_time, names, worker_threads):
+    """Runtime report in the layout of outputs/final_runtime_report.txt"""
+    frames = len(records_meta['latency'])
+    latency = np.array(records_meta['latency']) if frames else np.zeros(1)
+    stages = {s: np.array(records_meta['stages'][s]) for s in STAGES}
+
+    lines = [
+        "=" * 80,
+        "YOLO OBJECT DETECTION - BATCH INFERENCE RUN",
+        "=" * 80,
+        "",
+        "ENVIRONMENT:",
+        f"  Python: {sys.version}",
+        f"  Platform: {platform.platform()}",
+        f"  PyTorch: {torch.__version__}",
+        f"  Device: cpu",
+        f"  Workers: {args.workers} x {worker_threads} intra-op threads",
+        "",
+        "MODEL:",
+        f"  Weights: {args.weights}",
+        f"  Backend: {args.backend}",
+        f"  Image size: {args.img_size}",
+        f"  Classes: {', '.join(names.values() if isinstance(names, dict) else names)}",
+        "",
+        "INFERENCE RESULTS:",
+        f"  Sources: {', '.join(args.sources)}",
+        f"  Total frames: {frames}",
+        f"  Total detections: {records_meta['detections']}",
+        f"  Frames with proximity alert: {records_meta['alerts']}",
+        f"  Wall time: {wall_time:.2f}s",
+        f"  Throughput: {frames / wall_time if wall_time > 0 else 0:.2f} frames/s",
+        f"  Latency per frame (preprocess -> postprocess): p50 {np.percentile(latency, 50):.2f}ms, "
+        f"p95 {np.percentile(latency, 95):.2f}ms, p99 {np.percentile(latency, 99):.2f}ms",
+        "",
+        "PER-STAGE TIMING (ms):",
+        f"  {'stage':<14}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'total s':>10}",
+    ]
+    for stage, t in stages.items():  # already in ms
+        if not len(t):
+            continue
+        lines.append(f"  {stage:<14}{t.mean():>10.2f}{np.percentile(t, 50):>10.2f}{np.percentile(t, 95):>10.2f}"
+                     f"{np.percentile(t, 99):>10.2f}{t.sum() / 1000:>10.2f}")
+    lines += [
+        "",
+        "PER-SOURCE RESULTS:",
+        "-" * 80,
+    ]
+    for source, (count, dets) in sorted(records_meta['sources'].items()):
+        lines.append(f"  {source}: {count} frames, {dets} detections")
+    if args.output:
+        lines += ["", f"Per-frame results: {args.output}"]
+
+    report = "\n".join(lines)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(report + "\n")
+    return report
+
+
+def main():
+    """Main function to run batch inference"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Offline batch YOLO inference')
+    parser.add_argument('sources', nargs='+', help='Image directories, globs, image or video files')
+    parser.add_argument('--weights', type=str,
+                        default='yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt')
+    parser.add_argument('--backend', type=str, default='pytorch', choices=BACKENDS)
+    parser.add_argument('--img-size', type=int, default=640)
+    parser.add_argument('--conf-thres', type=float, default=0.25)
+    parser.add_argument('--iou-thres', type=float, default=0.45)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='Pool processes, each with its own model')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1,
+                        help='Total intra-op thread budget, split across workers')
+    parser.add_argument('--prefetch', type=int, default=8, help='Frames decoded ahead per worker')
+    parser.add_argument('--chunk-size', type=int, default=64, help='Images per work item')
+    parser.add_argument('--video-chunk', type=int, default=300, help='Video frames per work item')
+    parser.add_argument('--output', type=str, default='outputs/batch_results.jsonl',
+                        help='Per-frame results (.jsonl or .parquet)')
+    parser.add_argument('--save-images', type=str, default=None, help='Directory for annotated frames')
+    parser.add_argument('--report', type=str, default='outputs/batch_runtime_report.txt')
+    parser.add_argument('--profile', type=str, default=None,
+                        help='Camera profile name in calibration/ or path (default: $CAMERA_PROFILE)')
+    args = parser.parse_args()
+
+    tasks = expand_sources(args.sources, args.chunk_size, args.video_chunk)
+    if not tasks:
+        print("✗ No images or videos found")
+        return
+    worker_threads = max(1, args.threads // args.workers)
+    if args.save_images:
+        Path(args.save_images).mkdir(parents=True, exist_ok=True)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    writer = ParquetWriter(args.output) if args.output.endswith('.parquet') else JsonlWriter(args.output)
+
+    config = dict(weights=args.weights, backend=args.backend, threads=worker_threads, img_size=args.img_size,
+                  conf_thres=args.conf_thres, iou_thres=args.iou_thres, prefetch=args.prefetch,
+                  save_dir=args.save_images, profile=args.profile)
+    meta = {'latency': [], 'stages': {s: [] for s in STAGES}, 'detections': 0, 'alerts': 0, 'sources': {}}
+    names = {}
+
+    print(f"Running {len(tasks)} work items on {args.workers} workers x {worker_threads} threads...")
+    start = time.time()
+    # spawn: each worker loads its own model instead of inheriting torch state through fork
+    with ProcessPoolExecutor(args.workers, mp_context=mp.get_context('spawn'),
+                             initializer=_init_worker, initargs=(config,)) as pool:
+        futures = [pool.submit(_run_task, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            names, records = future.result()
+            writer.write(records)
+            for r in records:
+                t = r['timings_ms']
+                for s in STAGES:
+                    meta['stages'][s].append(t[s])
+                meta['latency'].append(sum(t[s] for s in STAGES if s != 'decode'))
+                meta['detections'] += len(r['detections'])
+                meta['alerts'] += r['alert']
+                count, dets = meta['sources'].get(r['source'], (0, 0))
+                meta['sources'][r['source']] = (count + 1, dets + len(r['detections']))
+            print(f"  [{done}/{len(tasks)}] {len(meta['latency'])} frames", end='\r')
+    wall_time = time.time() - start
+    writer.close()
+
+    print("\n" + write_report(args.report, args, meta, wall_time, names, worker_threads))
+    print(f"\n✓ Report written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
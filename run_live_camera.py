@@ -19,20 +19,32 @@ import torch
 import cv2
 import cv2
 import numpy as np
-import mysql.connector
-from datetime import datetime
 
 # Add yolov5_official to path
 sys.path.insert(0, 'yolov5_official')
 
-from models.common import DetectMultiBackend
 from utils.general import (check_img_size, non_max_suppression, scale_boxes)
-from utils.plots import Annotator, colors
 from utils.torch_utils import select_device
 
+from backend import metrics
+from backend.alert_sink import AlertSink
+from backend.calibration import load_profile
+from backend.db import db_config
+from backend.model import BACKENDS, load_model
+from backend.motion import MotionGate
+from backend.postprocess import ALERT_DISTANCE, FrameDetections, annotate, class_lookup
+from backend.preprocess import Letterbox
+from backend.roi import RoiPlanner, offset_boxes
+from backend.scheduler import DEFAULT_SIZES, AdaptiveScheduler
+from backend.tracker import Tracker
+
+ALERT_BANNER = "WARNING: VEHICLE PROXIMITY ALERT!"
+
 class LiveYOLODetector:
     def __init__(self, weights='yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt', 
-                 conf_thres=0.25, iou_thres=0.45, img_size=640):
+                 conf_thres=0.25, iou_thres=0.45, img_size=640, headless=False,
+                 backend='pytorch', threads=None, adaptive=False, target_fps=30.0, roi=None,
+                 roi_full_every=10, roi_size=None, motion_gate=False, motion_max_stale=1.0, profile=None):
         """
         Initialize live YOLO detector
         
@@ -41,18 +53,33 @@ class LiveYOLODetector:
             conf_thres: Confidence threshold for detections
             iou_thres: IOU threshold for NMS
             img_size: Input image size
+            headless: Produce detections and alerts only, without drawing frames
+            backend: Inference backend: 'pytorch', 'onnx' or 'openvino' (see backend/model.py)
+            threads: CPU threads for the backend (None = runtime default)
+            adaptive: Adapt input size and detection interval to latency and proximity
+            target_fps: Frame rate the adaptive scheduler keeps up with
+            roi: Detect on a lane region, 'band:top,bottom' or 'poly:x,y;...' (see backend/roi.py)
+            roi_full_every: Full-frame pass every N frames in ROI mode, to catch cut-ins (0 = never)
+            roi_size: Input width for ROI crops (default: the full-frame input size)
+            motion_gate: Reuse the last detections while the scene is static
+            motion_max_stale: Seconds the motion gate may reuse detections for
+            profile: Camera profile name or path (default: CAMERA_PROFILE, see backend/calibration.py)
         """
         self.conf_thres = conf_thres
+        self.headless = headless
         self.iou_thres = iou_thres
         self.img_size = img_size
         
         # Load model
-        print("Loading YOLO model...")
-        self.device = select_device('')
-        self.model = DetectMultiBackend(weights, device=self.device, dnn=False, data=None, fp16=False)
+        print(f"Loading YOLO model ({backend})...")
+        self.backend = backend
+        # Exported backends run on the CPU runtimes
+        self.device = select_device('') if backend == 'pytorch' else torch.device('cpu')
+        self.model = load_model(weights, self.device, backend=backend, threads=threads)
         self.stride, self.names, self.pt = self.model.stride, self.model.names, self.model.pt
-        self.imgsz = check_img_size(img_size, s=self.stride)
-        print(f"✓ Model loaded on {self.device}")
+        # Exported models have a fixed input size
+        self.imgsz = getattr(self.model, 'input_size', None) or check_img_size(img_size, s=self.stride)
+        print(f"✓ Model loaded on {self.device} ({backend}, input {self.imgsz})")
         print(f"✓ Classes: {', '.join(self.names.values() if isinstance(self.names, dict) else self.names)}")
         
         # Warm up model
@@ -60,165 +87,210 @@ class LiveYOLODetector:
         self.model.warmup(imgsz=(1, 3, self.imgsz, self.imgsz))
         print("✓ Ready for inference\n")
         
-        # Stats
+        # Reused input tensor, filled in place for every frame
+        self.letterbox = Letterbox(self.imgsz, device=self.device, fp16=self.model.fp16)
+        
+        # Adaptive resolution / frame skipping (see backend/scheduler.py)
+        self.scheduler = None
+        if adaptive:
+            # Exported models have a fixed input shape, so only the detection interval adapts there
+            sizes = {self.imgsz}
+            if self.pt:
+                sizes |= {check_img_size(s, s=self.stride) for s in DEFAULT_SIZES if s < self.imgsz}
+            self.letterboxes = {s: Letterbox(s, device=self.device, fp16=self.model.fp16) for s in sizes}
+            self.letterboxes[self.imgsz] = self.letterbox
+            self.scheduler = AdaptiveScheduler(sizes, target_fps=target_fps)
+            print(f"✓ Adaptive scheduling: sizes {sorted(sizes)}, target {target_fps:.0f} FPS")
+        
+        # Region-of-interest crops with periodic full-frame passes (see backend/roi.py)
+        self.roi = None
+        self.roi_size = roi_size
+        if roi:
+            self.roi = RoiPlanner(roi, full_every=roi_full_every, stride=int(self.stride),
+                                  fixed_input=None if self.pt else self.imgsz)
+            print(f"✓ ROI inference on {roi}, full frame every {roi_full_every} frames")
+        
+        # Frame-difference gate ahead of detection (see backend/motion.py)
+        self.motion_gate = MotionGate(max_stale=motion_max_stale) if motion_gate else None
+        
+        # Stats (FPS over a sliding window, so it recovers after a stall)
         self.fps = 0
+        self.fps_meter = metrics.RateMeter()
+        self._frames = metrics.FRAMES.labels('live')
         self.frame_count = 0
         self.total_detections = 0
         self.start_time = time.time()
+        # Seconds spent in each stage of the most recent detect() call
+        self.last_timings = {}
         
         # Alert system
-        self.last_alert_time = 0
-        self.alert_cooldown = 3.0  # Seconds between captures
+        self.alert_cooldown = 3.0  # Seconds between captures of the same track
         self.alert_dir = Path("captured_alerts")
-        self.alert_dir.mkdir(exist_ok=True)
         
-        # Distance constants (Approximate)
-        # Focal length depends on camera field of view. 
-        # Assuming a standard webcam with ~60 deg FOV and 640 width -> ~600-800 focal length.
-        # We'll use 1000 as a starting point for calibration.
-        self.FOCAL_LENGTH = 1000 
-        self.KNOWN_WIDTH = 1.8  # Average car width in meters
+        # Distance calibration: focal length per camera and real width per class
+        # Uncalibrated cameras use 1000 px; run scripts/calibrate_camera.py to measure it.
+        self.calibration = load_profile(profile)
+        self.width_lut = self.calibration.width_lookup(self.names)
+        print(f"✓ Camera profile: {self.calibration.name} (focal length {self.calibration.focal_length:.0f} px)")
+        self.alert_distance = ALERT_DISTANCE
+        # Which class ids the proximity alert applies to (car / truck / bus / vehicle)
+        self.vehicle_lut = class_lookup(self.names)
+        self.last_result = None
+        self.last_detections = []
+        # Track ids, smoothed distance, closing speed / TTC and per-track alert cooldown
+        self.tracker = Tracker(alert_distance=self.alert_distance, alert_cooldown=self.alert_cooldown)
         
         # Database Connection
-        self.db_config = {
-            'user': 'root',
-            'password': 'Anurag*29',
-            'host': 'localhost',
-            'database': 'car'
-        }
-        self.cnx = None
-        self.cursor = None
-        self.connect_db()
-
-    def connect_db(self):
-        try:
-            self.cnx = mysql.connector.connect(**self.db_config)
-            self.cursor = self.cnx.cursor()
-            print("✓ Connected to MySQL database")
-        except mysql.connector.Error as err:
-            print(f"⚠ Warning: Could not connect to database: {err}")
-            self.cnx = None
+        self.db_config = db_config()
+        # Alert images and DB rows are written by a background thread
+        self.alert_sink = AlertSink(self.db_config, self.alert_dir)
     
     def preprocess(self, img):
-        """Preprocess image for model input"""
-        # Resize and pad
-        img_resized = cv2.resize(img, (self.imgsz, self.imgsz))
-        
-        # Convert to tensor
-        img_tensor = img_resized.transpose((2, 0, 1))[::-1]  # HWC to CHW, BGR to RGB
-        img_tensor = np.ascontiguousarray(img_tensor)
-        img_tensor = torch.from_numpy(img_tensor).to(self.device)
-        img_tensor = img_tensor.half() if self.model.fp16 else img_tensor.float()
-        img_tensor /= 255.0
-        
-        if len(img_tensor.shape) == 3:
-            img_tensor = img_tensor[None]
-        
-        return img_tensor
+        """Letterbox image into the preallocated model input tensor"""
+        return self.letterbox(img)
     
-    def estimate_distance(self, bbox_width_px):
+    def estimate_distance(self, bbox_width_px, class_name='car', frame_width=None):
         """
         Estimate distance to object based on bounding box width
-        Distance = (Known_Width * Focal_Length) / Pixel_Width
+        Distance = (Known_Width[class] * Focal_Length) / Pixel_Width
         """
-        if bbox_width_px <= 0: return 999.0
-        return (self.KNOWN_WIDTH * self.FOCAL_LENGTH) / bbox_width_px
+        return self.calibration.distance(bbox_width_px, class_name, frame_width)
     
-    def detect(self, frame):
+    def detect(self, frame, draw=None):
         """
         Run detection on a single frame
         
         Args:
             frame: Input frame (BGR format)
+            draw: Annotate the returned frame (default: unless headless)
             
         Returns:
             Annotated frame with bounding boxes
         """
-        original_frame = frame.copy()
-        h, w = frame.shape[:2]
+        if draw is None:
+            draw = not self.headless
+        
+        if self.motion_gate is not None and self.last_result is not None and not self.motion_gate.check(frame):
+            # Static scene: redraw the last detections on this frame instead of running the model
+            out = annotate(frame, self.last_result, self.names, ALERT_BANNER) if draw else frame
+            self.last_timings = {'motion_gate': self.motion_gate.last_cost}
+            self.frame_count += 1
+            self._frames.inc()
+            self.fps_meter.mark()
+            self.fps = self.fps_meter.rate()
+            return out, self.last_detections
+        
+        letterbox = self.letterbox
+        imgsz = self.imgsz
+        if self.scheduler:
+            imgsz = self.scheduler.next()
+            if imgsz is None:
+                # Skipped frame: coast the tracks forward instead of running the model
+                t0 = time.perf_counter()
+                out = self.postprocess(frame, self.tracker.coast(frame.shape), None, None, 0.0, draw=draw)
+                self.last_timings = {'postprocess': time.perf_counter() - t0}
+                return out
+            letterbox = self.letterboxes[imgsz]
         
         # Preprocess
-        img_tensor = self.preprocess(frame)
+        t_start = time.perf_counter()
+        rect = self.roi.next(frame.shape) if self.roi else None
+        src = frame
+        if rect is not None:
+            src = frame[rect[1]:rect[3], rect[0]:rect[2]]
+            letterbox = self.roi.letterbox(src.shape, frame.shape, min(imgsz, self.roi_size or imgsz),
+                                           self.device, self.model.fp16)
+        img_tensor = letterbox(src)
+        if self.roi:
+            self.roi.record(img_tensor.shape[2:], imgsz)
         
         # Inference
-        t0 = time.time()
+        t0 = time.perf_counter()
         pred = self.model(img_tensor, augment=False, visualize=False)
-        inference_time = time.time() - t0
+        t1 = time.perf_counter()
+        inference_time = t1 - t0
         
         # NMS
         pred = non_max_suppression(pred, self.conf_thres, self.iou_thres, None, False, max_det=1000)
+        t2 = time.perf_counter()
+        detect_time = t2 - t_start
         
-        # Process detections
-        det = pred[0]
-        detections = []
+        out = self.postprocess(frame, pred[0], img_tensor.shape[2:], letterbox.ratio_pad[0], inference_time,
+                               draw=draw, region=rect)
+        self.last_timings = {'preprocess': t0 - t_start, 'inference': inference_time, 'nms': t2 - t1,
+                             'postprocess': time.perf_counter() - t2}
+        metrics.PREPROCESS.observe(t0 - t_start)
+        metrics.INFERENCE.observe(inference_time)
+        metrics.NMS.observe(t2 - t1)
+        if self.scheduler:
+            self.scheduler.update(detect_time, self.last_result.nearest)
+        return out
+    
+    def postprocess(self, frame, det, input_shape, ratio_pad, inference_time, draw=True, tracker=None,
+                    region=None):
+        """
+        Rescale, annotate and run alert logic for one frame's detections
         
-        if len(det):
-            # Rescale boxes from img_size to original image size
-            det[:, :4] = scale_boxes(img_tensor.shape[2:], det[:, :4], original_frame.shape).round()
-            
-            # Draw boxes
-            annotator = Annotator(original_frame, line_width=2, example=str(self.names))
-            
-            for *xyxy, conf, cls in reversed(det):
-                c = int(cls)
-                label = f'{self.names[c]} {conf:.2f}'
-                annotator.box_label(xyxy, label, color=colors(c, True))
-                
-                detections.append({
-                    'class': self.names[c],
-                    'confidence': float(conf),
-                    'bbox': [int(x) for x in xyxy]
-                })
-                
-                # --- Distance & Alert Logic ---
-                # Only process for 'car' or 'truck' or 'bus' if your model has those classes
-                # For now, we'll assume all detections are relevant vehicles or check class name
-                if self.names[c] in ['car', 'truck', 'bus', 'vehicle']: 
-                    bbox_w = xyxy[2] - xyxy[0]
-                    dist = self.estimate_distance(float(bbox_w))
-                    
-                    # Add distance label
-                    dist_label = f"{dist:.1f}m"
-                    annotator.box_label([xyxy[0], xyxy[1]-20, xyxy[2], xyxy[1]], dist_label, color=(0, 255, 255)) # Yellow for distance
-                    
-                    if dist < 50.0:
-                        # Visual Alert
-                        cv2.putText(original_frame, "WARNING: VEHICLE PROXIMITY ALERT!", (50, 100), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 3)
-                        
-                        # Capture Alert Image
-                        current_time = time.time()
-                        if current_time - self.last_alert_time > self.alert_cooldown:
-                            img_name = f"alert_{int(current_time)}_{dist:.1f}m.jpg"
-                            save_path = self.alert_dir / img_name
-                            cv2.imwrite(str(save_path), original_frame)
-                            print(f"!!! ALERT: Vehicle at {dist:.1f}m. Image saved to {save_path}")
-                            self.last_alert_time = current_time
-                            
-                            # Log to Database
-                            if self.cnx and self.cnx.is_connected():
-                                try:
-                                    # Encode image to blob
-                                    _, img_encoded = cv2.imencode('.jpg', original_frame)
-                                    img_bytes = img_encoded.tobytes()
-                                    
-                                    add_alert = ("INSERT INTO alerts "
-                                                 "(timestamp, object_class, confidence, distance, image_path, image_data) "
-                                                 "VALUES (%s, %s, %s, %s, %s, %s)")
-                                    alert_data = (datetime.now(), self.names[c], float(conf), dist, str(save_path), img_bytes)
-                                    self.cursor.execute(add_alert, alert_data)
-                                    self.cnx.commit()
-                                    print("✓ Alert logged to database (with image data)")
-                                except mysql.connector.Error as err:
-                                    print(f"⚠ Error logging to DB: {err}")
+        Args:
+            frame: Original frame (BGR format)
+            det: NMS output for this frame (n x 6 tensor)
+            input_shape: (h, w) of the model input the boxes refer to, None if det is already
+                in frame pixels (tracks coasted on a frame the scheduler skipped)
+            ratio_pad: Letterbox gain and padding used for this frame
+            inference_time: Forward pass time in seconds (for the overlay)
+            draw: Draw boxes and overlays (False leaves the frame untouched)
+            tracker: Tracker for this video source (default: self.tracker)
+            region: (x0, y0, x1, y1) crop the model ran on, None for the full frame
             
-            original_frame = annotator.result()
+        Returns:
+            Annotated frame and list of detections
+        """
+        if len(det) and input_shape is not None:
+            # Rescale boxes from img_size to original image size (via the crop in ROI mode)
+            src_shape = frame.shape if region is None else (region[3] - region[1], region[2] - region[0])
+            det[:, :4] = scale_boxes(input_shape, det[:, :4], src_shape,
+                                     ratio_pad=ratio_pad).round()
+            offset_boxes(det, region)
+        
+        # Class filter, distances and closest vehicle for all boxes at once
+        result = FrameDetections(det, self.vehicle_lut, self.width_lut, self.calibration.focal_for(frame.shape[1]),
+                                 self.alert_distance)
+        # Per-track smoothed distance / TTC; only confirmed tracks can be in alert range
+        tracker = tracker or self.tracker
+        current_time = time.time()
+        tracker.update(result, current_time, coasted=input_shape is None)
+        detections = result.as_dicts(self.names)
+        self.last_result = result
+        self.last_detections = detections
+        
+        original_frame = frame
+        if draw:
+            # Boxes, distance tags and the visual alert
+            with metrics.ANNOTATION.time():
+                original_frame = annotate(frame, result, self.names, ALERT_BANNER)
+        
+        # --- Alert Logic: capture each hazardous track, at most once per cooldown ---
+        due = tracker.due_alerts(result, current_time) if result.alert else ()
+        if len(due):
+            # Headless frames are only annotated when an alert image is actually captured
+            alert_frame = original_frame if draw else annotate(frame, result, self.names, ALERT_BANNER)
+            # Image files + database rows are written off the inference thread, one encode per frame
+            save_paths = self.alert_sink.submit(alert_frame, [(self.names[int(result.cls[i])], result.conf[i],
+                                                               float(result.distance[i]), result.track_id[i])
+                                                              for i in due], current_time)
+            for i, save_path in zip(due, save_paths or ()):
+                print(f"!!! ALERT: Vehicle #{result.track_id[i]} at {result.distance[i]:.1f}m "
+                      f"(TTC {result.ttc[i]:.1f}s). Image queued for {save_path}")
         
         # Update stats
         self.frame_count += 1
         self.total_detections += len(detections)
-        elapsed = time.time() - self.start_time
-        self.fps = self.frame_count / elapsed if elapsed > 0 else 0
+        self._frames.inc()
+        self.fps_meter.mark()
+        self.fps = self.fps_meter.rate()
+        
+        if not draw:
+            return original_frame, detections
         
         # Add info overlay
         info_text = [
@@ -227,6 +299,11 @@ class LiveYOLODetector:
             f"Detections: {len(detections)}",
             f"Total Frames: {self.frame_count}"
         ]
+        if self.scheduler:
+            info_text.append(f"Input: {self.scheduler.size} / detect 1 in {self.scheduler.interval}")
+        if self.roi:
+            self.roi.draw(original_frame)
+            info_text.append("ROI" if region is not None else "ROI: full frame")
         
         y_offset = 30
         for text in info_text:
@@ -273,33 +350,41 @@ class LiveYOLODetector:
             print(f"✓ Saving video to: {output_path}")
         
         print("\n" + "="*60)
-        print("LIVE DETECTION STARTED")
+        print("LIVE DETECTION STARTED" + (" (HEADLESS)" if self.headless else ""))
         print("="*60)
-        print("Press 'q' to quit")
-        print("Press 's' to save current frame")
-        print("Press 'p' to pause/resume")
+        if self.headless:
+            print("Press Ctrl+C to quit")
+        else:
+            print("Press 'q' to quit")
+            print("Press 's' to save current frame")
+            print("Press 'p' to pause/resume")
         print("="*60 + "\n")
         
+        # Headless runs only draw when the annotated frames are being recorded
+        draw = not self.headless or save_video
+        
         paused = False
         frame_num = 0
         
         try:
             while True:
                 if not paused:
-                    ret, frame = cap.read()
+                    with metrics.CAPTURE.time():
+                        ret, frame = cap.read()
                     if not ret:
                         print("✗ Error: Could not read frame from camera")
                         break
                     
                     # Run detection
-                    annotated_frame, detections = self.detect(frame)
+                    annotated_frame, detections = self.detect(frame, draw=draw)
                     
                     # Save frame if requested
                     if save_video and video_writer is not None:
                         video_writer.write(annotated_frame)
                     
                     # Display
-                    cv2.imshow('YOLO Live Detection - ADAS', annotated_frame)
+                    if not self.headless:
+                        cv2.imshow('YOLO Live Detection - ADAS', annotated_frame)
                     
                     # Print detections
                     if detections:
@@ -311,6 +396,9 @@ class LiveYOLODetector:
                     # Show paused frame
                     cv2.imshow('YOLO Live Detection - ADAS', annotated_frame)
                 
+                if self.headless:
+                    continue
+                
                 # Handle key presses
                 key = cv2.waitKey(1) & 0xFF
                 
@@ -337,13 +425,13 @@ class LiveYOLODetector:
                 video_writer.release()
             if video_writer is not None:
                 video_writer.release()
-            cv2.destroyAllWindows()
+            if not self.headless:
+                cv2.destroyAllWindows()
             
-            # Close DB connection
-            if self.cnx and self.cnx.is_connected():
-                self.cursor.close()
-                self.cnx.close()
-                print("✓ Database connection closed")
+            # Flush pending alerts and close DB connection
+            self.alert_sink.close()
+            print(f"✓ Alert writer closed ({self.alert_sink.written} written, "
+                  f"{self.alert_sink.dropped} dropped)")
             
             # Print statistics
             print("\n" + "="*60)
@@ -351,8 +439,22 @@ class LiveYOLODetector:
             print("="*60)
             print(f"Total frames processed: {self.frame_count}")
             print(f"Total detections: {self.total_detections}")
-            print(f"Average FPS: {self.fps:.2f}")
-            print(f"Total time: {time.time() - self.start_time:.2f}s")
+            total_time = time.time() - self.start_time
+            print(f"Average FPS: {self.frame_count / total_time if total_time > 0 else 0:.2f}")
+            print(f"Total time: {total_time:.2f}s")
+            if self.scheduler:
+                sched = self.scheduler.stats()
+                print(f"Detected frames: {sched['detected_frames']} "
+                      f"(carried forward: {sched['carried_frames']})")
+                print(f"Detection latency by input size (ms): {sched['latency_ms']}")
+            if self.motion_gate:
+                gate = self.motion_gate.stats()
+                print(f"Motion gate: {gate['gated']} of {gate['checked']} frames reused detections "
+                      f"({gate['gated_ratio']:.0%}), {gate['avg_cost_ms']:.2f} ms per check")
+            if self.roi:
+                roi = self.roi.stats()
+                print(f"ROI frames: {roi['roi_frames']} (full frame: {roi['full_frames']}), "
+                      f"model input pixels {roi['pixel_ratio']:.0%} of full-frame passes")
             if save_video:
                 print(f"Video saved to: {output_path}")
             print("="*60)
@@ -377,15 +479,54 @@ def main():
                        help='Save output video')
     parser.add_argument('--output', type=str, default='live_detection_output.mp4',
                        help='Output video path')
+    parser.add_argument('--backend', type=str, default='pytorch', choices=BACKENDS,
+                       help='Inference backend (export onnx/openvino with scripts/export_model.py)')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='CPU threads for the inference backend')
+    parser.add_argument('--headless', action='store_true',
+                       help='No display or frame annotation; print detections and capture alerts only')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Adapt input size and detect-every-Nth-frame to latency and the nearest vehicle')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus metrics on http://0.0.0.0:<port>/metrics')
+    parser.add_argument('--target-fps', type=float, default=30.0,
+                       help='Frame rate the adaptive scheduler keeps up with (usually the camera rate)')
+    parser.add_argument('--roi', type=str, default=None,
+                       help="Detect on a lane region: 'band:0.35,0.9' or 'poly:x,y;x,y;...' (frame fractions)")
+    parser.add_argument('--roi-full-every', type=int, default=10,
+                       help='Full-frame pass every N frames in ROI mode to catch cut-ins (0 = never)')
+    parser.add_argument('--roi-size', type=int, default=None,
+                       help='Input width for ROI crops (default: --img-size)')
+    parser.add_argument('--motion-gate', action='store_true',
+                       help='Skip detection while the scene is static (reuse the last detections)')
+    parser.add_argument('--motion-max-stale', type=float, default=1.0,
+                       help='Longest time in seconds the motion gate reuses detections for')
+    parser.add_argument('--profile', type=str, default=None,
+                       help='Camera profile name in calibration/ or path (default: $CAMERA_PROFILE)')
     
     args = parser.parse_args()
     
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+        print(f"✓ Metrics on http://0.0.0.0:{args.metrics_port}/metrics")
+    
     # Initialize detector
     detector = LiveYOLODetector(
         weights=args.weights,
         conf_thres=args.conf_thres,
         iou_thres=args.iou_thres,
-        img_size=args.img_size
+        img_size=args.img_size,
+        headless=args.headless,
+        backend=args.backend,
+        threads=args.threads,
+        adaptive=args.adaptive,
+        target_fps=args.target_fps,
+        roi=args.roi,
+        roi_full_every=args.roi_full_every,
+        roi_size=args.roi_size,
+        motion_gate=args.motion_gate,
+        motion_max_stale=args.motion_max_stale,
+        profile=args.profile
     )
     
     # Run live detection
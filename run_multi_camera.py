@@ -0,0 +1,196 @@
+"""
+Batched multi-camera YOLO detection
+Reads one frame from every source (camera IDs, RTSP URLs or video files),
+runs a single batched forward pass + NMS and hands results back per source
+"""
+import time
+
+import cv2
+import torch
+
+from run_live_camera import BACKENDS, LiveYOLODetector, non_max_suppression
+from backend.preprocess import Letterbox
+from backend.tracker import Tracker
+
+
+def parse_source(source):
+    """Camera IDs are given as integers, everything else is a URL or file path"""
+    return int(source) if str(source).isdigit() else source
+
+
+class MultiCameraDetector(LiveYOLODetector):
+    def __init__(self, sources, weights='yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt',
+                 conf_thres=0.25, iou_thres=0.45, img_size=640, backend='pytorch', threads=None):
+        """
+        Initialize batched detector for several video sources
+
+        Args:
+            sources: List of camera IDs, RTSP URLs or video file paths
+            weights: Path to model weights
+            conf_thres: Confidence threshold for detections
+            iou_thres: IOU threshold for NMS
+            img_size: Input image size
+            backend: Inference backend (exported models need --batch-size = number of sources)
+            threads: CPU threads for the backend
+        """
+        super().__init__(weights=weights, conf_thres=conf_thres, iou_thres=iou_thres, img_size=img_size,
+                         backend=backend, threads=threads)
+        self.sources = [parse_source(s) for s in sources]
+        self.batch_size = len(self.sources)
+        # Threads the chosen backend runs on; exported runtimes pick their own default when not set
+        self.threads = threads or (torch.get_num_threads() if backend == 'pytorch' else None)
+
+        # One input tensor holding a slot per source
+        self.letterbox = Letterbox(self.imgsz, device=self.device, fp16=self.model.fp16,
+                                   batch_size=self.batch_size)
+        self.model.warmup(imgsz=(self.batch_size, 3, self.imgsz, self.imgsz))
+        # Track ids are per source
+        self.trackers = [Tracker(alert_distance=self.alert_distance, alert_cooldown=self.alert_cooldown)
+                         for _ in self.sources]
+        self.caps = []
+
+    def open_sources(self):
+        """Open every source; returns False if any of them fails"""
+        for source in self.sources:
+            cap = cv2.VideoCapture(source)
+            if not cap.isOpened():
+                print(f"✗ Error: Could not open source {source}")
+                return False
+            print(f"✓ Opened {source} ({int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x"
+                  f"{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))})")
+            self.caps.append(cap)
+        return True
+
+    def read_frames(self):
+        """Grab from every source first, then decode, so frames are as close in time as possible"""
+        if not all(cap.grab() for cap in self.caps):
+            return None
+        frames = []
+        for cap in self.caps:
+            ret, frame = cap.retrieve()
+            if not ret:
+                return None
+            frames.append(frame)
+        return frames
+
+    def detect_batch(self, frames, draw=True):
+        """
+        Run one batched forward pass over a frame from each source
+
+        Args:
+            frames: List of BGR frames, one per source
+            draw: Annotate the frames (False skips drawing for headless runs)
+
+        Returns:
+            List of (annotated_frame, detections) tuples in source order
+        """
+        for i, frame in enumerate(frames):
+            img_tensor = self.letterbox(frame, index=i)
+
+        t0 = time.time()
+        pred = self.model(img_tensor, augment=False, visualize=False)
+        inference_time = time.time() - t0
+
+        pred = non_max_suppression(pred, self.conf_thres, self.iou_thres, None, False, max_det=1000)
+
+        return [
+            self.postprocess(frame, det, img_tensor.shape[2:], self.letterbox.ratio_pad[i], inference_time,
+                             draw=draw, tracker=self.trackers[i])
+            for i, (frame, det) in enumerate(zip(frames, pred))
+        ]
+
+    def run(self, display=True):
+        """Run batched detection until a source ends or 'q' is pressed"""
+        if not self.open_sources():
+            self.release()
+            return
+
+        print("\n" + "="*60)
+        print(f"MULTI-CAMERA DETECTION STARTED ({self.batch_size} sources)")
+        print("="*60)
+        print("Press 'q' to quit\n")
+
+        batches = 0
+        start = time.time()
+        try:
+            while True:
+                frames = self.read_frames()
+                if frames is None:
+                    print("✗ A source stopped delivering frames")
+                    break
+
+                results = self.detect_batch(frames, draw=display)
+                batches += 1
+
+                for source, (annotated_frame, detections) in zip(self.sources, results):
+                    if detections:
+                        det_str = ", ".join([f"{d['class']}:{d['confidence']:.2f}" for d in detections])
+                        print(f"[{source}] Batch {batches:04d}: {det_str}")
+                    if display:
+                        cv2.imshow(f'ADAS - {source}', annotated_frame)
+
+                if display and cv2.waitKey(1) & 0xFF == ord('q'):
+                    print("\n✓ Quitting...")
+                    break
+        except KeyboardInterrupt:
+            print("\n✓ Interrupted by user")
+        finally:
+            self.release()
+            self.alert_sink.close()
+            elapsed = time.time() - start
+            print("\n" + "="*60)
+            print("MULTI-CAMERA STATISTICS")
+            print("="*60)
+            print(f"Batches processed: {batches}")
+            if elapsed > 0:
+                print(f"Batch rate: {batches / elapsed:.2f} batches/s")
+                print(f"Aggregate throughput: {batches * self.batch_size / elapsed:.2f} frames/s")
+                if self.threads:
+                    print(f"Per-thread throughput: {batches * self.batch_size / elapsed / self.threads:.2f} frames/s "
+                          f"({self.threads} {self.backend} threads)")
+            print("="*60)
+
+    def release(self):
+        for cap in self.caps:
+            cap.release()
+        self.caps = []
+        cv2.destroyAllWindows()
+
+def main():
+    """Main function to run batched multi-camera detection"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Batched YOLO detection over several cameras')
+    parser.add_argument('--sources', nargs='+', default=['0'],
+                       help='Camera IDs, RTSP URLs or video files (e.g. 0 1 rtsp://... rear.mp4)')
+    parser.add_argument('--weights', type=str,
+                       default='yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt',
+                       help='Path to model weights')
+    parser.add_argument('--conf-thres', type=float, default=0.25,
+                       help='Confidence threshold')
+    parser.add_argument('--iou-thres', type=float, default=0.45,
+                       help='IOU threshold for NMS')
+    parser.add_argument('--img-size', type=int, default=640,
+                       help='Inference image size')
+    parser.add_argument('--backend', type=str, default='pytorch', choices=BACKENDS,
+                       help='Inference backend')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='CPU threads for the inference backend')
+    parser.add_argument('--no-display', action='store_true',
+                       help='Do not open preview windows')
+
+    args = parser.parse_args()
+
+    detector = MultiCameraDetector(
+        sources=args.sources,
+        weights=args.weights,
+        conf_thres=args.conf_thres,
+        iou_thres=args.iou_thres,
+        img_size=args.img_size,
+        backend=args.backend,
+        threads=args.threads
+    )
+    detector.run(display=not args.no_display)
+
+if __name__ == '__main__':
+    main()
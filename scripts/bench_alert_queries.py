@@ -0,0 +1,131 @@
+"""
+Benchmark the keyset-paginated alert queries against a seeded SQLite stand-in
+
+Seeds N alerts (default one million) with the same columns and composite
+indexes as the MySQL schema, then runs the queries built by
+backend.alert_queries and reports p50/p99 latency per scenario. Deep pages
+are compared against the old OFFSET style to show why keyset cursors matter.
+
+Usage:
+    python scripts/bench_alert_queries.py --rows 1000000 [--db alerts_bench.sqlite]
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.alert_queries import ALERT_INDEXES, build_alerts_query, paginate
+
+CLASSES = ["car", "truck", "bus", "vehicle"]
+USERS = 200
+
+
+def to_sqlite(sql):
+    return sql.replace("%s", "?")
+
+
+def seed(conn, rows, batch=50000):
+    conn.execute("DROP TABLE IF EXISTS alerts")
+    conn.execute("""
+        CREATE TABLE alerts (
+            id INTEGER PRIMARY KEY,
+            user_id INT,
+            timestamp TEXT,
+            object_class VARCHAR(50),
+            confidence FLOAT,
+            distance FLOAT,
+            image_path VARCHAR(255)
+        )
+    """)
+    start = datetime.now() - timedelta(days=365)
+    step = 365 * 86400 / rows
+    rng = random.Random(0)
+
+    t0 = time.time()
+    for offset in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO alerts (id, user_id, timestamp, object_class, confidence, distance, image_path) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (i + 1, rng.randint(1, USERS),
+                 (start + timedelta(seconds=i * step)).isoformat(sep=" ", timespec="seconds"),
+                 rng.choice(CLASSES), rng.random(), rng.uniform(2, 50), f"captured_alerts/alert_{i}.jpg")
+                for i in range(offset, min(offset + batch, rows))
+            ],
+        )
+    for name, cols in ALERT_INDEXES.items():
+        conn.execute(f"CREATE INDEX {name} ON alerts {cols}")
+    conn.commit()
+    conn.execute("ANALYZE")
+    print(f"Seeded {rows:,} rows in {time.time() - t0:.1f}s")
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return statistics.median(times), times[min(len(times) - 1, int(len(times) * 0.99))]
+
+
+def keyset_page(conn, pages, **filters):
+    """Fetch `pages` consecutive pages by following the cursor"""
+    cursor = None
+    for _ in range(pages):
+        sql, params = build_alerts_query(cursor=cursor, **filters)
+        rows, cursor = paginate(conn.execute(to_sqlite(sql), params).fetchall(), filters.get("limit", 10))
+        if cursor is None:
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark paginated alert queries')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--db', type=str, default=':memory:', help='SQLite file (reused if already seeded)')
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    existing = conn.execute("SELECT name FROM sqlite_master WHERE name = 'alerts'").fetchone()
+    if not existing or conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] != args.rows:
+        seed(conn, args.rows)
+
+    now = datetime.now()
+    last_day = dict(start=now - timedelta(days=1), end=now)
+
+    def run(**filters):
+        sql, params = build_alerts_query(**filters)
+        return lambda: conn.execute(to_sqlite(sql), params).fetchall()
+
+    deep_offset = args.rows // 2
+    scenarios = {
+        "latest 10": run(limit=10),
+        "latest 100, class=truck": run(limit=100, object_class="truck"),
+        "user 42, last 24h": run(limit=100, user_id=42, **last_day),
+        "last 24h, distance < 10m": run(limit=100, max_distance=10, **last_day),
+        "user 42, class=bus, 5-20m": run(limit=100, user_id=42, object_class="bus", min_distance=5,
+                                         max_distance=20),
+        "walk 50 pages (keyset)": lambda: keyset_page(conn, 50, limit=100),
+        f"page at offset {deep_offset:,} (OFFSET)": lambda: conn.execute(
+            "SELECT id, timestamp, object_class, confidence, distance, image_path FROM alerts "
+            "ORDER BY timestamp DESC, id DESC LIMIT 100 OFFSET ?", (deep_offset,)).fetchall(),
+    }
+
+    print(f"\n{'scenario':<40}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, fn in scenarios.items():
+        repeats = max(5, args.repeats // 20) if "OFFSET" in name or "walk" in name else args.repeats
+        p50, p99 = timed(fn, repeats)
+        print(f"{name:<40}{p50:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
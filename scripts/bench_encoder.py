@@ -0,0 +1,114 @@
+"""
+Benchmark: MJPEG stream encode time and bandwidth per encoder setting
+
+Encodes the same frames with every combination of --backends, --qualities and
+--max-widths using backend.encoder.JpegEncoder. For each combination it
+reports the per-frame encode time (including the downscale), the average
+frame size and the bandwidth one client receives at --fps.
+
+Frames come from --clip when given. Otherwise they are synthetic scenes
+(scripts/create_dummy_dataset.py) with sensor-like noise added, so that they
+do not compress unrealistically well.
+
+Usage:
+    python scripts/bench_encoder.py --resolution 1280x720 --qualities 95,80,70,50 --max-widths 0,960,640
+    python scripts/bench_encoder.py --clip recordings/drive.mp4
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.encoder import JpegEncoder
+from create_dummy_dataset import render_sample
+
+
+def synthetic_frames(size, count, seed=0, noise=6.0):
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        frame = cv2.cvtColor(np.asarray(render_sample(size)[0]), cv2.COLOR_RGB2BGR).astype(np.float32)
+        frame = cv2.GaussianBlur(frame, (5, 5), 0) + rng.normal(0, noise, frame.shape)
+        frames.append(frame.clip(0, 255).astype(np.uint8))
+    return frames
+
+
+def clip_frames(path, count):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def bench(encoder, frames, warmup=3):
+    times, sizes = [], []
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        data = encoder.encode(frame)
+        if i >= warmup:
+            times.append(time.perf_counter() - t0)
+            sizes.append(len(data))
+    times = np.array(times) * 1000
+    return np.percentile(times, 50), np.percentile(times, 95), float(np.mean(sizes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark stream JPEG encoding settings')
+    parser.add_argument('--resolution', type=str, default='1280x720', help='Synthetic frame size')
+    parser.add_argument('--clip', type=str, default=None, help='Video to take frames from instead')
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--qualities', type=str, default='95,80,70,50')
+    parser.add_argument('--max-widths', type=str, default='0,960,640', help='0 = full resolution')
+    parser.add_argument('--backends', type=str, default='opencv,turbojpeg')
+    parser.add_argument('--fps', type=float, default=30.0, help='Stream rate used for the bandwidth column')
+    parser.add_argument('--report', type=str, default=str(ROOT / 'outputs/encoder_report.txt'))
+    args = parser.parse_args()
+
+    if args.clip:
+        frames = clip_frames(args.clip, args.frames)
+    else:
+        frames = synthetic_frames(tuple(int(v) for v in args.resolution.split('x')), args.frames)
+    h, w = frames[0].shape[:2]
+
+    lines = [f"Stream encode benchmark: {len(frames)} frames of {w}x{h} "
+             f"({'clip ' + args.clip if args.clip else 'synthetic'}), bandwidth at {args.fps:g} fps",
+             "",
+             f"{'backend':<11}{'quality':>8}{'output':>11}{'p50 ms':>9}{'p95 ms':>9}{'KB/frame':>10}{'Mbit/s':>9}"]
+    for backend in args.backends.split(','):
+        try:
+            JpegEncoder(backend=backend)
+        except (ImportError, OSError) as e:
+            lines.append(f"{backend:<11}  unavailable ({e})")
+            continue
+        for max_width in (int(v) for v in args.max_widths.split(',')):
+            for quality in (int(v) for v in args.qualities.split(',')):
+                encoder = JpegEncoder(quality=quality, max_width=max_width, backend=backend)
+                p50, p95, size = bench(encoder, frames)
+                out_w = min(w, max_width) if max_width else w
+                out = f"{out_w}x{round(h * out_w / w)}"
+                lines.append(f"{backend:<11}{quality:>8}{out:>11}{p50:>9.2f}{p95:>9.2f}{size / 1024:>10.1f}"
+                             f"{size * 8 * args.fps / 1e6:>9.2f}")
+
+    report = '\n'.join(lines)
+    print(report)
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.report).write_text(report + '\n')
+    print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Microbenchmark: legacy per-frame preprocessing vs backend.preprocess.Letterbox
+
+Usage:
+    python scripts/bench_preprocess.py --width 1280 --height 720 --iters 500
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.preprocess import Letterbox
+
+
+def legacy_preprocess(frame, imgsz, device):
+    """The resize / transpose / copy / divide sequence the detectors used before"""
+    img = cv2.resize(frame, (imgsz, imgsz))
+    img = img.transpose((2, 0, 1))[::-1]
+    img = np.ascontiguousarray(img)
+    img = torch.from_numpy(img).to(device)
+    img = img.float()
+    img /= 255.0
+    return img[None]
+
+
+def bench(fn, frame, iters):
+    for _ in range(10):
+        fn(frame)
+
+    times = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn(frame)
+        times.append(time.perf_counter() - t0)
+
+    # numpy reports its buffers to tracemalloc. The peak above what was live before the call
+    # includes temporaries freed before it returns, which a snapshot diff afterwards misses.
+    tracemalloc.start()
+    fn(frame)
+    allocated = 0
+    for _ in range(5):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn(frame)
+        allocated = max(allocated, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    times = np.array(times) * 1000
+    return {
+        "mean_ms": times.mean(),
+        "p50_ms": np.percentile(times, 50),
+        "p99_ms": np.percentile(times, 99),
+        "peak_bytes_per_frame": allocated,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark frame preprocessing')
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--img-size', type=int, default=640)
+    parser.add_argument('--iters', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=1, help='torch intra-op threads')
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    device = torch.device('cpu')
+    frame = np.random.randint(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    letterbox = Letterbox(args.img_size, device=device)
+
+    results = {
+        "legacy resize": bench(lambda f: legacy_preprocess(f, args.img_size, device), frame, args.iters),
+        "letterbox": bench(letterbox, frame, args.iters),
+    }
+
+    print(f"Frame {args.width}x{args.height} -> {args.img_size}, {args.iters} iterations")
+    print(f"{'method':<16}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak numpy bytes/frame':>25}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+              f"{r['peak_bytes_per_frame']:>25,}")
+
+    saving = results["legacy resize"]["mean_ms"] - results["letterbox"]["mean_ms"]
+    print(f"\nPer-frame saving: {saving:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
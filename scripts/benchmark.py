@@ -0,0 +1,287 @@
+"""
+Detection / streaming benchmark suite with regression thresholds
+
+Times every stage separately (preprocess, inference, NMS, postprocess with
+annotation, encode) for:
+
+    detect/<res>            LiveYOLODetector.detect() on synthetic frames
+    postprocess/<res>/n<N>  LiveYOLODetector.postprocess() with N injected detections
+    camera/<res>            VideoCamera.process_frame() + encode(), the stages behind get_frame()
+    clip/detect             LiveYOLODetector.detect() over a recorded clip
+    clip/get_frame          VideoCamera.get_frame() end to end over the same clip
+
+Synthetic frames come from scripts/create_dummy_dataset.py. Real scenes rarely
+produce a chosen number of boxes from rectangles, so the object-count
+scenarios inject N post-NMS boxes (consistent across frames, so tracks
+persist) to load postprocess, the tracker and annotation.
+
+Results are written as JSON. --save-baseline stores them; --compare fails
+(exit 1) when a stage's p50 regresses by more than --threshold against the
+baseline.
+
+Usage:
+    python scripts/benchmark.py --save-baseline outputs/benchmark_baseline.json
+    python scripts/benchmark.py --compare outputs/benchmark_baseline.json --threshold 0.15
+    python scripts/benchmark.py --clip recordings/drive.mp4 --resolutions 1280x720 --objects 0,50
+    python scripts/benchmark.py --roi band:0.35,0.9 --compare outputs/benchmark_baseline.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.alert_sink import AlertSink
+from backend.image_store import LocalImageStore
+from backend.tracker import Tracker
+from create_dummy_dataset import render_sample
+from run_live_camera import LiveYOLODetector
+
+DEFAULT_WEIGHTS = 'yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt'
+
+
+def synthetic_frames(size, count, seed=0):
+    """BGR frames with a few random rectangles, as in the dummy dataset"""
+    random.seed(seed)
+    return [cv2.cvtColor(np.asarray(render_sample(size)[0]), cv2.COLOR_RGB2BGR) for _ in range(count)]
+
+
+def synthetic_detections(n, imgsz, classes, count, seed=0):
+    """count frames of n boxes (model-input pixels) that jitter around fixed positions"""
+    rng = np.random.default_rng(seed)
+    wh = rng.uniform(20, imgsz / 4, size=(n, 2))
+    xy = rng.uniform(0, imgsz, size=(n, 2)).clip(0, imgsz - wh)
+    base = np.concatenate([xy, xy + wh, rng.uniform(0.3, 0.95, (n, 1)), rng.choice(classes, (n, 1))], axis=1)
+    for _ in range(count):
+        det = base.copy()
+        det[:, :4] += rng.normal(0, 1.0, size=(n, 4))
+        yield torch.from_numpy(det.astype(np.float32))
+
+
+def write_clip(path, size, count, fps=30):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    for frame in synthetic_frames(size, count, seed=1):
+        writer.write(frame)
+    writer.release()
+
+
+def summarize(samples):
+    """{stage: {mean_ms, p50_ms, p95_ms, p99_ms}} from a list of {stage: seconds} dicts"""
+    stages = {}
+    for sample in samples:
+        for stage, seconds in sample.items():
+            stages.setdefault(stage, []).append(seconds * 1000)
+    return {
+        stage: {
+            "mean_ms": round(float(np.mean(t)), 3),
+            "p50_ms": round(float(np.percentile(t, 50)), 3),
+            "p95_ms": round(float(np.percentile(t, 95)), 3),
+            "p99_ms": round(float(np.percentile(t, 99)), 3),
+            "n": len(t),
+        }
+        for stage, t in stages.items()
+    }
+
+
+def quiet_sink(tmp):
+    """Alert sink writing to a scratch directory and no database"""
+    return AlertSink(None, Path(tmp) / 'alerts', image_store=LocalImageStore(Path(tmp) / 'store'))
+
+
+def bench_detect(detector, frames, warmup):
+    samples = []
+    for i, frame in enumerate(frames):
+        detector.detect(frame, draw=True)
+        if i >= warmup:
+            samples.append(dict(detector.last_timings))
+    return summarize(samples)
+
+
+def bench_postprocess(detector, frames, n_objects, warmup):
+    detector.tracker = Tracker(alert_distance=detector.alert_distance, alert_cooldown=detector.alert_cooldown)
+    vehicle = np.flatnonzero(detector.vehicle_lut)
+    classes = vehicle if len(vehicle) else np.arange(len(detector.names))
+    dets = synthetic_detections(n_objects, detector.imgsz, classes, len(frames))
+    samples = []
+    for i, (frame, det) in enumerate(zip(frames, dets)):
+        detector.letterbox(frame)  # sets ratio_pad for this frame size
+        t0 = time.perf_counter()
+        detector.postprocess(frame, det, (detector.imgsz, detector.imgsz), detector.letterbox.ratio_pad[0], 0.0,
+                             draw=True)
+        if i >= warmup:
+            samples.append({'postprocess': time.perf_counter() - t0})
+    return summarize(samples)
+
+
+def bench_camera_stages(camera, frames, warmup):
+    samples = []
+    for i, frame in enumerate(frames):
+        camera.encode(camera.process_frame(frame, draw=True))
+        if i >= warmup:
+            samples.append(dict(camera.last_timings))
+    return summarize(samples)
+
+
+def bench_get_frame(camera, count, warmup):
+    samples = []
+    for i in range(count):
+        t0 = time.perf_counter()
+        if camera.get_frame() is None:
+            break
+        if i >= warmup:
+            samples.append({'get_frame': time.perf_counter() - t0})
+    stats = camera.stats()
+    camera.stop()
+    result = summarize(samples)
+    result['pipeline'] = {"output_fps": stats.get("output_fps"), "stages": stats.get("stages")}
+    return result
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """List of (scenario, stage, baseline_p50, current_p50) that regressed"""
+    regressions = []
+    for scenario, stages in results["scenarios"].items():
+        for stage, current in stages.items():
+            base = baseline["scenarios"].get(scenario, {}).get(stage)
+            if not base or "p50_ms" not in current:
+                continue
+            delta = current["p50_ms"] - base["p50_ms"]
+            if delta > min_delta_ms and current["p50_ms"] > base["p50_ms"] * (1 + threshold):
+                regressions.append((scenario, stage, base["p50_ms"], current["p50_ms"]))
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark detection, alerting and streaming stages')
+    parser.add_argument('--weights', type=str, default=DEFAULT_WEIGHTS)
+    parser.add_argument('--backend', type=str, default='pytorch')
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--iters', type=int, default=60, help='Frames per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='Leading frames excluded from timings')
+    parser.add_argument('--resolutions', type=str, default='640x480,1280x720,1920x1080')
+    parser.add_argument('--objects', type=str, default='0,5,20,50', help='Injected detections per frame')
+    parser.add_argument('--clip', type=str, default=None,
+                        help='Recorded clip (default: a synthetic 1280x720 clip is generated)')
+    parser.add_argument('--skip-camera', action='store_true', help='Skip the VideoCamera scenarios')
+    parser.add_argument('--roi', type=str, default=None, help="Detect on a lane ROI, e.g. 'band:0.35,0.9'")
+    parser.add_argument('--output', type=str, default=str(ROOT / 'outputs/benchmark.json'))
+    parser.add_argument('--save-baseline', type=str, default=None)
+    parser.add_argument('--compare', type=str, default=None, help='Baseline JSON to check against')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Allowed relative p50 regression')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='Ignore regressions smaller than this')
+    args = parser.parse_args()
+
+    resolutions = [tuple(int(v) for v in r.split('x')) for r in args.resolutions.split(',')]
+    object_counts = [int(n) for n in args.objects.split(',')]
+    tmp = tempfile.mkdtemp(prefix='adas_bench_')
+    scenarios = {}
+
+    detector = LiveYOLODetector(weights=args.weights, backend=args.backend, threads=args.threads, roi=args.roi)
+    detector.alert_sink.close()
+    detector.alert_sink = quiet_sink(tmp)
+
+    for size in resolutions:
+        res = f"{size[0]}x{size[1]}"
+        frames = synthetic_frames(size, args.iters)
+        print(f"detect/{res}")
+        scenarios[f"detect/{res}"] = bench_detect(detector, frames, args.warmup)
+        for n in object_counts:
+            print(f"postprocess/{res}/n{n}")
+            scenarios[f"postprocess/{res}/n{n}"] = bench_postprocess(detector, frames, n, args.warmup)
+
+    clip = args.clip
+    if clip is None:
+        clip = str(Path(tmp) / 'synthetic_clip.mp4')
+        write_clip(clip, (1280, 720), args.iters * 2)
+    cap = cv2.VideoCapture(clip)
+    clip_frames = []
+    while len(clip_frames) < args.iters:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        clip_frames.append(frame)
+    cap.release()
+    print("clip/detect")
+    scenarios["clip/detect"] = bench_detect(detector, clip_frames, args.warmup)
+    detector.alert_sink.close()
+
+    if not args.skip_camera:
+        from backend.camera import VideoCamera
+
+        camera = VideoCamera(weights=args.weights, backend=args.backend, threads=args.threads, source=clip,
+                             roi=args.roi)
+        camera.alert_sink.close()
+        camera.alert_sink = quiet_sink(tmp)
+        for size in resolutions:
+            res = f"{size[0]}x{size[1]}"
+            print(f"camera/{res}")
+            scenarios[f"camera/{res}"] = bench_camera_stages(camera, synthetic_frames(size, args.iters),
+                                                             args.warmup)
+        print("clip/get_frame")
+        scenarios["clip/get_frame"] = bench_get_frame(camera, args.iters, args.warmup)
+        camera.alert_sink.close()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "weights": args.weights,
+            "backend": args.backend,
+            "threads": args.threads or torch.get_num_threads(),
+            "iters": args.iters,
+            "clip": args.clip or "synthetic",
+            "roi": detector.roi.stats() if detector.roi else None,
+        },
+        "scenarios": scenarios,
+    }
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"\n{'scenario':<32}{'stage':<14}{'mean':>9}{'p50':>9}{'p95':>9}")
+    for scenario, stages in scenarios.items():
+        for stage, t in stages.items():
+            if "p50_ms" in t:
+                print(f"{scenario:<32}{stage:<14}{t['mean_ms']:>9.2f}{t['p50_ms']:>9.2f}{t['p95_ms']:>9.2f}")
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2))
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        print(f"\nCompared with {args.compare} (commit {baseline['meta'].get('commit')}), "
+              f"threshold +{args.threshold:.0%} / {args.min_delta_ms} ms")
+        for scenario, stage, base, current in regressions:
+            print(f"  ✗ {scenario} {stage}: p50 {base:.2f} -> {current:.2f} ms (+{current / base - 1:.0%})")
+        if regressions:
+            sys.exit(1)
+        print("  ✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Measure a camera's focal length and write a calibration profile
+
+Two routines are available:
+
+    checkerboard     Photos of a printed checkerboard from several angles.
+                     cv2.calibrateCamera returns the intrinsics, and fx is
+                     kept as the focal length.
+    known-distance   One or more objects of known width photographed at a
+                     measured distance. focal = pixel width * distance / width
+                     for each one, and the median is kept.
+
+The profile stores the resolution it was measured at, and the detectors
+rescale the focal length when they run at another width. Select the profile
+with CAMERA_PROFILE=<name> or --profile <name>.
+
+Usage:
+    python scripts/calibrate_camera.py checkerboard --name dashcam --images 'calib/*.jpg' --pattern 9x6
+    python scripts/calibrate_camera.py known-distance --name dashcam --resolution 1280x720 \\
+        --measure 1.8,10,182 --measure 1.8,20,90 --class-width truck=2.45
+"""
+
+import argparse
+import glob
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.calibration import CameraProfile
+
+
+def checkerboard_focal(paths, pattern):
+    """(fx, fy, reprojection error, (w, h), images used) from checkerboard photos"""
+    cols, rows = pattern
+    board = np.zeros((rows * cols, 3), np.float32)
+    board[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2)  # square units; the focal length is scale-free
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+    object_points, image_points, size = [], [], None
+    for path in paths:
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            print(f"  skip {path}: unreadable")
+            continue
+        if size is not None and gray.shape[::-1] != size:
+            print(f"  skip {path}: {gray.shape[1]}x{gray.shape[0]}, expected {size[0]}x{size[1]}")
+            continue
+        found, corners = cv2.findChessboardCorners(gray, pattern, None)
+        if not found:
+            print(f"  skip {path}: board not found")
+            continue
+        size = gray.shape[::-1]
+        object_points.append(board)
+        image_points.append(cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria))
+
+    if len(image_points) < 3:
+        raise SystemExit(f"✗ Board found in {len(image_points)} images, need at least 3")
+    error, K, _, _, _ = cv2.calibrateCamera(object_points, image_points, size, None, None)
+    return K[0, 0], K[1, 1], error, size, len(image_points)
+
+
+def known_distance_focal(measurements):
+    """(median focal, per-measurement focals) from (width m, distance m, pixel width) triples"""
+    focals = np.array([px * dist / width for width, dist, px in measurements])
+    return float(np.median(focals)), focals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibrate a camera profile for distance estimation')
+    parser.add_argument('method', choices=['checkerboard', 'known-distance'])
+    parser.add_argument('--name', type=str, required=True, help='Profile name (calibration/<name>.json)')
+    parser.add_argument('--output', type=str, default=None, help='Profile path (default: calibration/<name>.json)')
+    parser.add_argument('--images', type=str, default=None, help='Checkerboard photo glob')
+    parser.add_argument('--pattern', type=str, default='9x6', help='Inner corners per row x column')
+    parser.add_argument('--measure', action='append', default=[],
+                        help='WIDTH_M,DISTANCE_M,PIXEL_WIDTH of one object (repeatable)')
+    parser.add_argument('--resolution', type=str, default=None,
+                        help='WxH the known-distance pixel widths were measured at')
+    parser.add_argument('--class-width', action='append', default=[],
+                        help='Per-class width override in meters, e.g. truck=2.45 (repeatable)')
+    args = parser.parse_args()
+
+    if args.method == 'checkerboard':
+        paths = sorted(glob.glob(args.images or ''))
+        if not paths:
+            raise SystemExit("✗ --images matched no files")
+        pattern = tuple(int(v) for v in args.pattern.split('x'))
+        fx, fy, error, resolution, used = checkerboard_focal(paths, pattern)
+        focal = fx
+        print(f"Checkerboard: {used}/{len(paths)} images, fx {fx:.1f} px, fy {fy:.1f} px, "
+              f"reprojection error {error:.3f} px")
+    else:
+        if not args.measure or not args.resolution:
+            raise SystemExit("✗ known-distance needs --resolution and at least one --measure")
+        resolution = tuple(int(v) for v in args.resolution.split('x'))
+        focal, focals = known_distance_focal([tuple(float(v) for v in m.split(',')) for m in args.measure])
+        spread = f", spread {focals.min():.1f}-{focals.max():.1f} px" if len(focals) > 1 else ""
+        print(f"Known distance: {len(focals)} measurements, focal {focal:.1f} px{spread}")
+
+    class_widths = {}
+    for item in args.class_width:
+        name, _, width = item.partition('=')
+        class_widths[name] = float(width)
+
+    profile = CameraProfile(args.name, focal, resolution, class_widths, method=args.method.replace('-', '_'))
+    path = profile.save(args.output)
+    print(f"✓ Profile written to {path} (focal length {focal:.1f} px at {resolution[0]}x{resolution[1]})")
+
+
+if __name__ == "__main__":
+    main()
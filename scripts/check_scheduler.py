@@ -0,0 +1,74 @@
+"""
+Regression checks for the adaptive scheduler's distance handling
+
+Replays short update() sequences through backend.scheduler.AdaptiveScheduler
+and checks the chosen input size and detection interval. The main case is a
+vehicle at 10 m that drops out of a single detection. The scheduler must stay
+at full size and detect every frame instead of treating the miss as a
+vehicle at NO_DISTANCE. Exits non-zero when a check fails.
+
+Usage:
+    python scripts/check_scheduler.py
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.postprocess import NO_DISTANCE
+from backend.scheduler import AdaptiveScheduler
+
+LATENCY = 0.01  # fast enough that the frame budget never limits the plan
+
+
+def replay(distances, **kwargs):
+    scheduler = AdaptiveScheduler(**kwargs)
+    for nearest in distances:
+        scheduler.update(LATENCY, nearest)
+    return scheduler
+
+
+def check_single_miss():
+    s = replay([10.0] * 10 + [NO_DISTANCE])
+    ok = s.size == s.sizes[-1] and s.interval == 1 and s.nearest <= s.near_distance
+    return ok, f"10 m x10 then one miss: nearest {s.nearest:.1f} m, size {s.size}, interval {s.interval}"
+
+
+def check_miss_then_reacquire():
+    s = replay([10.0] * 10 + [NO_DISTANCE, NO_DISTANCE, 9.0])
+    ok = s.size == s.sizes[-1] and s.interval == 1
+    return ok, f"two misses then 9 m: nearest {s.nearest:.1f} m, size {s.size}, interval {s.interval}"
+
+
+def check_relax_bounded():
+    s = replay([10.0] * 10 + [NO_DISTANCE] * 3)
+    ok = s.near_distance < s.nearest <= s.far_distance and s.interval < s.max_interval
+    return ok, f"three misses: nearest {s.nearest:.1f} m relaxes toward far, interval {s.interval}"
+
+
+def check_clear_road():
+    s = replay([10.0] * 10 + [NO_DISTANCE] * 60)
+    ok = s.nearest <= s.far_distance and s.size == s.sizes[0] and s.interval == s.max_interval
+    return ok, f"road clear: nearest {s.nearest:.1f} m (<= far), size {s.size}, interval {s.interval}"
+
+
+def check_far_measurement_clamped():
+    s = replay([10.0] * 10 + [500.0])
+    ok = s.nearest <= s.near_distance + s.smoothing * (s.far_distance - s.near_distance)
+    return ok, f"10 m then a 500 m box: nearest {s.nearest:.1f} m (target clamped to far)"
+
+
+def main():
+    failed = 0
+    for check in (check_single_miss, check_miss_then_reacquire, check_relax_bounded, check_clear_road,
+                  check_far_measurement_clamped):
+        ok, message = check()
+        failed += not ok
+        print(f"{'✓' if ok else '✗'} {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Parity and latency check for an exported backend against the PyTorch model
+
+Runs the PyTorch weights and a candidate backend (ONNX Runtime / OpenVINO,
+or any exported artifact via --candidate-weights) over the same frames with
+the same letterbox, NMS and scale_boxes path the detectors use. Every
+PyTorch box must have a same-class candidate box with IoU >= --min-iou and a
+confidence within --max-conf-diff. Writes a latency comparison report and
+exits non-zero if parity fails.
+
+Usage:
+    python scripts/compare_backends.py --backend onnx --threads 4
+    python scripts/compare_backends.py --backend openvino --source clip.mp4 --max-frames 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.model import BACKENDS, load_model  # importing backend.model puts yolov5_official on sys.path
+from backend.preprocess import Letterbox
+
+from utils.general import check_img_size, non_max_suppression, scale_boxes
+from utils.metrics import box_iou
+
+DEFAULT_WEIGHTS = ROOT / 'yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt'
+
+
+def load_frames(source, max_frames):
+    """Frames from an image directory or a video file"""
+    source = Path(source)
+    if source.is_dir():
+        paths = sorted(p for p in source.iterdir() if p.suffix.lower() in ('.jpg', '.jpeg', '.png'))
+        return [(p.name, cv2.imread(str(p))) for p in paths[:max_frames]]
+    cap = cv2.VideoCapture(str(source))
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append((f"frame_{len(frames):05d}", frame))
+    cap.release()
+    return frames
+
+
+class Runner:
+    def __init__(self, name, model, img_size, conf_thres, iou_thres):
+        self.name = name
+        self.model = model
+        self.imgsz = getattr(model, 'input_size', None) or check_img_size(img_size, s=model.stride)
+        self.letterbox = Letterbox(self.imgsz)
+        self.conf_thres = conf_thres
+        self.iou_thres = iou_thres
+        self.times = []
+        model.warmup(imgsz=(1, 3, self.imgsz, self.imgsz))
+
+    def __call__(self, frame):
+        im = self.letterbox(frame)
+        t0 = time.perf_counter()
+        pred = self.model(im)
+        self.times.append(time.perf_counter() - t0)
+        det = non_max_suppression(pred, self.conf_thres, self.iou_thres, None, False, max_det=1000)[0]
+        if len(det):
+            det[:, :4] = scale_boxes(im.shape[2:], det[:, :4], frame.shape,
+                                     ratio_pad=self.letterbox.ratio_pad[0]).round()
+        return det
+
+    def latency(self):
+        t = np.array(self.times) * 1000
+        return {"mean": t.mean(), "p50": np.percentile(t, 50), "p95": np.percentile(t, 95),
+                "p99": np.percentile(t, 99)}
+
+
+def compare(ref, cand, min_iou, max_conf_diff):
+    """Return (ok, worst_iou, worst_conf_diff) for one frame"""
+    if len(ref) == 0:
+        return len(cand) == 0, 1.0, 0.0
+    if len(cand) == 0:
+        return False, 0.0, 1.0
+    iou = box_iou(ref[:, :4], cand[:, :4])
+    iou[ref[:, 5:6] != cand[:, 5].unsqueeze(0)] = 0  # only same-class matches count
+    best_iou, best = iou.max(1)
+    conf_diff = (ref[:, 4] - cand[best, 4]).abs()
+    worst_iou, worst_conf = float(best_iou.min()), float(conf_diff.max())
+    ok = worst_iou >= min_iou and worst_conf <= max_conf_diff and len(ref) == len(cand)
+    return ok, worst_iou, worst_conf
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare an exported backend with the PyTorch model')
+    parser.add_argument('--weights', type=str, default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('--backend', type=str, default='onnx', choices=[b for b in BACKENDS if b != 'pytorch'])
+    parser.add_argument('--candidate-weights', type=str, default=None,
+                        help='Exported artifact to test (default: the one export_model.py writes)')
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--source', type=str, default=str(ROOT / 'dataset/images/val'),
+                        help='Image directory or video file')
+    parser.add_argument('--max-frames', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=5, help='Timing passes over the frames')
+    parser.add_argument('--img-size', type=int, default=640)
+    parser.add_argument('--conf-thres', type=float, default=0.25)
+    parser.add_argument('--iou-thres', type=float, default=0.45)
+    parser.add_argument('--min-iou', type=float, default=0.9)
+    parser.add_argument('--max-conf-diff', type=float, default=0.05)
+    parser.add_argument('--report', type=str, default=str(ROOT / 'outputs/backend_comparison_report.txt'))
+    args = parser.parse_args()
+
+    device = torch.device('cpu')
+    reference = Runner('pytorch', load_model(args.weights, device, 'pytorch', args.threads),
+                       args.img_size, args.conf_thres, args.iou_thres)
+    candidate = Runner(args.backend,
+                       load_model(args.candidate_weights or args.weights, device, args.backend, args.threads),
+                       args.img_size, args.conf_thres, args.iou_thres)
+
+    frames = load_frames(args.source, args.max_frames)
+    if not frames:
+        sys.exit(f"No frames found in {args.source}")
+
+    failures = []
+    worst_iou, worst_conf = 1.0, 0.0
+    for name, frame in frames:
+        ok, f_iou, f_conf = compare(reference(frame), candidate(frame), args.min_iou, args.max_conf_diff)
+        worst_iou, worst_conf = min(worst_iou, f_iou), max(worst_conf, f_conf)
+        if not ok:
+            failures.append((name, f_iou, f_conf))
+
+    # Extra timing-only passes
+    for _ in range(args.repeats - 1):
+        for _, frame in frames:
+            reference(frame)
+            candidate(frame)
+
+    lines = [
+        "=" * 80,
+        f"BACKEND COMPARISON: pytorch vs {args.backend}",
+        "=" * 80,
+        f"  Weights: {args.weights}",
+        f"  Candidate: {args.candidate_weights or args.backend}",
+        f"  Threads: {args.threads or 'default'}",
+        f"  Frames: {len(frames)} from {args.source} x {args.repeats} passes",
+        "",
+        "LATENCY (forward pass, ms):",
+        f"  {'backend':<12}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}",
+    ]
+    for runner in (reference, candidate):
+        lat = runner.latency()
+        lines.append(f"  {runner.name:<12}{lat['mean']:>10.2f}{lat['p50']:>10.2f}{lat['p95']:>10.2f}"
+                     f"{lat['p99']:>10.2f}")
+    speedup = reference.latency()['mean'] / candidate.latency()['mean']
+    lines += [
+        f"  Speedup: {speedup:.2f}x",
+        "",
+        "PARITY:",
+        f"  Worst matched IoU: {worst_iou:.4f} (min {args.min_iou})",
+        f"  Worst confidence diff: {worst_conf:.4f} (max {args.max_conf_diff})",
+        f"  Frames failing: {len(failures)}/{len(frames)}",
+    ]
+    for name, f_iou, f_conf in failures[:20]:
+        lines.append(f"    - {name}: IoU {f_iou:.3f}, conf diff {f_conf:.3f}")
+    report = "\n".join(lines)
+
+    print(report)
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.report).write_text(report + "\n")
+    print(f"\nReport written to {args.report}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,11 +31,11 @@ def ensure_dirs():
             path.mkdir(parents=True, exist_ok=True)
 
 
-def random_bbox():
+def random_bbox(image_size=IMAGE_SIZE):
     width = random.randint(MIN_RECT_SIZE, MAX_RECT_SIZE)
     height = random.randint(MIN_RECT_SIZE, MAX_RECT_SIZE)
-    max_x = IMAGE_SIZE[0] - width - 1
-    max_y = IMAGE_SIZE[1] - height - 1
+    max_x = image_size[0] - width - 1
+    max_y = image_size[1] - height - 1
     x_min = random.randint(0, max_x)
     y_min = random.randint(0, max_y)
     x_max = x_min + width
@@ -43,8 +43,8 @@ def random_bbox():
     return x_min, y_min, x_max, y_max
 
 
-def to_yolo_format(x_min, y_min, x_max, y_max):
-    img_w, img_h = IMAGE_SIZE
+def to_yolo_format(x_min, y_min, x_max, y_max, image_size=IMAGE_SIZE):
+    img_w, img_h = image_size
     x_center = ((x_min + x_max) / 2) / img_w
     y_center = ((y_min + y_max) / 2) / img_h
     width = (x_max - x_min) / img_w
@@ -52,20 +52,26 @@ def to_yolo_format(x_min, y_min, x_max, y_max):
     return x_center, y_center, width, height
 
 
-def draw_sample(image_path, label_path):
-    img = Image.new("RGB", (IMAGE_SIZE[0], IMAGE_SIZE[1]), color=(20, 20, 20))
+def render_sample(image_size=IMAGE_SIZE, n_objects=None):
+    """Draw one synthetic image; returns (PIL image, YOLO label lines)"""
+    img = Image.new("RGB", (image_size[0], image_size[1]), color=(20, 20, 20))
     draw = ImageDraw.Draw(img)
-    n_objects = random.randint(1, MAX_OBJECTS_PER_IMAGE)
+    if n_objects is None:
+        n_objects = random.randint(1, MAX_OBJECTS_PER_IMAGE)
     label_lines = []
     for _ in range(n_objects):
         class_id = random.randint(0, len(CLASSES) - 1)
-        x_min, y_min, x_max, y_max = random_bbox()
+        x_min, y_min, x_max, y_max = random_bbox(image_size)
         color = tuple(random.randint(64, 255) for _ in range(3))
         draw.rectangle([x_min, y_min, x_max, y_max], outline=color, width=3)
         draw.text((x_min + 2, y_min + 2), CLASSES[class_id][:3], fill=color)
-        x_center, y_center, width, height = to_yolo_format(x_min, y_min, x_max, y_max)
+        x_center, y_center, width, height = to_yolo_format(x_min, y_min, x_max, y_max, image_size)
         label_lines.append(f"{class_id} {x_center:.6f} {y_center:.6f} {width:.6f} {height:.6f}")
+    return img, label_lines
+
 
+def draw_sample(image_path, label_path):
+    img, label_lines = render_sample()
     img.save(image_path)
     with open(label_path, "w", encoding="utf-8") as f:
         f.write("\n".join(label_lines))
@@ -0,0 +1,61 @@
+"""
+Export the trained ADAS model for CPU deployment
+
+Writes <weights>.onnx (and optionally <weights>_openvino_model/) next to the
+.pt file with a fixed input shape, which is where backend.model looks for
+them when a detector is started with --backend onnx / openvino.
+
+Usage:
+    python scripts/export_model.py [--include onnx openvino] [--img-size 640] [--batch-size 1]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.model import resolve_weights  # importing backend.model puts yolov5_official on sys.path
+
+import export as yolov5_export
+
+DEFAULT_WEIGHTS = ROOT / 'yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export YOLO weights to ONNX / OpenVINO')
+    parser.add_argument('--weights', type=str, default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('--include', nargs='+', default=['onnx'], choices=['onnx', 'openvino'])
+    parser.add_argument('--img-size', type=int, default=640, help='Fixed square input size')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Fixed batch size (number of sources for run_multi_camera.py)')
+    parser.add_argument('--opset', type=int, default=12)
+    args = parser.parse_args()
+
+    include = set(args.include)
+    if 'openvino' in include:
+        include.add('onnx')  # OpenVINO IR is converted from the ONNX graph
+
+    print(f"Exporting {args.weights} ({', '.join(sorted(include))}) "
+          f"with fixed input {args.batch_size}x3x{args.img_size}x{args.img_size}")
+    yolov5_export.run(
+        weights=args.weights,
+        imgsz=(args.img_size, args.img_size),
+        batch_size=args.batch_size,
+        device='cpu',
+        include=tuple(sorted(include)),
+        dynamic=False,
+        simplify=True,
+        opset=args.opset,
+    )
+
+    for backend in sorted(include):
+        path = resolve_weights(args.weights, backend)
+        status = "✓" if path.exists() else "✗ missing"
+        print(f"{status} {backend}: {path}")
+    print(f"\nRun with: python run_live_camera.py --backend {sorted(include)[-1]} --threads 4")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Load test: /video_feed frame cadence under concurrent API traffic
+
+Reads the MJPEG stream of a running backend and records when each frame
+arrives. It does this in two phases: first with no other traffic (baseline),
+then while --workers threads repeatedly call the database-backed endpoints.
+The report compares inter-frame intervals between the phases and adds API
+latencies and the DB pool gauges from /metrics.
+
+Exits 1 if the loaded p95 frame interval is more than --tolerance above the
+baseline p95.
+
+Usage:
+    uvicorn backend.main:app --port 8000 &
+    python scripts/load_test_video_feed.py --url http://localhost:8000 --workers 32 --duration 20
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BOUNDARY = b'--frame\r\n'
+API_PATHS = ('/alerts/?limit=50', '/api/admin/stats', '/api/admin/users', '/api/admin/users/1/alerts?limit=50',
+             '/alerts/1/image')
+
+
+class FrameClock(threading.Thread):
+    """Reads /video_feed and timestamps every frame boundary"""
+
+    def __init__(self, url):
+        super().__init__(name='video-feed', daemon=True)
+        self.url = url
+        self.arrivals = []
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            with requests.get(self.url + '/video_feed', stream=True, timeout=10) as response:
+                response.raise_for_status()
+                tail = b''
+                for chunk in response.iter_content(chunk_size=16384):
+                    if self._stop_event.is_set():
+                        break
+                    data = tail + chunk
+                    self.arrivals.extend([time.perf_counter()] * data.count(BOUNDARY))
+                    tail = data[-(len(BOUNDARY) - 1):]
+        except Exception as e:
+            self.error = e
+
+    def stop(self):
+        self._stop_event.set()
+
+    def intervals(self, start, end):
+        times = np.array([t for t in self.arrivals if start <= t < end])
+        return np.diff(times) * 1000
+
+
+def api_worker(url, stop, latencies, errors, i):
+    session = requests.Session()
+    n = 0
+    while not stop.is_set():
+        path = API_PATHS[(i + n) % len(API_PATHS)]
+        n += 1
+        t0 = time.perf_counter()
+        try:
+            status = session.get(url + path, timeout=30).status_code
+        except requests.RequestException:
+            status = None
+        latencies.setdefault(path, []).append((time.perf_counter() - t0) * 1000)
+        if status is None or status >= 500:
+            errors[path] = errors.get(path, 0) + 1
+
+
+def summarize(intervals):
+    if len(intervals) == 0:
+        return {"frames": 0}
+    return {
+        "frames": len(intervals) + 1,
+        "fps": 1000 / intervals.mean(),
+        "p50_ms": np.percentile(intervals, 50),
+        "p95_ms": np.percentile(intervals, 95),
+        "max_ms": intervals.max(),
+    }
+
+
+def db_gauges(url):
+    """adas_db_* samples from /metrics"""
+    try:
+        text = requests.get(url + '/metrics', timeout=5).text
+    except requests.RequestException:
+        return []
+    return [line for line in text.splitlines()
+            if line.startswith(('adas_db_pool_connections', 'adas_db_errors_total', 'adas_db_wait_seconds_sum',
+                                'adas_db_wait_seconds_count'))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure /video_feed cadence under concurrent API load')
+    parser.add_argument('--url', type=str, default='http://localhost:8000')
+    parser.add_argument('--workers', type=int, default=32, help='Concurrent API clients')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds per phase')
+    parser.add_argument('--warmup', type=float, default=5.0, help='Seconds of stream ignored at the start')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative p95 interval increase')
+    parser.add_argument('--report', type=str, default=str(ROOT / 'outputs/video_feed_load_report.txt'))
+    args = parser.parse_args()
+    url = args.url.rstrip('/')
+
+    clock = FrameClock(url)
+    clock.start()
+    time.sleep(args.warmup)
+    if clock.error or not clock.arrivals:
+        print(f"✗ No frames from {url}/video_feed: {clock.error}")
+        sys.exit(1)
+
+    print(f"Baseline: {args.duration:.0f}s without API traffic")
+    base_start = time.perf_counter()
+    time.sleep(args.duration)
+    base_end = time.perf_counter()
+
+    print(f"Load: {args.duration:.0f}s with {args.workers} concurrent API clients")
+    stop = threading.Event()
+    latencies, errors = {}, {}
+    workers = [threading.Thread(target=api_worker, args=(url, stop, latencies, errors, i), daemon=True)
+               for i in range(args.workers)]
+    load_start = time.perf_counter()
+    for w in workers:
+        w.start()
+    time.sleep(args.duration)
+    load_end = time.perf_counter()
+    gauges = db_gauges(url)
+    stop.set()
+    for w in workers:
+        w.join(timeout=35)
+    clock.stop()
+
+    baseline = summarize(clock.intervals(base_start, base_end))
+    loaded = summarize(clock.intervals(load_start, load_end))
+
+    lines = [f"/video_feed cadence under API load ({url}, {args.workers} workers, {args.duration:.0f}s per phase)",
+             "",
+             f"{'phase':<10}{'frames':>8}{'fps':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+    for name, s in (('baseline', baseline), ('load', loaded)):
+        if s["frames"]:
+            lines.append(f"{name:<10}{s['frames']:>8}{s['fps']:>8.1f}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}"
+                         f"{s['max_ms']:>9.1f}")
+        else:
+            lines.append(f"{name:<10}{0:>8}")
+    lines += ["", f"{'endpoint':<40}{'requests':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}"]
+    for path in API_PATHS:
+        t = np.array(latencies.get(path, []))
+        if len(t):
+            lines.append(f"{path:<40}{len(t):>9}{np.percentile(t, 50):>9.1f}{np.percentile(t, 95):>9.1f}"
+                         f"{errors.get(path, 0):>8}")
+    total = sum(len(v) for v in latencies.values())
+    lines.append(f"Throughput: {total / args.duration:.0f} req/s")
+    if gauges:
+        lines += ["", "DB pool at end of load phase:"] + [f"  {g}" for g in gauges]
+
+    ok = baseline["frames"] > 1 and loaded["frames"] > 1 and \
+        loaded["p95_ms"] <= baseline["p95_ms"] * (1 + args.tolerance)
+    lines += ["", f"{'✓' if ok else '✗'} p95 frame interval within +{args.tolerance:.0%} of baseline"]
+
+    report = '\n'.join(lines)
+    print('\n' + report)
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.report).write_text(report + '\n')
+    print(f"\nReport written to {args.report}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Measure API cold start: import time, time to first response, time to camera ready
+
+Phase 1 imports backend.main in --runs fresh interpreters. It reports the
+median import time and whether torch / cv2 were pulled in at import (they
+should not be; the camera loader imports them in the background).
+
+Phase 2 starts uvicorn on --port and records three times. The first is the
+first successful GET /. The second is the first /camera/status, which must
+answer without waiting for the model. The third is when the camera loader
+reports 'ready' or 'failed', which includes model load, warmup and camera
+open. The load time the loader measured itself is shown next to it.
+
+Usage:
+    python scripts/measure_cold_start.py
+    CAMERA_SOURCE=recordings/drive.mp4 python scripts/measure_cold_start.py --timeout 120
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_PROBE = (
+    "import sys, time; t = time.perf_counter(); import backend.main; "
+    "print(time.perf_counter() - t, 'torch' in sys.modules, 'cv2' in sys.modules)"
+)
+
+
+def measure_import(runs):
+    times, heavy = [], set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', IMPORT_PROBE], cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise SystemExit(f"✗ import backend.main failed:\n{out.stderr.strip().splitlines()[-1]}")
+        seconds, torch_loaded, cv2_loaded = out.stdout.split()[-3:]
+        times.append(float(seconds))
+        heavy |= {name for name, loaded in (('torch', torch_loaded), ('cv2', cv2_loaded)) if loaded == 'True'}
+    return times, heavy
+
+
+def wait_for(url, deadline, check=lambda r: True):
+    while time.perf_counter() < deadline:
+        try:
+            r = requests.get(url, timeout=1)
+            if r.ok and check(r):
+                return r
+        except requests.RequestException:
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def measure_server(port, timeout):
+    url = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'backend.main:app', '--port', str(port)],
+                              cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = t0 + timeout
+        first = wait_for(url + '/', deadline)
+        t_first = time.perf_counter() - t0 if first else None
+        s0 = time.perf_counter()
+        status = wait_for(url + '/camera/status', deadline)
+        t_status_call = time.perf_counter() - s0 if status else None
+        done = wait_for(url + '/camera/status', deadline,
+                        lambda r: r.json()['startup']['state'] in ('ready', 'failed'))
+        t_done = time.perf_counter() - t0 if done else None
+        startup = done.json()['startup'] if done else (status.json()['startup'] if status else {})
+        return t_first, t_status_call, t_done, startup
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure API cold-start time')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh-interpreter imports to time')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=60.0, help='Seconds to wait for the camera')
+    parser.add_argument('--skip-server', action='store_true', help='Only time the import')
+    parser.add_argument('--report', type=str, default=str(ROOT / 'outputs/cold_start_report.txt'))
+    args = parser.parse_args()
+
+    times, heavy = measure_import(args.runs)
+    lines = [f"Cold start ({os.cpu_count()} CPUs)",
+             f"  import backend.main     median {statistics.median(times) * 1000:.0f} ms "
+             f"(min {min(times) * 1000:.0f}, max {max(times) * 1000:.0f}, {args.runs} runs)",
+             f"  heavy modules at import {', '.join(sorted(heavy)) or 'none'}"]
+
+    if not args.skip_server:
+        t_first, t_status, t_done, startup = measure_server(args.port, args.timeout)
+        fmt = lambda t: f"{t * 1000:.0f} ms" if t is not None else "timed out"
+        lines += [f"  first GET /             {fmt(t_first)} after launch",
+                  f"  /camera/status call     {fmt(t_status)}",
+                  f"  camera {startup.get('state', '?'):<16} {fmt(t_done)} after launch "
+                  f"(loader: {startup.get('load_seconds')} s)"]
+        if startup.get('error'):
+            lines.append(f"  camera error            {startup['error']}")
+        lines.append(f"  startup                 {json.dumps(startup)}")
+
+    report = '\n'.join(lines)
+    print(report)
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.report).write_text(report + '\n')
+    print(f"\nReport written to {args.report}")
+    sys.exit(1 if heavy else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Move alert images out of the alerts.image_data LONGBLOB column into the
+content-addressed image store, keeping only image_key / image_size in MySQL.
+
+Usage:
+    python scripts/migrate_alert_images.py [--batch-size 500] [--drop-column]
+
+Safe to re-run: rows that already have an image_key are skipped.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import mysql.connector
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.image_store import get_image_store
+from db_setup import DB_HOST, DB_NAME, DB_PASSWORD, DB_USER
+
+
+def column_exists(cursor, column):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'alerts' AND COLUMN_NAME = %s",
+        (DB_NAME, column),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def ensure_columns(cursor):
+    if not column_exists(cursor, "image_key"):
+        cursor.execute("ALTER TABLE alerts ADD COLUMN image_key CHAR(64) NULL AFTER image_path")
+        print("✓ Added alerts.image_key")
+    if not column_exists(cursor, "image_size"):
+        cursor.execute("ALTER TABLE alerts ADD COLUMN image_size INT NULL AFTER image_key")
+        print("✓ Added alerts.image_size")
+
+
+def migrate(batch_size=500, drop_column=False):
+    store = get_image_store()
+    cnx = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+    cursor = cnx.cursor()
+
+    if not column_exists(cursor, "image_data"):
+        print("alerts.image_data does not exist, nothing to migrate")
+        return
+
+    ensure_columns(cursor)
+    cnx.commit()
+
+    moved = 0
+    total_bytes = 0
+    last_id = 0
+    while True:
+        # Walk by primary key so each batch is an index range scan
+        cursor.execute(
+            "SELECT id, image_data FROM alerts "
+            "WHERE id > %s AND image_key IS NULL AND image_data IS NOT NULL "
+            "ORDER BY id LIMIT %s",
+            (last_id, batch_size),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for alert_id, image_data in rows:
+            data = bytes(image_data)
+            updates.append((store.put(data), len(data), alert_id))
+            total_bytes += len(data)
+
+        cursor.executemany(
+            "UPDATE alerts SET image_key = %s, image_size = %s, image_data = NULL WHERE id = %s",
+            updates,
+        )
+        cnx.commit()
+
+        moved += len(rows)
+        last_id = rows[-1][0]
+        print(f"  moved {moved} images ({total_bytes / 1e6:.1f} MB), last id {last_id}")
+
+    print(f"✓ Migrated {moved} images to {getattr(store, 'root', store)}")
+
+    if drop_column:
+        cursor.execute("ALTER TABLE alerts DROP COLUMN image_data")
+        cursor.execute("OPTIMIZE TABLE alerts")
+        cursor.fetchall()
+        print("✓ Dropped alerts.image_data and rebuilt the table")
+
+    cursor.close()
+    cnx.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Move alert image BLOBs into the image store')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per transaction')
+    parser.add_argument('--drop-column', action='store_true',
+                        help='Drop alerts.image_data afterwards and reclaim its space')
+    args = parser.parse_args()
+    migrate(batch_size=args.batch_size, drop_column=args.drop_column)
+
+
+if __name__ == "__main__":
+    main()
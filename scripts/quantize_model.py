@@ -0,0 +1,217 @@
+"""
+INT8 post-training quantization of the exported ONNX model
+
+Calibrates on dataset/images/val (or a directory of recorded frames) using
+the detectors' own letterbox preprocessing, writes <weights>_int8.onnx in
+QDQ format with per-channel weights, then evaluates FP32 and INT8 on the
+labelled validation split and reports mAP and per-class recall deltas for
+the classes in dataset/data.yaml.
+
+The Detect head's box-decoding ops (sigmoid / grid / anchor math) are left in
+FP32 by default because quantizing them costs localization accuracy for
+almost no speed.
+
+Usage:
+    python scripts/export_model.py --include onnx
+    python scripts/quantize_model.py [--calib-dir recordings/] [--method percentile]
+    python run_live_camera.py --backend onnx --weights yolov5/runs/.../best_fixed_int8.onnx
+"""
+
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import torch
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.model import load_model, resolve_weights  # importing backend.model puts yolov5_official on sys.path
+from backend.preprocess import Letterbox
+from compare_backends import Runner, load_frames
+
+from utils.general import xywhn2xyxy
+from utils.metrics import ap_per_class
+from val import process_batch
+
+DEFAULT_WEIGHTS = ROOT / 'yolov5/runs/train/exp_model-n_img-640/weights/best_fixed.pt'
+DATA_YAML = ROOT / 'dataset/data.yaml'
+
+
+class FrameCalibrationReader:
+    """onnxruntime CalibrationDataReader over letterboxed frames"""
+
+    def __init__(self, frames, input_name, imgsz):
+        self.frames = iter(frames)
+        self.input_name = input_name
+        self.letterbox = Letterbox(imgsz)
+
+    def get_next(self):
+        item = next(self.frames, None)
+        if item is None:
+            return None
+        # The letterbox tensor is reused, so hand the calibrator its own copy
+        return {self.input_name: self.letterbox(item[1]).numpy().copy()}
+
+
+def detect_head_nodes(model):
+    """Non-Conv nodes of the final Detect layer (e.g. /model.24/...)"""
+    indices = [int(m.group(1)) for n in model.graph.node if (m := re.match(r"/model\.(\d+)/", n.name))]
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [n.name for n in model.graph.node if n.name.startswith(head) and n.op_type != 'Conv']
+
+
+def quantize(fp32_path, int8_path, calib_frames, method, include_head):
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+
+    model = onnx.load(str(fp32_path))
+    input_name = model.graph.input[0].name
+    imgsz = model.graph.input[0].type.tensor_type.shape.dim[2].dim_value
+    exclude = [] if include_head else detect_head_nodes(model)
+
+    print(f"Calibrating on {len(calib_frames)} frames ({method}), "
+          f"{len(exclude)} Detect-head nodes kept in FP32")
+    quantize_static(
+        str(fp32_path), str(int8_path),
+        FrameCalibrationReader(calib_frames, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.Percentile if method == 'percentile' else CalibrationMethod.MinMax,
+        nodes_to_exclude=exclude,
+    )
+
+    # Keep the stride / names metadata backend.model reads
+    quantized = onnx.load(str(int8_path))
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(model.metadata_props)
+    onnx.save(quantized, str(int8_path))
+    print(f"✓ INT8 model written to {int8_path} "
+          f"({fp32_path.stat().st_size / 1e6:.1f} MB -> {int8_path.stat().st_size / 1e6:.1f} MB)")
+
+
+def label_dir_for(image_dir):
+    """YOLO label directory for an image directory: the last /images/ component becomes /labels/"""
+    sa, sb = f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"
+    path = str(Path(image_dir).resolve()) + os.sep
+    if sa not in path:
+        sys.exit(f"{image_dir} is not under an 'images' directory; cannot find its labels")
+    return Path(sb.join(path.rsplit(sa, 1)))
+
+
+def load_labels(image_name, label_dir, shape):
+    """YOLO-format labels as (n, 5) [cls, x1, y1, x2, y2] in pixels"""
+    path = label_dir / f"{Path(image_name).stem}.txt"
+    if not path.exists() or not path.read_text().strip():
+        return torch.zeros((0, 5))
+    labels = torch.tensor(np.loadtxt(path, ndmin=2), dtype=torch.float32)
+    h, w = shape[:2]
+    labels[:, 1:] = xywhn2xyxy(labels[:, 1:], w=w, h=h)
+    return labels
+
+
+def evaluate(runner, frames, label_dir, nc):
+    """mAP@0.5, mAP@0.5:0.95 and per-class recall over labelled frames"""
+    iouv = torch.linspace(0.5, 0.95, 10)
+    stats = []
+    for name, frame in frames:
+        det = runner(frame)
+        labels = load_labels(name, label_dir, frame.shape)
+        correct = torch.zeros(len(det), len(iouv), dtype=torch.bool)
+        if len(det) and len(labels):
+            correct = process_batch(det, labels, iouv)
+        stats.append((correct, det[:, 4], det[:, 5], labels[:, 0]))
+
+    if not stats:
+        sys.exit("No evaluation frames loaded; check --eval-dir")
+    tp, conf, pred_cls, target_cls = [torch.cat(x, 0).cpu().numpy() for x in zip(*stats)]
+    if not len(tp) or not tp.any():
+        return {"map50": 0.0, "map": 0.0, "recall": {}, "targets": np.bincount(target_cls.astype(int), minlength=nc)}
+    _, _, p, r, _, ap, classes = ap_per_class(tp, conf, pred_cls, target_cls)
+    return {
+        "map50": float(ap[:, 0].mean()),
+        "map": float(ap.mean(1).mean()),
+        "recall": {int(c): float(r[i]) for i, c in enumerate(classes)},
+        "targets": np.bincount(target_cls.astype(int), minlength=nc),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='INT8 post-training quantization with accuracy report')
+    parser.add_argument('--weights', type=str, default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('--calib-dir', type=str, default=str(ROOT / 'dataset/images/val'),
+                        help='Calibration images or a recorded video file')
+    parser.add_argument('--calib-frames', type=int, default=300)
+    parser.add_argument('--method', type=str, default='minmax', choices=['minmax', 'percentile'])
+    parser.add_argument('--include-head', action='store_true', help='Also quantize the Detect head')
+    parser.add_argument('--eval-dir', type=str, default=str(ROOT / 'dataset/images/val'))
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--report', type=str, default=str(ROOT / 'outputs/int8_quantization_report.txt'))
+    args = parser.parse_args()
+
+    fp32_path = resolve_weights(args.weights, 'onnx')
+    if not fp32_path.exists():
+        sys.exit(f"{fp32_path} not found; run scripts/export_model.py --include onnx first")
+    int8_path = fp32_path.with_name(f"{fp32_path.stem}_int8.onnx")
+
+    quantize(fp32_path, int8_path, load_frames(args.calib_dir, args.calib_frames), args.method,
+             args.include_head)
+
+    names = yaml.safe_load(DATA_YAML.read_text())['names']
+    device = torch.device('cpu')
+    runners = {
+        "fp32": Runner('fp32', load_model(fp32_path, device, 'onnx', args.threads), 640, 0.001, 0.6),
+        "int8": Runner('int8', load_model(int8_path, device, 'onnx', args.threads), 640, 0.001, 0.6),
+    }
+    eval_frames = load_frames(args.eval_dir, 10_000)
+    label_dir = label_dir_for(args.eval_dir)
+    if not label_dir.is_dir():
+        sys.exit(f"Label directory {label_dir} not found for {args.eval_dir}")
+    results = {k: evaluate(r, eval_frames, label_dir, len(names)) for k, r in runners.items()}
+
+    fp32, int8 = results["fp32"], results["int8"]
+    lat = {k: r.latency() for k, r in runners.items()}
+    lines = [
+        "=" * 80,
+        "INT8 POST-TRAINING QUANTIZATION",
+        "=" * 80,
+        f"  FP32 model: {fp32_path}",
+        f"  INT8 model: {int8_path}",
+        f"  Calibration: {args.calib_dir} ({args.method}, up to {args.calib_frames} frames)",
+        f"  Evaluation: {args.eval_dir} ({len(eval_frames)} images)",
+        "",
+        "ACCURACY:",
+        f"  {'metric':<16}{'fp32':>10}{'int8':>10}{'delta':>10}",
+        f"  {'mAP@0.5':<16}{fp32['map50']:>10.4f}{int8['map50']:>10.4f}{int8['map50'] - fp32['map50']:>+10.4f}",
+        f"  {'mAP@0.5:0.95':<16}{fp32['map']:>10.4f}{int8['map']:>10.4f}{int8['map'] - fp32['map']:>+10.4f}",
+        "",
+        "PER-CLASS RECALL:",
+        f"  {'class':<16}{'targets':>8}{'fp32':>10}{'int8':>10}{'delta':>10}",
+    ]
+    for i, name in enumerate(names):
+        r32, r8 = fp32['recall'].get(i, 0.0), int8['recall'].get(i, 0.0)
+        lines.append(f"  {name:<16}{int(fp32['targets'][i]):>8}{r32:>10.3f}{r8:>10.3f}{r8 - r32:>+10.3f}")
+    lines += [
+        "",
+        "LATENCY (forward pass, ms):",
+        f"  fp32: mean {lat['fp32']['mean']:.2f}, p95 {lat['fp32']['p95']:.2f}",
+        f"  int8: mean {lat['int8']['mean']:.2f}, p95 {lat['int8']['p95']:.2f}",
+        f"  Speedup: {lat['fp32']['mean'] / lat['int8']['mean']:.2f}x",
+    ]
+    report = "\n".join(lines)
+    print(report)
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.report).write_text(report + "\n")
+    print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Validate distance estimates against a labeled distance set
+
+The labeled set is a CSV file with one row per box:
+
+    class,x1,x2,image_width,distance
+    car,612,790,1280,10.2
+    truck,540,618,1280,31.5
+
+The distance column holds the measured ground truth in meters, from a
+rangefinder, lidar or a tape. Instead of x1,x2, the box width can be given
+in a bbox_width column. Extra columns are ignored. Distances derived from the
+class width priors themselves (synthetic boxes) only reproduce those priors
+and say nothing about real error. No measured set ships with the repo yet.
+
+The script compares the camera profile (--profile, CAMERA_PROFILE, or the
+default with per-class widths) with the old uncalibrated constants, a 1.8 m
+width for every class at 1000 px. It reports per-class absolute and relative
+error. It also counts false alerts (estimated inside --alert-distance while
+really outside) and missed alerts. --max-error turns the run into a check
+that exits non-zero when the median relative error of the profile exceeds it.
+
+Usage:
+    python scripts/validate_distance.py labels/distances.csv --profile dashcam
+    python scripts/validate_distance.py labels/distances.csv --max-error 0.15
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.calibration import DEFAULT_FOCAL_LENGTH, DEFAULT_WIDTH, load_profile
+from backend.postprocess import ALERT_DISTANCE, pinhole_distance
+
+
+def load_labels(path):
+    """(class names, class ids, box widths, image widths, true distances) from the CSV"""
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        raise SystemExit(f"✗ {path} has no rows")
+    names, cls = np.unique([r['class'] for r in rows], return_inverse=True)
+    if 'bbox_width' in rows[0]:
+        widths = [float(r['bbox_width']) for r in rows]
+    else:
+        widths = [float(r['x2']) - float(r['x1']) for r in rows]
+    return (list(names), cls, np.array(widths, dtype=np.float32),
+            np.array([int(r['image_width']) for r in rows]), np.array([float(r['distance']) for r in rows]))
+
+
+def estimate(width_lut, focal_for, cls, widths, image_widths):
+    """Distances for all boxes: the per-class width lookup, one focal length per image width"""
+    out = np.empty(len(widths), dtype=np.float32)
+    for w in np.unique(image_widths):
+        sel = image_widths == w
+        out[sel] = pinhole_distance(widths[sel], width_lut[cls[sel]], focal_for(w))
+    return out
+
+
+def summarize(est, true, alert_distance):
+    rel = np.abs(est - true) / true
+    return {
+        'n': len(true),
+        'mae': float(np.mean(np.abs(est - true))),
+        'median_rel': float(np.median(rel)),
+        'p90_rel': float(np.percentile(rel, 90)),
+        'false_alerts': int(np.sum((est < alert_distance) & (true >= alert_distance))),
+        'missed_alerts': int(np.sum((est >= alert_distance) & (true < alert_distance))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate distance estimates against labeled distances')
+    parser.add_argument('labels', type=str, help='CSV with class, x1/x2 or bbox_width, image_width, distance')
+    parser.add_argument('--profile', type=str, default=None, help='Camera profile name or path')
+    parser.add_argument('--alert-distance', type=float, default=ALERT_DISTANCE)
+    parser.add_argument('--max-error', type=float, default=None,
+                        help='Fail if the median relative error of the profile exceeds this (e.g. 0.15)')
+    parser.add_argument('--report', type=str, default=str(ROOT / 'outputs/distance_validation.txt'))
+    args = parser.parse_args()
+
+    names, cls, widths, image_widths, true = load_labels(args.labels)
+    profile = load_profile(args.profile)
+    calibrated = estimate(profile.width_lookup(names), profile.focal_for, cls, widths, image_widths)
+    baseline = estimate(np.full(len(names), DEFAULT_WIDTH, dtype=np.float32), lambda w: DEFAULT_FOCAL_LENGTH,
+                        cls, widths, image_widths)
+
+    lines = [f"Distance validation: {len(true)} boxes from {args.labels}, profile '{profile.name}' "
+             f"({profile.focal_length:.0f} px), alert distance {args.alert_distance:g} m",
+             "",
+             f"{'class':<15}{'n':>5}{'estimator':>14}{'MAE m':>9}{'med err':>9}{'p90 err':>9}"
+             f"{'false':>7}{'missed':>8}"]
+    groups = [(name, cls == i) for i, name in enumerate(names)] + [('all', np.ones(len(true), dtype=bool))]
+    for name, sel in groups:
+        for label, est in (('uncalibrated', baseline), ('profile', calibrated)):
+            s = summarize(est[sel], true[sel], args.alert_distance)
+            lines.append(f"{name:<15}{s['n']:>5}{label:>14}{s['mae']:>9.2f}{s['median_rel']:>9.1%}"
+                         f"{s['p90_rel']:>9.1%}{s['false_alerts']:>7}{s['missed_alerts']:>8}")
+
+    report = '\n'.join(lines)
+    print(report)
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.report).write_text(report + '\n')
+    print(f"\nReport written to {args.report}")
+
+    if args.max_error is not None:
+        error = summarize(calibrated, true, args.alert_distance)['median_rel']
+        ok = error <= args.max_error
+        print(f"{'✓' if ok else '✗'} median relative error {error:.1%} (limit {args.max_error:.0%})")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()